@@ -1,27 +1,43 @@
-from gpiozero import Servo, DistanceSensor
-from picamera2 import Picamera2
-from time import sleep
+from gpiozero import Servo
+import os
 import time
-import json
 import paho.mqtt.client as mqtt
 import numpy as np
-import os
-import wave
-from PIL import Image
-import tflite_runtime.interpreter as tflite
+from audio_stream import AudioStream
+from audio_rooms import RoomAudio
+from emotion_tracker import EmotionTracker
+from audio_gate import ActivityDetector
+from camera_service import CameraService, FakeFrameSource, SNAPSHOT_DIR
+from pet_detector import PetDetector
+from frame_filter import GatedPetDetector
+from localization import PetLocalizer
+from model_registry import registry, YAMNET_INPUT_SIZE
+from cpu_config import cpu_config
+from inference_cache import pet_cache, audio_cache
+from snapshot_store import SnapshotStore
+from inference_client import InferenceClient
+from runtime import Runtime
+from actuators import ServoActuator, HIGH
+from ultrasonic_sampler import UltrasonicSampler
+from telemetry import TelemetryAggregator
+from outbox import Outbox
+from motion_gate import MotionGate
+from instrumentation import metrics, log, StatsReporter, StatsServer
 
 
 # MQTT Setup
-BROKER = "broker.hivemq.com"  
-PORT = 1883
+BROKER = os.environ.get("MQTT_BROKER", "broker.hivemq.com")  
+PORT = int(os.environ.get("MQTT_PORT", 1883))
 USERNAME = None
 PASSWORD = None
 
 def on_connect(client, userdata, flags, rc):
+    metrics.count("mqtt.connects")
     print("Connected with result code " + str(rc))
 
 def on_publish(client, userdata, mid):
-    print("Message published, mid:", mid)
+    metrics.count("mqtt.acked")
+    log("mqtt.publish", f"Message published, mid: {mid}")
 
 client = mqtt.Client()
 client.on_connect = on_connect
@@ -30,171 +46,328 @@ client.on_publish = on_publish
 if USERNAME and PASSWORD:
     client.username_pw_set(USERNAME, PASSWORD)
 
-client.connect(BROKER, PORT)
+# Connect in the background and keep retrying, so a missing broker or Wi-Fi never stops startup
+client.reconnect_delay_set(min_delay=1, max_delay=60)
+client.connect_async(BROKER, PORT)
 client.loop_start()
 
+# Publishes go to disk first and drain to the broker whenever it is reachable
+outbox = Outbox(client, os.environ.get("OUTBOX_PATH", "outbox.db"), drain_rate=20.0, batch_size=50)
+
+# Telemetry is reported by exception and batched per device (see telemetry.py)
+DEADBANDS = {"food_level": 2.0, "door_distance_cm": 5.0}
+telemetry = TelemetryAggregator(outbox, DEADBANDS, min_interval=1.0, max_interval=300.0, flush_interval=5.0)
+
 
 TRIG1, ECHO1 = 24, 23  # Food ultrasonic
 TRIG2, ECHO2 = 22, 27  # Door ultrasonic
 SERVO1_PIN, SERVO2_PIN = 18, 17
 
-ultrasonic_food = DistanceSensor(echo=ECHO1, trigger=TRIG1, max_distance=1.0)
-ultrasonic_door = DistanceSensor(echo=ECHO2, trigger=TRIG2, max_distance=1.0)
+# Both ultrasonics are pinged in turn by one sampler; readings are median-filtered
+ULTRASONIC_RATE = 5  # rounds per second
+ultrasonic = UltrasonicSampler({"food": (TRIG1, ECHO1), "door": (TRIG2, ECHO2)},
+                               rate_hz=ULTRASONIC_RATE, max_distance_cm=100)
 servo_food = Servo(SERVO1_PIN)
 servo_door = Servo(SERVO2_PIN)
 
 
 # Load AI Models
 
-print("Loading TFLite models...")
-
-#YAMNet model 
-yamnet = tflite.Interpreter(model_path="yamnet.tflite")
-yamnet.allocate_tensors()
-yamnet_input = yamnet.get_input_details()
-yamnet_output = yamnet.get_output_details()
-YAMNET_INPUT_SIZE = yamnet_input[0]['shape'][0]
-
-#MobileNet Pet Detector 
-pet_model_path = "mobilenet_pet.tflite"
-pet_interpreter = tflite.Interpreter(model_path=pet_model_path)
-pet_interpreter.allocate_tensors()
-pet_input = pet_interpreter.get_input_details()
-pet_output = pet_interpreter.get_output_details()
-
-
-def capture_image(filename="snapshot.jpg"):
-    folder = "snapshots"
-    os.makedirs(folder, exist_ok=True)
-    filepath = os.path.join(folder, filename)
-
-    picam2 = Picamera2()
-    sleep(2)  
-    picam2.start()
-    picam2.capture_file(filepath)
-    picam2.stop()
-    print(f"[CAMERA] Image captured: {filepath}")
-    return filepath
-
-def is_pet_in_image(image_path, threshold=0.5):
-    """Run MobileNet to detect if a pet is in the image."""
-    img = Image.open(image_path).resize((224, 224))
-    input_data = np.expand_dims(np.array(img) / 255.0, axis=0).astype(np.float32)
-    pet_interpreter.set_tensor(pet_input[0]['index'], input_data)
-    pet_interpreter.invoke()
-    output = pet_interpreter.get_tensor(pet_output[0]['index'])
-    output = np.array(output).flatten()
-    pet_prob = output[0]
-    print(f"[AI] Pet probability: {pet_prob:.2f}")
-    return pet_prob > threshold
-
+# Interpreters are created on first use (or by the background warm-up in
+# main), so sensors and MQTT are running before the models have loaded.
+MODEL_WARMUP = ("pet", "yamnet")
+
+# Set INFERENCE_SOCKET to use a running inference_server.py (shared with the
+# test scripts) instead of loading the models in this process
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET")
+inference = InferenceClient(INFERENCE_SOCKET) if INFERENCE_SOCKET else None
+
+
+# Camera: started once, frames kept in memory at model resolution
+FAKE_CAMERA = False  # replay the saved snapshots instead of the Pi camera
+camera = CameraService(FakeFrameSource() if FAKE_CAMERA else None)
+
+# Pet localization: cameras in other rooms (room -> frame source). Rooms with
+# motion are checked first, the rest every 30 s, and cat_present is published
+# on each room's device only when it changes (localization.py).
+ROOM_CAMERAS = {}   # e.g. {"Livingroom": FakeFrameSource("rooms/livingroom/*.jpg")}
+localizer = None
+
+def on_occupancy(room, present):
+    log("locate", f"[LOCATE] {room}: {'pet present' if present else 'empty'}")
+    telemetry.record(room, "cat_present", present)
+
+
+# Event snapshots: written by a background thread into SNAPSHOT_DIR/<day>/
+# with a thumbnail and a row in SNAPSHOT_DIR/index.db; the oldest are deleted
+# once they pass SNAPSHOT_MAX_AGE or SNAPSHOT_MAX_BYTES (snapshot_store.py);
+# alert snapshots are flagged and never deleted. SNAPSHOT_DIR comes from
+# camera_service (environment variable SNAPSHOT_DIR, default snapshots/)
+SNAPSHOT_MAX_BYTES = 512 * 1024 * 1024
+SNAPSHOT_MAX_AGE = 14 * 24 * 3600
+snapshot_store = SnapshotStore(SNAPSHOT_DIR, max_bytes=SNAPSHOT_MAX_BYTES, max_age=SNAPSHOT_MAX_AGE)
+
+def capture_image(reason, pet_probability=None, emotion=None, flagged=False):
+    """Queue the newest full-resolution frame for the snapshot store (never waits on the SD card)."""
+    return snapshot_store.save(camera.full_frame(), reason, pet_probability=pet_probability, emotion=emotion,
+                               flagged=flagged)
+
+def invoke_mobilenet(image):
+    with metrics.span("mobilenet"):
+        if inference:
+            pet_prob = inference.pet_probability(image)
+        else:
+            model = registry.get("pet")
+            detector = model.adapter(PetDetector)
+            with model.lock:    # warm_up() may be invoking the same interpreter in the background
+                pet_prob = detector.predict(image)
+    metrics.count("inferences.mobilenet")
+    return pet_prob
+
+def run_mobilenet(image):
+    # Frames whose dHash is within a few bits of a recent one reuse its result (inference_cache.py)
+    return pet_cache.lookup(image, invoke_mobilenet)
+
+# Pre-filter: camera frames only reach MobileNet when they differ from the
+# background model and from the frame behind the last verdict (frame_filter.py)
+pet_gate = GatedPetDetector(run_mobilenet)
+
+def is_pet_in_image(image, threshold=0.5):
+    """Run MobileNet on a camera frame (already at model resolution) or an image path."""
+    return pet_probability(image) > threshold
+
+def pet_probability(image):
+    """MobileNet pet probability for a camera frame (gated by pet_gate) or an image path."""
+    pet_prob = run_mobilenet(image) if isinstance(image, str) else pet_gate.predict(image)
+    log("ai", f"[AI] Pet probability: {pet_prob:.2f}")
+    return pet_prob
+
+# YAMNet interpreters shared by the main stream and the room streams
+AUDIO_WORKERS = 2
+yamnet_pool = registry.pool("yamnet", AUDIO_WORKERS)
+
+def score_audio_chunk(chunk):
+    """Score one YAMNet window, reusing the result for an identical one (safe from several threads)."""
+    return audio_cache.lookup(chunk.astype(np.float32, copy=False), invoke_yamnet)
+
+def invoke_yamnet(chunk):
+    with metrics.span("yamnet"):
+        scores = inference.score_audio(chunk) if inference else yamnet_pool.score(chunk)
+    metrics.count("inferences.yamnet")
+    return scores
+
+# Rolling emotion over the most recent YAMNet windows; WAV files are read incrementally.
+# Silent windows skip YAMNet and count as "no event" instead of averaging as class 0.
+audio_gate = ActivityDetector()
+emotion_tracker = EmotionTracker(score_audio_chunk, YAMNET_INPUT_SIZE, gate=audio_gate)
+
+# Streaming audio: windows are scored as soon as they arrive over UDP
+STREAM_AUDIO = True
+audio_stream = None
+
+def on_audio_window(chunk):
+    emotion_tracker.add_window(chunk)
+
+# Microphones in other rooms, each reported as its own ThingsBoard device:
+# device -> (udp port, stream id from the audioRelay_sender.py header).
+# Use stream id None for a plain PCM sender on a port of its own.
+ROOM_PORT = 5006
+AUDIO_ROOMS = {"Livingroom": (ROOM_PORT, 0), "Kitchen": (ROOM_PORT, 1)}
+room_audio = None
+
+def on_room_result(device, sound, emotion):
+    telemetry.record(device, "sound", sound)
+    telemetry.record(device, "emotion", emotion)
+
+@metrics.timed("emotion")
 def predict_sound_emotion(audio_path="received_audio.wav"):
     """Run YAMNet to classify audio emotion."""
-    with wave.open(audio_path, 'rb') as wf:
-        frames = wf.readframes(wf.getnframes())
-        audio_data = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
-    audio_data = audio_data / 32768.0  # normalize to [-1,1]
-
-    preds = []
-    for start in range(0, len(audio_data) - YAMNET_INPUT_SIZE + 1, YAMNET_INPUT_SIZE):
-        chunk = audio_data[start:start + YAMNET_INPUT_SIZE]
-        yamnet.set_tensor(yamnet_input[0]['index'], chunk.astype(np.float32))
-        yamnet.invoke()
-        preds.append(yamnet.get_tensor(yamnet_output[0]['index'])[0])
-
-    if not preds:
-        return "unknown"
-
-    avg_preds = np.mean(preds, axis=0)
-    label_index = np.argmax(avg_preds)
-    sound_map = {0: "bark", 1: "meow", 2: "whine", 3: "growl"}
-    sound = sound_map.get(label_index, "unknown")
-
-    if sound == "bark":
-        emotion = "Hungry"
-    elif sound == "whine":
-        emotion = "Anxious"
-    elif sound == "growl":
-        emotion = "Angry"
-    else:
-        emotion = "Happy"
+    if audio_stream is None:
+        emotion_tracker.update_from_wav(audio_path)
 
-    print(f"[YAMNET] Sound: {sound} | Emotion: {emotion}")
+    sound, emotion = emotion_tracker.current()
+    log("yamnet", f"[YAMNET] Sound: {sound} | Emotion: {emotion}")
     return emotion
 
-def open_servo(servo, name):
-    servo.max()
-    print(f"{name} opened")
+# Actuators: each servo runs its own command queue, so callers never block
+door_actuator = ServoActuator(servo_door, "Door Servo")
+food_actuator = ServoActuator(servo_food, "Food Servo")
 
-def close_servo(servo, name):
-    servo.min()
-    print(f"{name} closed")
+FEED_SECONDS = 4
 
 def feed_pet():
-    open_servo(servo_food, "Food Servo")
-    sleep(4)
-    close_servo(servo_food, "Food Servo")
+    """Open the food servo for FEED_SECONDS and close it again, without blocking."""
+    food_actuator.pulse(FEED_SECONDS)
+
+
+# Runtime: each stage is its own task so door safety never waits on feeding or audio
+
+FOOD_PERIOD = 5       # seconds between food level readings
+DOOR_PERIOD = 0.5     # seconds between door distance readings
+AUDIO_PERIOD = 5      # seconds between emotion decisions
+STATS_PERIOD = 60     # seconds between task latency reports
+
+runtime = Runtime()
+vision_queue = runtime.queue(maxsize=1)   # door motion events waiting for the camera check
+
+# Motion gating: the camera check runs once per new arrival at the door (PIR
+# edge or the distance dropping below 50 cm), not on every loop while the pet
+# stays there. The distance must rise above 60 cm again to re-arm.
+PIR_PIN = None          # GPIO of a PIR sensor at the door, if one is fitted
+MOTION_COOLDOWN = 10    # seconds to ignore new triggers after an event
+
+def on_motion(source, detail):
+    metrics.count("motion.events")
+    log("motion", f"[MOTION] Detected near door ({source})! Checking camera...")
+    vision_queue.put_latest(detail)
+
+motion_gate = MotionGate(on_motion, near_cm=50, clear_cm=60, cooldown=MOTION_COOLDOWN)
+
+# Diagnostics: span histograms and counters, published every STATS_PERIOD to
+# tb/sensors/Diagnostics/data and served locally on http://127.0.0.1:8787/stats
+metrics.gauge("frames.skipped", lambda: vision_queue.dropped)
+metrics.gauge("motion.suppressed", lambda: motion_gate.suppressed)
+metrics.gauge("frames.prefiltered", lambda: pet_gate.skipped)
+metrics.gauge("audio.windows_skipped", lambda: emotion_tracker.windows_skipped)
+metrics.gauge("locate.classified", lambda: localizer.detector.frames if localizer else 0)
+metrics.gauge("audio.rooms_dropped",
+              lambda: sum(room.dropped for room in room_audio.rooms.values()) if room_audio else 0)
+for cache in (pet_cache, audio_cache):
+    metrics.gauge(f"cache.{cache.name}_hits", lambda cache=cache: cache.hits)
+    metrics.gauge(f"cache.{cache.name}_misses", lambda cache=cache: cache.misses)
+metrics.gauge("outbox.pending", lambda: outbox.pending())
+metrics.gauge("outbox.publish_failures", lambda: outbox.failed)
+metrics.gauge("outbox.retried", lambda: outbox.retried)
+metrics.gauge("snapshots.bytes", lambda: snapshot_store.total_bytes)
+metrics.gauge("snapshots.dropped", lambda: snapshot_store.dropped)
+stats_reporter = StatsReporter(metrics, client, period=STATS_PERIOD)
+metrics.gauge("stats.publish_failures", lambda: stats_reporter.failures)
+stats_server = StatsServer(metrics)
 
 
 # Ultrasonic Handling
 
+@metrics.timed("food")
 def handle_ultrasonic_food():
-    distance_cm = ultrasonic_food.distance * 100
+    distance_cm = ultrasonic.distance("food")
+    if distance_cm is None:
+        metrics.count("ultrasonic.no_echo")
+        log("food.no_echo", "[FOOD] No echo from food sensor")
+        return
     capacity = max(0, min(((30 - distance_cm) / 30) * 100, 100))
-    print(f"[FOOD] Distance: {distance_cm:.1f} cm | Capacity: {capacity:.1f}%")
+    log("food", f"[FOOD] Distance: {distance_cm:.1f} cm | Capacity: {capacity:.1f}%")
 
-    topic = "tb/sensors/Foodpot/data"
-    payload = {"food_level": round(capacity, 1)}
-    client.publish(topic, json.dumps(payload), qos=1)
+    telemetry.record("Foodpot", "food_level", round(capacity, 1))
 
+@metrics.timed("door")
 def handle_ultrasonic_door():
-    distance_cm = ultrasonic_door.distance * 100
-    print(f"[DOOR] Distance: {distance_cm:.1f} cm")
-
-    if distance_cm < 50:  
-        print("[MOTION] Detected near door! Capturing image...")
-        img_path = capture_image(f"motion_{int(time.time())}.jpg")
-        if is_pet_in_image(img_path):
-            print("[PET] Pet detected near door. Closing door for safety.")
-            close_servo(servo_door, "Door Servo")
-        else:
-            print("[ALERT] Unknown motion detected. Door stays open.")
-            open_servo(servo_door, "Door Servo")
+    distance_cm = ultrasonic.distance("door")
+    if distance_cm is None:
+        metrics.count("ultrasonic.no_echo")
+        log("door.no_echo", "[DOOR] No echo from door sensor")
+        return
+    log("door", f"[DOOR] Distance: {distance_cm:.1f} cm")
+
+    motion_gate.update_distance(distance_cm)
+
+    telemetry.record("Door", "door_distance_cm", round(distance_cm, 1))
+
+@metrics.timed("vision")
+def check_door_camera(distance_cm):
+    """Vision task: classify the newest camera frame after door motion."""
+    pet_prob = pet_probability(camera.latest_frame())
+    if pet_prob > 0.5:
+        log("pet", "[PET] Pet detected near door. Closing door for safety.")
+        door_actuator.close(priority=HIGH)
+    else:
+        log("alert", "[ALERT] Unknown motion detected. Door stays open.")
+        door_actuator.open()
+        capture_image("motion", pet_probability=pet_prob)
+
+def handle_emotion():
+    """Audio task: act on the current sound-based emotion and publish it."""
+    emotion = predict_sound_emotion()
+
+    if emotion == "Hungry":
+        feed_pet()
+    elif emotion in ["Angry", "Anxious"]:
+        door_actuator.close(priority=HIGH)
+        capture_image("alert", emotion=emotion, flagged=True)
+
+    # Queue emotion for MQTT; the record's ts replaces the old timestamp field
+    telemetry.record("Emotion", "emotion", emotion)
 
-    topic = "tb/sensors/Door/data"
-    payload = {"door_distance_cm": round(distance_cm, 1)}
-    client.publish(topic, json.dumps(payload), qos=1)
 
 # Main Loop
 
+def start():
+    """Start the sensors, camera, audio stream and runtime tasks (returns immediately)."""
+    global audio_stream, room_audio, localizer
+    ultrasonic.start()
+    camera.start()
+    if ROOM_CAMERAS:
+        localizer = PetLocalizer(ROOM_CAMERAS, registry.get("pet"), on_occupancy).start()
+    if PIR_PIN is not None:
+        motion_gate.attach_pir(PIR_PIN)
+    if inference is None:
+        # Interpreter threads and core pinning come from the environment (cpu_config.py)
+        print("[CPU]", cpu_config.summary())
+        registry.warm_up(*MODEL_WARMUP)
+    if STREAM_AUDIO:
+        audio_stream = AudioStream(YAMNET_INPUT_SIZE, on_audio_window).start()
+        if AUDIO_ROOMS:
+            room_audio = RoomAudio(AUDIO_ROOMS, score_audio_chunk, YAMNET_INPUT_SIZE, on_room_result,
+                                   workers=AUDIO_WORKERS).start()
+
+    runtime.every("door", DOOR_PERIOD, handle_ultrasonic_door)
+    runtime.consume("vision", vision_queue, check_door_camera, group="vision")
+    runtime.every("food", FOOD_PERIOD, handle_ultrasonic_food)
+    runtime.every("audio", AUDIO_PERIOD, handle_emotion, group="audio")
+    runtime.start()
+    outbox.start()
+    snapshot_store.start()
+    telemetry.start()
+    stats_reporter.start()
+    try:
+        stats_server.start()
+    except OSError as e:
+        print("[STATS] Stats endpoint unavailable:", e)
+
+def shutdown():
+    runtime.stop()
+    stats_reporter.stop()
+    stats_server.stop()
+    telemetry.stop()
+    outbox.stop()
+    snapshot_store.stop()
+    ultrasonic.stop()
+    motion_gate.close()
+    if audio_stream:
+        audio_stream.stop()
+    if room_audio:
+        room_audio.stop()
+    camera.stop()
+    if localizer:
+        localizer.stop()
+    if inference:
+        inference.close()
+    door_actuator.stop()
+    food_actuator.stop()
+    servo_food.detach()
+    servo_door.detach()
+
 def main():
     print("Smart Pet Care System Started")
+    start()
+
     try:
         while True:
-            handle_ultrasonic_food()
-            handle_ultrasonic_door()
-
-            # Detect sound-based emotion
-            emotion = predict_sound_emotion()
-
-            if emotion == "Hungry":
-                feed_pet()
-            elif emotion in ["Angry", "Anxious"]:
-                close_servo(servo_door, "Door Servo")
-                capture_image(f"alert_{int(time.time())}.jpg")
-
-            # Publish emotion to MQTT
-            payload = {"emotion": emotion, "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
-            client.publish("tb/sensors/Emotion/data", json.dumps(payload), qos=1)
-            print("[MQTT] Published emotion data:", payload)
-
-            print("-----------------------------------------")
-            time.sleep(5)
+            time.sleep(STATS_PERIOD)
+            runtime.report()
 
     except KeyboardInterrupt:
         print("\nSystem stopped by user.")
-        servo_food.detach()
-        servo_door.detach()
+        shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import threading
+from collections import deque
+
+# Command priorities: a HIGH command jumps the queue, drops pending NORMAL
+# commands and cuts short a timed sequence that is in progress.
+NORMAL, HIGH = 0, 1
+
+
+class ServoActuator:
+    """
+    Owns one gpiozero Servo and executes its commands on a worker thread, so
+    callers never block on a timed open/close sequence. Commands that would
+    not change the servo position (closing a closed door) are coalesced away.
+    """
+
+    def __init__(self, servo, name):
+        self.servo = servo
+        self.name = name
+        self.state = None          # "open" / "closed" once a command has run
+        self.executed = 0
+        self.coalesced = 0
+        self.preempted = 0
+        self._pending = deque()    # (priority, action, hold_seconds)
+        self._current = None       # command being executed
+        self._interrupt = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"servo-{name}", daemon=True)
+        self._thread.start()
+
+    # ---------- Commands ----------
+    def open(self, priority=NORMAL):
+        self.submit("open", priority)
+
+    def close(self, priority=NORMAL):
+        self.submit("close", priority)
+
+    def pulse(self, seconds, priority=NORMAL):
+        """Open, hold for seconds, then close - without blocking the caller."""
+        self.submit("pulse", priority, seconds)
+
+    def submit(self, action, priority=NORMAL, hold=0.0):
+        with self._cond:
+            if priority > NORMAL:
+                kept = deque(cmd for cmd in self._pending if cmd[0] >= priority)
+                self.preempted += len(self._pending) - len(kept)
+                self._pending = kept
+                if self._current and self._current[0] < priority:
+                    self._interrupt = True
+                    self._cond.notify_all()
+
+            if self._redundant(action):
+                self.coalesced += 1
+                return
+
+            # Keep FIFO order within a priority level, higher levels first
+            index = len(self._pending)
+            while index > 0 and self._pending[index - 1][0] < priority:
+                index -= 1
+            self._pending.insert(index, (priority, action, hold))
+            self._cond.notify()
+
+    def _redundant(self, action):
+        """True when the command would leave the servo where it is already headed."""
+        if self._pending:
+            last = self._pending[-1]
+            if last[1] == action:
+                return True
+            target = "closed" if last[1] in ("close", "pulse") else "open"
+        elif self._current:
+            if self._current[1] == "pulse" and action == "pulse" and not self._interrupt:
+                return True
+            # A pulse always finishes closed, even when it is cut short
+            target = "closed" if self._current[1] in ("close", "pulse") else "open"
+        else:
+            target = self.state
+        return action != "pulse" and target == ("open" if action == "open" else "closed")
+
+    # ---------- Worker ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopped)
+                if self._stopped:
+                    return
+                self._current = self._pending.popleft()
+                self._interrupt = False
+
+            _, action, hold = self._current
+            if action == "close":
+                self._move("closed")
+            else:
+                self._move("open")
+                if action == "pulse":
+                    with self._cond:
+                        # Sleeps for the hold time unless a HIGH command or stop() interrupts it
+                        self._cond.wait_for(lambda: self._interrupt or self._stopped, hold)
+                    self._move("closed")
+
+            with self._cond:
+                self.executed += 1
+                self._current = None
+
+    def _move(self, state):
+        if state == "open":
+            self.servo.max()
+        else:
+            self.servo.min()
+        self.state = state
+        print(f"{self.name} {'opened' if state == 'open' else 'closed'}")
+
+    def idle(self):
+        with self._cond:
+            return not self._pending and self._current is None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
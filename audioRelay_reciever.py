@@ -1,38 +1,58 @@
-import socket
-import numpy as np
-import wave
-
-UDP_IP = "0.0.0.0"   # listen on all interfaces
-UDP_PORT = 5005
-
-# Audio parameters
-CHANNELS = 1
-RATE = 16000
-SAMPLE_WIDTH = 2  # bytes (16-bit)
-
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-sock.bind((UDP_IP, UDP_PORT))
-print("[Pi] Waiting for audio stream...")
-
-frames = []
-
-try:
-    while True:
-        data, addr = sock.recvfrom(4096)  # buffer size
-        frames.append(data)
-        print(f"[✅] Received {len(data)} bytes from {addr}")
-except KeyboardInterrupt:
-    print("[🛑] Stopping and saving audio...")
-
-# Convert frames to a single bytes object
-audio_bytes = b''.join(frames)
-
-# Save as WAV
-with wave.open("received_audio.wav", "wb") as wf:
-    wf.setnchannels(CHANNELS)
-    wf.setsampwidth(SAMPLE_WIDTH)
-    wf.setframerate(RATE)
-    wf.writeframes(audio_bytes)
-
-print("[💾] Audio saved as received_audio.wav")
-
+import threading
+import time
+from audio_relay import AudioReceiver, WavSegmentWriter, UDP_IP, UDP_PORT, RATE
+from audio_stream import AudioRingBuffer
+
+# Receives one or more UDP audio streams (see audioRelay_sender.py for the
+# packet header; plain PCM packets still work) and keeps them either as
+# rolling WAV segments on disk or only in an in-memory ring. Each finished
+# segment also replaces LATEST_FILE, which the emotion check, yamnet_test.py
+# and audio_models.py read.
+SEGMENT_DIR = "audio_segments"
+LATEST_FILE = "received_audio.wav"
+SEGMENT_SECONDS = 60      # length of each WAV file
+MAX_SEGMENTS = 30         # older segments are deleted (30 x 60 s ~ 57 MB per stream)
+RING_ONLY = False         # True: keep the last RING_SECONDS in memory, write nothing (LATEST_FILE goes stale)
+RING_SECONDS = 10
+STATS_PERIOD = 10         # seconds between loss/jitter reports
+
+
+def make_sink(stream):
+    name = "raw" if stream is None else f"stream{stream}"
+    print(f"[Pi] New stream: {name}")
+    if RING_ONLY:
+        return AudioRingBuffer(RATE, capacity_windows=RING_SECONDS)
+    return WavSegmentWriter(SEGMENT_DIR, name, RATE, SEGMENT_SECONDS, MAX_SEGMENTS, latest_path=LATEST_FILE)
+
+
+def report(receiver):
+    stats = receiver.stats()
+    for name, s in stats["streams"].items():
+        print(f"[Pi] {name}: {s['packets']} packets, lost {s['lost']} ({s['loss_rate'] * 100:.2f}%), "
+              f"late {s['late']}, zero-filled {s['zero_filled']} samples, jitter {s['jitter_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    receiver = AudioReceiver(make_sink, UDP_IP, UDP_PORT).open()
+    running = threading.Event()
+    running.set()
+    thread = threading.Thread(target=receiver.serve, args=(running,), name="audio-rx", daemon=True)
+    thread.start()
+    print(f"[Pi] Waiting for audio stream on udp://{UDP_IP}:{UDP_PORT} (SO_RCVBUF {receiver.rcvbuf} bytes)...")
+
+    try:
+        while True:
+            time.sleep(STATS_PERIOD)
+            report(receiver)
+    except KeyboardInterrupt:
+        print("[🛑] Stopping...")
+
+    running.clear()
+    thread.join(timeout=2)
+    receiver.close()
+    for state in receiver.streams.values():
+        if hasattr(state.sink, "close"):
+            state.sink.close()
+    report(receiver)
+    if not RING_ONLY:
+        print(f"[💾] Audio segments saved in {SEGMENT_DIR}/, newest complete one as {LATEST_FILE}")
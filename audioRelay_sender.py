@@ -0,0 +1,87 @@
+import random
+import socket
+import sys
+import time
+import wave
+import numpy as np
+from audio_relay import pack_header, UDP_PORT, RATE
+
+# Streams received_audio.wav (looped) to an audio receiver with the sequence /
+# sample-index header, optionally dropping and reordering packets to test the
+# receiver's loss handling.
+# Usage: python audioRelay_sender.py [host] [streams] [rate] [loss] [seconds]
+
+PACKET_SECONDS = 0.032    # 512 samples at 16 kHz
+AUDIO_FILE = "received_audio.wav"
+
+
+def load_audio(rate, path=AUDIO_FILE):
+    """received_audio.wav as int16, resampled to rate if needed."""
+    with wave.open(path, "rb") as wf:
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        source_rate = wf.getframerate()
+    if rate != source_rate:
+        positions = np.arange(int(len(audio) * rate / source_rate)) * source_rate / rate
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.int16)
+    return audio
+
+
+def send_streams(host, port=UDP_PORT, streams=1, rate=RATE, loss=0.0, reorder=0.0, seconds=10.0, seed=1):
+    """
+    Send `streams` interleaved streams in real time. Each packet is dropped
+    with probability `loss`, or held back one packet with probability
+    `reorder`. Returns {stream: {"sent": n, "dropped": n, "reordered": n, "samples": n}}.
+    """
+    rng = random.Random(seed)
+    audio = load_audio(rate)
+    per_packet = int(rate * PACKET_SECONDS)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+    counts = {s: {"sent": 0, "dropped": 0, "reordered": 0, "samples": 0} for s in range(streams)}
+    held = {}
+    start = time.monotonic()
+    n_packets = int(seconds / PACKET_SECONDS)
+
+    for seq in range(n_packets):
+        index = seq * per_packet
+        for stream in range(streams):
+            # Offset each stream so they don't carry identical audio
+            start_sample = (index + stream * 4001) % (len(audio) - per_packet)
+            chunk = audio[start_sample:start_sample + per_packet]
+            packet = pack_header(stream, seq, index) + chunk.tobytes()
+            counts[stream]["samples"] += per_packet
+            if rng.random() < loss:
+                counts[stream]["dropped"] += 1
+                continue
+            if stream not in held and rng.random() < reorder:
+                held[stream] = packet
+                counts[stream]["reordered"] += 1
+                continue
+            sock.sendto(packet, (host, port))
+            counts[stream]["sent"] += 1
+            if stream in held:
+                sock.sendto(held.pop(stream), (host, port))
+                counts[stream]["sent"] += 1
+
+        delay = start + (seq + 1) * PACKET_SECONDS - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    for stream, packet in held.items():
+        sock.sendto(packet, (host, port))
+        counts[stream]["sent"] += 1
+    sock.close()
+    return counts
+
+
+if __name__ == "__main__":
+    host = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    streams = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    rate = int(sys.argv[3]) if len(sys.argv) > 3 else RATE
+    loss = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    seconds = float(sys.argv[5]) if len(sys.argv) > 5 else 30.0
+
+    print(f"[SENDER] {streams} stream(s) at {rate} Hz to udp://{host}:{UDP_PORT}, loss {loss * 100:.1f}%")
+    counts = send_streams(host, UDP_PORT, streams, rate, loss, seconds=seconds)
+    for stream, c in counts.items():
+        print(f"[SENDER] stream{stream}: sent {c['sent']}, dropped {c['dropped']}, reordered {c['reordered']}")
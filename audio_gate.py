@@ -0,0 +1,79 @@
+import numpy as np
+
+FRAME_SIZE = 400          # 25 ms analysis frames at 16 kHz, as in YAMNet's own front end
+MARGIN_DB = 12.0          # a frame is "loud" this far above the noise floor...
+MIN_LEVEL_DB = -60.0      # ...and above this absolute level (dBFS)
+MIN_ACTIVE_FRAMES = 2     # loud frames needed to call a window active (50 ms)
+FLOOR_RISE = 0.05         # how fast the noise floor follows a louder background
+FLUX_THRESHOLD = 2.0      # normalised spectral flux that marks an onset (noise stays below ~1.5)
+
+
+class ActivityDetector:
+    """
+    Energy-based sound activity detector working on the same windows YAMNet
+    scores. Each window is split into 25 ms frames; a frame is loud when its
+    RMS level is margin_db above an adaptive noise floor. The floor drops
+    straight to the quietest part of a window and rises only slowly, so a
+    short event never becomes the new floor.
+
+    With use_flux=True a window also counts as active when the spectral flux
+    between frames shows a sharp onset (a bark or meow that is short or not
+    much louder than a steady background).
+    """
+
+    def __init__(self, frame_size=FRAME_SIZE, margin_db=MARGIN_DB, min_level_db=MIN_LEVEL_DB,
+                 min_active_frames=MIN_ACTIVE_FRAMES, floor_rise=FLOOR_RISE,
+                 use_flux=False, flux_threshold=FLUX_THRESHOLD):
+        self.frame_size = frame_size
+        self.margin_db = margin_db
+        self.min_level_db = min_level_db
+        self.min_active_frames = min_active_frames
+        self.floor_rise = floor_rise
+        self.use_flux = use_flux
+        self.flux_threshold = flux_threshold
+        self.noise_floor = None
+        self.windows = 0
+        self.active = 0
+        self.last_level_db = None
+        self._taper = np.hanning(frame_size).astype(np.float32)
+
+    def _frames(self, window):
+        n = len(window) // self.frame_size
+        return np.asarray(window[:n * self.frame_size], dtype=np.float32).reshape(n, self.frame_size)
+
+    def levels_db(self, window):
+        """RMS level of every frame in dBFS (window normalised to [-1, 1])."""
+        frames = self._frames(window)
+        power = np.einsum("ij,ij->i", frames, frames) / self.frame_size
+        return 10 * np.log10(power + 1e-12)
+
+    def spectral_flux(self, window):
+        """Largest frame-to-frame increase in magnitude spectrum, relative to the previous frame."""
+        spectra = np.abs(np.fft.rfft(self._frames(window) * self._taper, axis=1))
+        rise = np.maximum(spectra[1:] - spectra[:-1], 0).sum(axis=1)
+        return float(np.max(rise / (spectra[:-1].sum(axis=1) + 1e-9))) if len(rise) else 0.0
+
+    def is_active(self, window):
+        """True when the window holds a sound event worth a YAMNet invoke."""
+        levels = self.levels_db(window)
+        quiet = float(np.percentile(levels, 10))
+        if self.noise_floor is None or quiet < self.noise_floor:
+            self.noise_floor = quiet
+        else:
+            self.noise_floor += self.floor_rise * (quiet - self.noise_floor)
+
+        threshold = max(self.noise_floor + self.margin_db, self.min_level_db)
+        active = np.count_nonzero(levels > threshold) >= self.min_active_frames
+        if not active and self.use_flux:
+            active = self.spectral_flux(window) > self.flux_threshold
+
+        self.windows += 1
+        self.active += active
+        self.last_level_db = float(levels.max())
+        return bool(active)
+
+    def stats(self):
+        skipped = self.windows - self.active
+        return {"windows": self.windows, "active": self.active, "skipped": skipped,
+                "skip_rate": round(skipped / self.windows, 3) if self.windows else 0.0,
+                "noise_floor_db": None if self.noise_floor is None else round(self.noise_floor, 1)}
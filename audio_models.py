@@ -1,39 +1,53 @@
+import os
+import queue
+import threading
+from math import gcd
 import numpy as np
 import soundfile as sf
-from tflite_runtime.interpreter import Interpreter
+from model_registry import registry, YAMNET_INPUT_SIZE
+from inference_client import connect
 
-# ---------- Load TFLite Models ----------
-yamnet = Interpreter(model_path="yamnet.tflite")
-yamnet.allocate_tensors()
+SAMPLE_RATE = 16000          # both models expect 16 kHz mono
+WINDOW_SIZE = YAMNET_INPUT_SIZE
+READ_BLOCK = 16384           # frames read (and resampled) per step
+ZERO_CROSSINGS = 8           # resampler filter half-width, in input (or output) periods
+ROLLOFF = 0.9                # resampler cutoff as a fraction of the lower Nyquist frequency
+AUDIO_MODELS = ("yamnet", "vggish")
 
-vggish = Interpreter(model_path="vggish.tflite")
-vggish.allocate_tensors()
+# ---------- TFLite Models ----------
+# Served by inference_server.py if one is running, otherwise loaded lazily
+# by the shared registry the first time each helper runs
+client = connect()
 
 # ---------- Helper Functions ----------
-def detect_sound_class(audio_data):
-    input_details = yamnet.get_input_details()
-    output_details = yamnet.get_output_details()
-
-    waveform = np.expand_dims(audio_data, axis=0).astype(np.float32)
-    yamnet.set_tensor(input_details[0]['index'], waveform)
-    yamnet.invoke()
-
-    predictions = yamnet.get_tensor(output_details[0]['index'])[0]
+def run_model(name, waveform):
+    """First output row of the named model for waveform."""
+    if client:
+        return client.infer(name, waveform)
+    model = registry.get(name)
+    with model.lock:
+        model.set_input(waveform)
+        model.interpreter.invoke()
+        return model.output()
+
+def input_size(name):
+    """Number of samples the named model takes per window."""
+    shape = client.models[name]["input_shape"] if client else registry.get(name).input_shape
+    return int(shape[-1])
+
+def fit_window(audio_data, size):
+    """audio_data trimmed or zero-padded to exactly size samples."""
+    if len(audio_data) >= size:
+        return audio_data[:size]
+    return np.pad(audio_data, (0, size - len(audio_data)))
+
+def sound_from_scores(predictions):
     label_index = np.argmax(predictions)
 
     sound_map = {0: "bark", 1: "meow", 2: "whine", 3: "growl"}
     return sound_map.get(label_index, "unknown")
 
-def detect_emotion(audio_data):
-    input_details = vggish.get_input_details()
-    output_details = vggish.get_output_details()
-
-    waveform = np.expand_dims(audio_data, axis=0).astype(np.float32)
-    vggish.set_tensor(input_details[0]['index'], waveform)
-    vggish.invoke()
-
-    embedding = vggish.get_tensor(output_details[0]['index'])[0]
-
+def emotion_from_embedding(embedding):
     # Simple heuristic for emotions
     mean_val = np.mean(embedding)
     max_val = np.max(embedding)
@@ -47,18 +61,193 @@ def detect_emotion(audio_data):
     else:
         return "Anxious"
 
+def detect_sound_class(audio_data):
+    """Sound class of one window (trimmed or padded to YAMNet's input)."""
+    waveform = np.expand_dims(fit_window(audio_data, input_size("yamnet")), axis=0).astype(np.float32)
+    return sound_from_scores(run_model("yamnet", waveform))
+
+def detect_emotion(audio_data):
+    """Emotion of one window (trimmed or padded to VGGish's input)."""
+    waveform = np.expand_dims(fit_window(audio_data, input_size("vggish")), axis=0).astype(np.float32)
+    return emotion_from_embedding(run_model("vggish", waveform))
+
+# ---------- Frontend ----------
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (source_rate -> target_rate). The windowed
+    sinc low-pass is split into one short filter per output phase, so each
+    output sample costs taps multiply-adds and nothing is computed for the
+    zeros an upsample-filter-downsample chain would insert. Feed consecutive
+    blocks to process(); the filter history carries across calls, so block
+    boundaries don't click. Output is delayed by about ZERO_CROSSINGS input
+    samples (the filter's group delay).
+    """
+
+    def __init__(self, source_rate, target_rate=SAMPLE_RATE, zero_crossings=ZERO_CROSSINGS):
+        g = gcd(int(source_rate), int(target_rate))
+        self.up = int(target_rate) // g
+        self.down = int(source_rate) // g
+        self.taps = int(np.ceil(2 * zero_crossings * max(self.up, self.down) / self.up))
+
+        length = self.taps * self.up
+        # Cycles per sample at the upsampled rate, a little under the lower Nyquist
+        # so the transition band is attenuated before it can alias
+        cutoff = ROLLOFF * 0.5 / max(self.up, self.down)
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0) * self.up
+        # phases[p, j] multiplies input sample k - j for outputs in phase p
+        self.phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0      # input samples seen so far
+        self._produced = 0      # output samples emitted so far
+
+    def process(self, block):
+        """Resample the next block of float32 samples; returns the output it completes."""
+        if self.up == self.down:
+            return np.asarray(block, dtype=np.float32)
+        buffer = np.concatenate((self._history, np.asarray(block, dtype=np.float32)))
+        offset = self._consumed - len(self._history)     # absolute index of buffer[0]
+        self._consumed += len(block)
+
+        end = -(-self._consumed * self.up // self.down)  # outputs whose last input has arrived
+        t = np.arange(self._produced, end) * self.down
+        newest = t // self.up - offset                   # buffer index of each output's newest input
+        window = newest[:, None] + np.arange(1 - self.taps, 1)
+        out = np.einsum("ij,ij->i", buffer[window], self.phases[t % self.up])
+        self._produced = end
+        self._history = buffer[len(buffer) - (self.taps - 1):]
+        return out
+
+def frames(blocks, window_size=WINDOW_SIZE, hop=None):
+    """Cut a stream of sample blocks into (start sample, window) pairs; the last partial window is zero-padded."""
+    hop = hop or window_size
+    pending = np.zeros(0, dtype=np.float32)
+    start = 0
+    for block in blocks:
+        pending = np.concatenate((pending, block))
+        while len(pending) >= window_size:
+            yield start, pending[:window_size]
+            pending = pending[hop:]
+            start += hop
+    if len(pending) and (start == 0 or len(pending) > window_size - hop):
+        yield start, fit_window(pending, window_size)
+
+def read_blocks(audio_path, rate=SAMPLE_RATE, block_size=READ_BLOCK):
+    """Mono float32 blocks of audio_path, resampled to rate as they are read."""
+    resampler = PolyphaseResampler(sf.info(audio_path).samplerate, rate)
+    for block in sf.blocks(audio_path, blocksize=block_size, dtype='float32', always_2d=True):
+        yield resampler.process(block.mean(axis=1) if block.shape[1] > 1 else block[:, 0])
+
+class _Lane:
+    """One model's thread: takes windows from its queue and stores its output by window number."""
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.results = {}
+        self.error = None
+        self._queue = queue.Queue(maxsize=4)
+        self._thread = threading.Thread(target=self._run, name=f"audio-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, item):
+        self._queue.put(item)
+
+    def join(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.error is None:
+                try:
+                    self.results[item[0]] = self.fn(item[1])
+                except Exception as e:
+                    self.error = e
+
+class AudioAnalyzer:
+    """
+    Reads a recording once, resamples it once and frames it once, then runs
+    every window through YAMNet (sound class) and VGGish (emotion). With
+    two or more cores each model gets its own thread and both work on the
+    same window at the same time (invoke() releases the GIL), so a file
+    takes about as long as the slower model alone; on one core they run
+    back to back in the caller's thread.
+
+    models maps a model name to fn(window) -> output row; by default both
+    go through run_model (the inference server or the shared registry).
+    """
+
+    def __init__(self, models=None, window_size=WINDOW_SIZE, hop=None, concurrent=None):
+        if models is None:
+            models = {name: self._runner(name) for name in AUDIO_MODELS}
+        self.models = models
+        self.window_size = window_size
+        self.hop = hop
+        if concurrent is None:
+            concurrent = len(os.sched_getaffinity(0)) > 1
+        self.concurrent = concurrent
+
+    @staticmethod
+    def _runner(name):
+        size = []
+
+        def run(window):
+            if not size:
+                size.append(input_size(name))
+            return run_model(name, np.expand_dims(fit_window(window, size[0]), axis=0))
+        return run
+
+    def analyze_file(self, audio_path):
+        """[(start seconds, sound, emotion), ...] for each window of audio_path."""
+        return self.analyze_blocks(read_blocks(audio_path))
+
+    def analyze(self, samples, rate=SAMPLE_RATE):
+        """Same as analyze_file for an in-memory (mono) recording."""
+        resampler = PolyphaseResampler(rate)
+        samples = np.asarray(samples, dtype=np.float32)
+        return self.analyze_blocks(resampler.process(samples[i:i + READ_BLOCK])
+                                   for i in range(0, len(samples), READ_BLOCK))
+
+    def analyze_blocks(self, blocks):
+        """Same as analyze_file for an iterable of 16 kHz float32 blocks."""
+        starts = []
+        windows = frames(blocks, self.window_size, self.hop)
+        if self.concurrent:
+            lanes = [_Lane(name, fn) for name, fn in self.models.items()]
+            try:
+                for start, window in windows:
+                    for lane in lanes:
+                        lane.put((len(starts), window))
+                    starts.append(start)
+            finally:
+                for lane in lanes:
+                    lane.join()
+            outputs = {lane.name: lane.results for lane in lanes}
+        else:
+            outputs = {name: {} for name in self.models}
+            for start, window in windows:
+                for name, fn in self.models.items():
+                    outputs[name][len(starts)] = fn(window)
+                starts.append(start)
+
+        return [(start / SAMPLE_RATE,
+                 sound_from_scores(outputs["yamnet"][i]),
+                 emotion_from_embedding(outputs["vggish"][i]))
+                for i, start in enumerate(starts)]
+
 # ---------- Test Script ----------
 if __name__ == "__main__":
     audio_file = "received_audio.wav"  # replace with your WAV file
-    waveform, sr = sf.read(audio_file)
-
-    if sr != 16000:
-        print(f"Warning: expected 16 kHz sample rate, got {sr}")
-
-    audio_data = waveform.astype(np.float32)
+    sr = sf.info(audio_file).samplerate
 
-    sound = detect_sound_class(audio_data)
-    emotion = detect_emotion(audio_data)
+    if sr != SAMPLE_RATE:
+        print(f"Resampling from {sr} Hz to {SAMPLE_RATE} Hz")
 
-    print(f"Sound detected: {sound}")
-    print(f"Emotion detected: {emotion}")
+    for start, sound, emotion in AudioAnalyzer().analyze_file(audio_file):
+        print(f"{start:7.2f}s  Sound detected: {sound:8s} Emotion detected: {emotion}")
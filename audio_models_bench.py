@@ -0,0 +1,67 @@
+import os
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")   # one core per "invoke", like num_threads=1
+import sys
+import tempfile
+import time
+import numpy as np
+import soundfile as sf
+from audio_models import AudioAnalyzer, read_blocks, frames
+from room_audio_bench import SyntheticModel
+
+# Shared audio frontend for YAMNet + VGGish. received_audio.wav is written
+# out at 44.1 kHz stereo so the frontend has to downmix and resample, then:
+#   separate  - each model reads, resamples and frames the file itself, then
+#               runs on its own (the old detect_sound_class / detect_emotion)
+#   shared    - one read/resample/frame pass, both models in the caller's thread
+#   concurrent- one pass, each model on its own thread (needs 2+ cores)
+# Both models are synthetic CPU loads (YAMNET_MS / VGGISH_MS per window,
+# roughly single-threaded Pi 4 invokes) so the timing shows the frontend and
+# the scheduling rather than a measured model.
+# Usage: python audio_models_bench.py [yamnet_ms] [vggish_ms]
+
+YAMNET_MS = float(sys.argv[1]) if len(sys.argv) > 1 else 15.0
+VGGISH_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 25.0
+SOURCE_RATE = 44100
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def separate(path, models):
+    for fn in models.values():
+        for _, window in frames(read_blocks(path)):
+            fn(window)
+
+
+if __name__ == "__main__":
+    audio, rate = sf.read("received_audio.wav", dtype='float32')
+    positions = np.arange(int(len(audio) * SOURCE_RATE / rate)) * rate / SOURCE_RATE
+    upsampled = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    path = os.path.join(tempfile.gettempdir(), "audio_models_bench.wav")
+    sf.write(path, np.stack((upsampled, upsampled), axis=1), SOURCE_RATE)
+
+    yamnet, vggish = SyntheticModel(YAMNET_MS), SyntheticModel(VGGISH_MS)
+    models = {"yamnet": yamnet.score, "vggish": vggish.score}
+    idle = {"yamnet": lambda w: np.zeros(521, dtype=np.float32), "vggish": lambda w: np.zeros(128, dtype=np.float32)}
+    cores = len(os.sched_getaffinity(0))
+    try:
+        windows, frontend = timed(lambda: AudioAnalyzer(idle, concurrent=False).analyze_file(path))
+        _, slower = timed(lambda: AudioAnalyzer({"yamnet": idle["yamnet"], "vggish": vggish.score},
+                                                concurrent=False).analyze_file(path))
+        _, sep = timed(lambda: separate(path, models))
+        _, shared = timed(lambda: AudioAnalyzer(models, concurrent=False).analyze_file(path))
+        _, conc = timed(lambda: AudioAnalyzer(models, concurrent=True).analyze_file(path))
+    finally:
+        os.unlink(path)
+
+    seconds = len(audio) / rate
+    print(f"{seconds:.1f} s of 44.1 kHz stereo -> {len(windows)} windows, "
+          f"YAMNet {YAMNET_MS:.0f} ms + VGGish {VGGISH_MS:.0f} ms per window, {cores} core(s)")
+    print(f"  frontend only (read + resample + frame)  {frontend * 1000:8.1f} ms")
+    print(f"  slower model alone (VGGish)              {slower * 1000:8.1f} ms")
+    print(f"  separate frontends, models in turn       {sep * 1000:8.1f} ms")
+    print(f"  shared frontend, models in turn          {shared * 1000:8.1f} ms")
+    print(f"  shared frontend, models concurrent       {conc * 1000:8.1f} ms")
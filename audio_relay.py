@@ -0,0 +1,263 @@
+import os
+import shutil
+import socket
+import struct
+import threading
+import time
+import wave
+from collections import deque
+
+UDP_IP = "0.0.0.0"   # listen on all interfaces
+UDP_PORT = 5005
+
+# Audio parameters (must match the sender)
+CHANNELS = 1
+RATE = 16000
+SAMPLE_WIDTH = 2  # bytes (16-bit)
+
+# Optional packet header: magic, version, stream id, sequence number, index of
+# the packet's first sample. Packets without the magic are treated as raw PCM.
+HEADER = struct.Struct("!2sBBIQ")
+MAGIC = b"PA"
+VERSION = 1
+
+MAX_PACKET = 65536         # largest UDP datagram
+RCVBUF = 1 << 20           # requested kernel receive buffer (bytes)
+MAX_GAP_SECONDS = 1.0      # gaps up to this long are zero-filled; longer jumps resync
+MAX_SEQ_JUMP = 1000        # larger sequence jumps mean the sender restarted
+
+
+def pack_header(stream, seq, sample_index):
+    return HEADER.pack(MAGIC, VERSION, stream, seq & 0xFFFFFFFF, sample_index)
+
+
+# ---------- Per-stream accounting ----------
+class StreamState:
+    """Sequence, alignment and jitter bookkeeping for one incoming stream."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.packets = 0
+        self.bytes = 0
+        self.lost = 0             # packets missing from the sequence (net of late arrivals)
+        self.late = 0             # packets that arrived after their slot was filled
+        self.zero_filled = 0      # samples of silence written in place of lost audio
+        self.resyncs = 0          # jumps too large to fill
+        self.jitter = 0.0         # RFC 3550 interarrival jitter, seconds
+        self.next_seq = None
+        self.next_sample = None
+        self.first_sample = None
+        self._transit = None
+
+    def stats(self):
+        expected = self.packets + self.lost
+        return {"packets": self.packets, "bytes": self.bytes, "lost": self.lost, "late": self.late,
+                "loss_rate": round(self.lost / expected, 4) if expected else 0.0,
+                "zero_filled": self.zero_filled, "resyncs": self.resyncs,
+                "jitter_ms": round(self.jitter * 1000, 3)}
+
+
+# ---------- Receiver ----------
+class AudioReceiver:
+    """
+    UDP audio receiver with no per-packet allocation: datagrams are read with
+    recv_into() into one preallocated buffer and handed to a sink as
+    memoryview slices. sink_factory(stream_id) creates the sink for each new
+    stream (anything with write(bytes-like)); raw, header-less packets use
+    stream id None.
+
+    With headers, lost packets are zero-filled so the sink stays
+    sample-aligned, late packets are dropped (their slot is already filled),
+    and loss and jitter are counted per stream.
+    """
+
+    def __init__(self, sink_factory, ip=UDP_IP, port=UDP_PORT, rate=RATE, rcvbuf=RCVBUF,
+                 max_gap_seconds=MAX_GAP_SECONDS):
+        self.sink_factory = sink_factory
+        self.address = (ip, port)
+        self.rate = rate
+        self.rcvbuf = rcvbuf
+        self.max_gap = int(rate * max_gap_seconds)
+        self.streams = {}
+        self.packets = 0
+        self.malformed = 0
+        self.sock = None
+        self._buf = bytearray(MAX_PACKET)
+        self._view = memoryview(self._buf)
+        self._zeros = memoryview(bytes(self.max_gap * SAMPLE_WIDTH))
+
+    def open(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        self.sock.bind(self.address)
+        self.sock.settimeout(0.5)
+        self.address = self.sock.getsockname()
+        # Linux doubles the request and caps it at net.core.rmem_max
+        self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        return self
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+    def serve(self, running):
+        """Receive until the running Event is cleared or the socket is closed."""
+        while running.is_set():
+            try:
+                n = self.sock.recv_into(self._buf)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.handle(self._view[:n], time.monotonic())
+
+    def _state(self, stream):
+        state = self.streams.get(stream)
+        if state is None:
+            state = self.streams[stream] = StreamState(self.sink_factory(stream))
+        return state
+
+    def handle(self, packet, arrival):
+        self.packets += 1
+        if len(packet) < HEADER.size or packet[:2] != MAGIC:
+            state = self._state(None)
+            state.packets += 1
+            state.bytes += len(packet)
+            state.sink.write(packet)
+            return
+
+        _, version, stream, seq, index = HEADER.unpack_from(packet)
+        payload = packet[HEADER.size:]
+        if version != VERSION or len(payload) % SAMPLE_WIDTH:
+            self.malformed += 1
+            return
+
+        state = self._state(stream)
+        state.packets += 1
+        state.bytes += len(payload)
+
+        if state.next_seq is not None:
+            ahead = (seq - state.next_seq) & 0xFFFFFFFF
+            behind = (state.next_seq - seq) & 0xFFFFFFFF
+            if 0 < behind <= MAX_SEQ_JUMP:
+                # Older than what we already played out: counted as lost earlier, drop it now
+                state.late += 1
+                state.lost = max(0, state.lost - 1)
+                return
+            if ahead <= MAX_SEQ_JUMP:
+                state.lost += ahead
+            else:
+                state.resyncs += 1
+                state.next_sample = state._transit = None
+        state.next_seq = (seq + 1) & 0xFFFFFFFF
+
+        transit = arrival - index / self.rate
+        if state._transit is not None:
+            state.jitter += (abs(transit - state._transit) - state.jitter) / 16
+        state._transit = transit
+
+        if state.next_sample is not None:
+            gap = index - state.next_sample
+            if 0 < gap <= self.max_gap:
+                state.sink.write(self._zeros[:gap * SAMPLE_WIDTH])
+                state.zero_filled += gap
+            elif gap != 0:
+                state.resyncs += 1
+        elif state.first_sample is None:
+            state.first_sample = index
+        state.sink.write(payload)
+        state.next_sample = index + len(payload) // SAMPLE_WIDTH
+
+    def stats(self):
+        return {"packets": self.packets, "malformed": self.malformed, "rcvbuf": self.rcvbuf,
+                "streams": {("raw" if k is None else k): s.stats() for k, s in self.streams.items()}}
+
+
+# ---------- WAV segments ----------
+class WavSegmentWriter:
+    """
+    Writes a stream into rolling WAV files of segment_seconds each and keeps
+    only the newest max_segments, so disk use is bounded. Audio is buffered
+    and written in flush_seconds blocks rather than per packet.
+
+    With latest_path, every finished segment is also swapped in atomically
+    at that path (e.g. received_audio.wav), so readers of a single file
+    always get the newest complete segment and never a half-written one.
+    """
+
+    def __init__(self, folder, prefix="stream", rate=RATE, segment_seconds=60, max_segments=10,
+                 flush_seconds=0.5, latest_path=None):
+        self.folder = folder
+        self.latest_path = latest_path
+        self.prefix = prefix
+        self.rate = rate
+        self.segment_frames = int(rate * segment_seconds)
+        self.max_segments = max_segments
+        self.flush_bytes = int(rate * flush_seconds) * SAMPLE_WIDTH
+        self.segments = deque()
+        self.segment_count = 0
+        self._pending = bytearray()
+        self._wav = None
+        self._frames = 0
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def write(self, data):
+        with self._lock:
+            self._pending += data
+            if len(self._pending) >= self.flush_bytes:
+                self._flush()
+
+    def _flush(self):
+        view = memoryview(self._pending)
+        offset = 0
+        while offset < len(view):
+            if self._wav is None:
+                self._open_segment()
+            room = (self.segment_frames - self._frames) * SAMPLE_WIDTH
+            with view[offset:offset + room] as chunk:    # released before _pending is resized
+                self._wav.writeframesraw(chunk)
+                self._frames += len(chunk) // SAMPLE_WIDTH
+                offset += len(chunk)
+            if self._frames >= self.segment_frames:
+                self._close_segment()
+        view.release()
+        del self._pending[:]
+
+    def _open_segment(self):
+        path = os.path.join(self.folder, f"{self.prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{self.segment_count:04d}.wav")
+        self.segment_count += 1
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(CHANNELS)
+        self._wav.setsampwidth(SAMPLE_WIDTH)
+        self._wav.setframerate(self.rate)
+        self._frames = 0
+        self.segments.append(path)
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.popleft()
+            if os.path.exists(oldest):
+                os.remove(oldest)
+
+    def _close_segment(self):
+        self._wav.close()   # patches the header with the final length
+        self._wav = None
+        if self.latest_path:
+            self._publish_latest(self.segments[-1])
+
+    def _publish_latest(self, path):
+        tmp = f"{self.latest_path}.{self.prefix}.tmp"
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            os.link(path, tmp)    # no copy; the data outlives the segment's rotation
+        except OSError:
+            shutil.copyfile(path, tmp)    # filesystems without hard links (FAT)
+        os.replace(tmp, self.latest_path)
+
+    def close(self):
+        with self._lock:
+            if self._pending:
+                self._flush()
+            if self._wav is not None:
+                self._close_segment()
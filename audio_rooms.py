@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from audio_relay import AudioReceiver, UDP_IP, RATE, SAMPLE_WIDTH
+from audio_gate import ActivityDetector
+from cpu_config import cpu_config
+from emotion_tracker import EmotionTracker
+from instrumentation import Histogram
+
+MAX_PENDING = 2       # windows queued per room before the oldest is dropped
+WORKERS = 2           # scoring threads; match the interpreter pool size
+
+
+# ---------- Per-room state ----------
+class Room:
+    """
+    One microphone (room or device): assembles its packets into model
+    windows and keeps its own activity gate and emotion history.
+    """
+
+    def __init__(self, device, score_fn, window_size, submit, gate=True):
+        self.device = device
+        self.window_size = window_size
+        self.tracker = EmotionTracker(score_fn, window_size, gate=ActivityDetector() if gate else None)
+        self.latency = Histogram()    # window complete -> scored
+        self.windows = 0
+        self.dropped = 0
+        self.result = None
+        self._submit = submit
+        self._buf = np.empty(window_size, dtype=np.int16)
+        self._fill = 0
+
+    def write(self, data):
+        """Sink for AudioReceiver: int16 bytes in, whole float32 windows out to the scheduler."""
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // SAMPLE_WIDTH)
+        while len(samples):
+            n = min(len(samples), self.window_size - self._fill)
+            self._buf[self._fill:self._fill + n] = samples[:n]
+            self._fill += n
+            samples = samples[n:]
+            if self._fill == self.window_size:
+                self._fill = 0
+                self.windows += 1
+                self._submit(self, self._buf.astype(np.float32) * (1 / 32768.0), time.monotonic())
+
+    def stats(self):
+        sound, emotion = self.result or (None, None)
+        return {"windows": self.windows, "scored": self.tracker.windows_scored,
+                "skipped": self.tracker.windows_skipped, "dropped": self.dropped,
+                "sound": sound, "emotion": emotion,
+                "latency_p95_ms": self.latency.percentile(95),
+                "latency_max_ms": round(self.latency.max * 1000, 1)}
+
+
+# ---------- Scheduler ----------
+class RoundRobinScheduler:
+    """
+    Bounded per-room window queues served in round-robin order, so one busy
+    or bursty room can't starve the others. When a room's queue is full its
+    oldest window is dropped (fresh audio matters more than a backlog).
+    A room handed out by take() is busy until done(room): its tracker isn't
+    thread-safe, so no two workers score the same room at once and its
+    windows are scored in order.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._queues = {}
+        self._turns = deque()    # idle rooms with pending windows, in serving order
+        self._busy = set()       # rooms a worker is scoring right now
+        self._ready = threading.Condition()
+        self._closed = False
+
+    def submit(self, room, window, ready_at):
+        with self._ready:
+            pending = self._queues.get(room)
+            if pending is None:
+                pending = self._queues[room] = deque()
+            if len(pending) >= self.max_pending:
+                pending.popleft()
+                room.dropped += 1
+            if not pending and room not in self._busy:
+                self._turns.append(room)
+            pending.append((window, ready_at))
+            self._ready.notify()
+
+    def take(self, timeout=None):
+        """Next (room, window, ready_at), or None on timeout or close. Call done(room) when finished."""
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._turns or self._closed, timeout) or not self._turns:
+                return None
+            room = self._turns.popleft()
+            window, ready_at = self._queues[room].popleft()
+            self._busy.add(room)
+            return room, window, ready_at
+
+    def done(self, room):
+        """Release a room taken with take(); it rejoins the rotation if more windows are waiting."""
+        with self._ready:
+            self._busy.discard(room)
+            if self._queues[room]:
+                self._turns.append(room)
+                self._ready.notify()
+
+    def pending(self):
+        with self._ready:
+            return sum(len(q) for q in self._queues.values())
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+
+# ---------- Multi-room audio ----------
+class RoomAudio:
+    """
+    Receives several microphone streams and scores them on a shared worker
+    pool. rooms maps device name -> (port, stream id); the stream id is the
+    audio_relay header's stream field, or None for plain PCM senders, so a
+    room is identified by its port, its header, or both.
+
+    score_fn(window) must be safe to call from several threads at once
+    (model_registry.InterpreterPool.score is). After each scored window
+    on_result(device, sound, emotion) is called from the worker thread.
+    """
+
+    def __init__(self, rooms, score_fn, window_size, on_result=None, ip=UDP_IP, rate=RATE,
+                 workers=WORKERS, max_pending=MAX_PENDING, gate=True):
+        self.scheduler = RoundRobinScheduler(max_pending)
+        self.on_result = on_result
+        self.workers = workers
+        self.rooms = {}
+        self.unknown = 0
+        self._routes = {}
+        for device, (port, stream) in rooms.items():
+            room = self.rooms[device] = Room(device, score_fn, window_size, self.scheduler.submit, gate)
+            self._routes[(port, stream)] = room
+        self.receivers = [AudioReceiver(self._sink_factory(port), ip, port, rate)
+                          for port in sorted({port for port, _ in rooms.values()})]
+        self._running = threading.Event()
+        self._threads = []
+
+    def _sink_factory(self, port):
+        def make_sink(stream):
+            room = self._routes.get((port, stream))
+            if room is None:
+                self.unknown += 1
+                print(f"[ROOMS] Ignoring unconfigured stream {stream} on port {port}")
+                return _Discard()
+            return room
+        return make_sink
+
+    def start(self):
+        for receiver in self.receivers:
+            receiver.open()
+        self._running.set()
+        self._threads = [threading.Thread(target=r.serve, args=(self._running,),
+                                          name=f"audio-rx-{r.address[1]}", daemon=True)
+                         for r in self.receivers]
+        self._threads += [threading.Thread(target=self._work, name=f"audio-worker-{i}", daemon=True)
+                          for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+        ports = ", ".join(str(r.address[1]) for r in self.receivers)
+        print(f"[ROOMS] {len(self.rooms)} room(s) on udp port(s) {ports}, {self.workers} worker(s)")
+        return self
+
+    def stop(self):
+        self._running.clear()
+        self.scheduler.close()
+        for t in self._threads:
+            t.join(timeout=2)
+        for receiver in self.receivers:
+            receiver.close()
+
+    def _work(self):
+        cpu_config.pin("audio")
+        while self._running.is_set():
+            job = self.scheduler.take(timeout=0.5)
+            if job is None:
+                continue
+            room, window, ready_at = job
+            try:
+                room.tracker.add_window(window)
+                room.latency.observe(time.monotonic() - ready_at)
+                room.result = room.tracker.current()
+                if self.on_result:
+                    self.on_result(room.device, *room.result)
+            except Exception as e:
+                print(f"[ROOMS] Scoring {room.device} failed:", e)
+            finally:
+                self.scheduler.done(room)
+
+    def stats(self):
+        return {"rooms": {device: room.stats() for device, room in self.rooms.items()},
+                "pending": self.scheduler.pending(), "unknown_streams": self.unknown,
+                "packets": sum(r.packets for r in self.receivers)}
+
+
+class _Discard:
+    def write(self, data):
+        pass
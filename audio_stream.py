@@ -0,0 +1,120 @@
+import threading
+import numpy as np
+from audio_relay import AudioReceiver, UDP_IP, UDP_PORT, SAMPLE_WIDTH
+from cpu_config import cpu_config
+
+
+# ---------- Ring Buffer ----------
+class AudioRingBuffer:
+    """Fixed-size int16 ring that hands out complete model windows as they fill."""
+
+    def __init__(self, window_size, capacity_windows=4, hop=None):
+        self.window_size = window_size
+        self.hop = hop or window_size
+        self.capacity = window_size * capacity_windows
+        self._buf = np.zeros(self.capacity, dtype=np.int16)
+        self._window = np.empty(window_size, dtype=np.float32)
+        self.written = 0    # total samples ever written
+        self.consumed = 0   # absolute index of the next unread window
+        self.dropped = 0    # samples overwritten before they were scored
+        self._ready = threading.Condition()
+
+    def write(self, data):
+        """Append raw little-endian int16 bytes, overwriting the oldest audio."""
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // SAMPLE_WIDTH)
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity:]
+        n = len(samples)
+
+        with self._ready:
+            pos = self.written % self.capacity
+            first = min(n, self.capacity - pos)
+            self._buf[pos:pos + first] = samples[:first]
+            self._buf[:n - first] = samples[first:]
+            self.written += n
+
+            # Reader fell more than a full ring behind: skip to the oldest audio we still have
+            if self.written - self.consumed > self.capacity:
+                oldest = self.written - self.capacity
+                self.dropped += oldest - self.consumed
+                self.consumed = oldest
+
+            if self.available() >= self.window_size:
+                self._ready.notify_all()
+
+    def available(self):
+        """Number of buffered samples not yet handed out."""
+        return self.written - self.consumed
+
+    def read_window(self, timeout=None):
+        """
+        Return the next full window as float32 in [-1, 1], or None on timeout.
+        The returned array is reused on the next call, so copy it if you keep it.
+        """
+        with self._ready:
+            if not self._ready.wait_for(lambda: self.available() >= self.window_size, timeout):
+                return None
+
+            start = self.consumed % self.capacity
+            first = min(self.window_size, self.capacity - start)
+            np.multiply(self._buf[start:start + first], 1 / 32768.0, out=self._window[:first])
+            np.multiply(self._buf[:self.window_size - first], 1 / 32768.0, out=self._window[first:])
+            self.consumed += self.hop
+        return self._window
+
+
+# ---------- UDP Stream ----------
+class AudioStream:
+    """
+    Receives the 16 kHz int16 UDP stream into an AudioRingBuffer and calls
+    on_window(chunk) from a scoring thread each time a full window is ready.
+    Packets go through audio_relay.AudioReceiver, so lost packets are
+    zero-filled and windows stay aligned.
+    """
+
+    def __init__(self, window_size, on_window, ip=UDP_IP, port=UDP_PORT, capacity_windows=4):
+        self.ring = AudioRingBuffer(window_size, capacity_windows)
+        self.on_window = on_window
+        self.receiver = AudioReceiver(lambda stream: self.ring, ip, port)
+        self._running = threading.Event()
+        self._threads = []
+
+    @property
+    def address(self):
+        return self.receiver.address
+
+    @property
+    def packets(self):
+        return self.receiver.packets
+
+    def start(self):
+        self.receiver.open()
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self.receiver.serve, args=(self._running,), name="audio-rx", daemon=True),
+            threading.Thread(target=self._score_loop, name="audio-score", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        print(f"[AUDIO] Streaming from udp://{self.address[0]}:{self.address[1]}")
+        return self
+
+    def stop(self):
+        self._running.clear()
+        for t in self._threads:
+            t.join(timeout=2)
+        self.receiver.close()
+
+    def stats(self):
+        return {**self.receiver.stats(), "dropped_samples": self.ring.dropped}
+
+    def _score_loop(self):
+        cpu_config.pin("audio")
+        while self._running.is_set():
+            chunk = self.ring.read_window(timeout=0.5)
+            if chunk is None:
+                continue
+            try:
+                self.on_window(chunk)
+            except Exception as e:
+                print("[AUDIO] Window scoring failed:", e)
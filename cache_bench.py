@@ -0,0 +1,77 @@
+import time
+import wave
+import numpy as np
+from PIL import Image, ImageDraw
+from camera_service import MODEL_SIZE, snapshot_paths
+from inference_cache import InferenceCache, content_hash, average_hash, difference_hash
+from model_registry import YAMNET_INPUT_SIZE
+
+# Key cost and hit rates for the inference cache.
+#  - audio: received_audio.wav in YAMNet windows, scored twice (the second
+#    pass is what a periodic re-score of an unchanged file costs)
+#  - images: a doorway replayed with sensor noise and small brightness
+#    drift, and the same doorway with a pet in it, at several tolerances.
+#    A pet frame that hits an empty-doorway entry is a false match.
+# Usage: python cache_bench.py
+
+TOLERANCES = (0, 2, 4, 8, 12)
+NOISY_COPIES = 30
+
+
+def time_us(fn, data, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def audio_windows(path="received_audio.wav"):
+    with wave.open(path, "rb") as wf:
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    n = len(audio) // YAMNET_INPUT_SIZE
+    return list(audio[:n * YAMNET_INPUT_SIZE].reshape(n, YAMNET_INPUT_SIZE))
+
+
+def doorway_frames(rng):
+    """(empty doorway frames, pet frames), each a noisy/drifting replay of the snapshots."""
+    empty, pets = [], []
+    for path in snapshot_paths():
+        base = Image.open(path).convert("RGB").resize(MODEL_SIZE)
+        with_pet = base.copy()
+        ImageDraw.Draw(with_pet).ellipse((70, 120, 150, 170), fill=(70, 50, 40))
+        for image, out in ((base, empty), (with_pet, pets)):
+            for _ in range(NOISY_COPIES):
+                frame = np.asarray(image, dtype=np.float32) * rng.uniform(0.95, 1.05)
+                frame += rng.normal(0, 4, frame.shape)
+                out.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return empty, pets
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    windows = audio_windows()
+    empty, pets = doorway_frames(rng)
+
+    print("key cost")
+    print(f"  content_hash  YAMNet window ({YAMNET_INPUT_SIZE} floats)  {time_us(content_hash, windows[0]):7.1f} us")
+    print(f"  content_hash  224x224 frame                 {time_us(content_hash, empty[0]):7.1f} us")
+    print(f"  average_hash  224x224 frame                 {time_us(average_hash, empty[0]):7.1f} us")
+    print(f"  difference_hash 224x224 frame               {time_us(difference_hash, empty[0]):7.1f} us")
+
+    cache = InferenceCache("yamnet")
+    for window in windows + windows:
+        cache.lookup(window, lambda w: np.zeros(521, dtype=np.float32))
+    s = cache.stats()
+    print(f"\naudio: {len(windows)} windows scored twice -> {s['hits']} hits, {s['misses']} misses "
+          f"(hit rate {s['hit_rate'] * 100:.0f}%)")
+
+    print("\nimages: empty doorway replays vs pet frames")
+    print("  hash  tolerance  empty hit rate  false matches (pet -> empty verdict)")
+    for name, key_fn in (("aHash", average_hash), ("dHash", difference_hash)):
+        for tolerance in TOLERANCES:
+            cache = InferenceCache("pet", key_fn, tolerance=tolerance)
+            for frame in empty:
+                cache.lookup(frame, lambda f: "empty")
+            empty_rate = cache.stats()["hit_rate"]
+            false = sum(cache.lookup(frame, lambda f: "pet") == "empty" for frame in pets)
+            print(f"  {name}  {tolerance:9d}  {empty_rate * 100:13.0f}%  {false:4d}/{len(pets)}")
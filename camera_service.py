@@ -0,0 +1,159 @@
+import glob
+import os
+import threading
+import time
+import numpy as np
+from PIL import Image
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_PATTERN = os.path.join(SNAPSHOT_DIR, "**", "*.jpg")   # day folders and the old flat layout
+CAPTURE_SIZE = (640, 480)   # full-resolution stream used for snapshots
+MODEL_SIZE = (224, 224)     # MobileNet input size
+
+
+def snapshot_paths(pattern=SNAPSHOT_PATTERN):
+    """Sorted JPEGs matching pattern (** reaches into subfolders), without SnapshotStore's thumbnails."""
+    return sorted(path for path in glob.glob(pattern, recursive=True) if not path.endswith("_thumb.jpg"))
+
+
+# ---------- Frame Ring ----------
+class FrameRing:
+    """Preallocated ring holding the last N frames at model resolution."""
+
+    def __init__(self, size=8, frame_size=MODEL_SIZE):
+        width, height = frame_size
+        self.frames = np.zeros((size, height, width, 3), dtype=np.uint8)
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def push(self, image, timestamp):
+        """Copy a PIL image of frame_size into the next slot."""
+        with self._lock:
+            slot = self.count % len(self.frames)
+            self.frames[slot] = np.asarray(image)
+            self.timestamps[slot] = timestamp
+            self.count += 1
+
+    def latest(self):
+        """Return (frame copy, timestamp) of the newest frame, or (None, 0.0)."""
+        with self._lock:
+            if self.count == 0:
+                return None, 0.0
+            slot = (self.count - 1) % len(self.frames)
+            return self.frames[slot].copy(), self.timestamps[slot]
+
+
+# ---------- Frame Sources ----------
+class PiCameraSource:
+    """Picamera2 started once and kept running."""
+
+    def __init__(self, size=CAPTURE_SIZE):
+        self.size = size
+        self.picam2 = None
+
+    def start(self):
+        from picamera2 import Picamera2
+        self.picam2 = Picamera2()
+        config = self.picam2.create_video_configuration(main={"size": self.size, "format": "RGB888"})
+        self.picam2.configure(config)
+        self.picam2.start()
+        time.sleep(2)  # one-time warm-up
+
+    def read(self):
+        # RGB888 is stored BGR in memory; flip to RGB for PIL/MobileNet
+        return self.picam2.capture_array("main")[..., ::-1]
+
+    def stop(self):
+        if self.picam2:
+            self.picam2.stop()
+            self.picam2.close()
+
+
+class FakeFrameSource:
+    """Replays JPEGs (default: the saved snapshots, or a list of patterns) in a loop, for running without a camera."""
+
+    def __init__(self, pattern=SNAPSHOT_PATTERN, fps=5):
+        patterns = [pattern] if isinstance(pattern, str) else pattern
+        self.paths = sorted(path for p in patterns for path in snapshot_paths(p))
+        if not self.paths:
+            raise FileNotFoundError(f"No images match {pattern}")
+        self.interval = 1.0 / fps
+        self.images = []
+        self.index = 0
+        self._last = 0.0
+
+    def start(self):
+        self.images = [np.asarray(Image.open(p).convert("RGB")) for p in self.paths]
+
+    def read(self):
+        # Pace like a real camera so consumers see realistic frame timing
+        wait = self._last + self.interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last = time.monotonic()
+        frame = self.images[self.index % len(self.images)]
+        self.index += 1
+        return frame
+
+    def stop(self):
+        pass
+
+
+# ---------- Camera Service ----------
+class CameraService:
+    """
+    Keeps one frame source running on a background thread, downscales every
+    frame into a FrameRing at model resolution, and keeps the newest
+    full-resolution frame for snapshots (written by SnapshotStore).
+    """
+
+    def __init__(self, source=None, ring_size=8, model_size=MODEL_SIZE):
+        self.source = source or PiCameraSource()
+        self.model_size = model_size
+        self.ring = FrameRing(ring_size, model_size)
+        self._full_frame = None
+        self._new_frame = threading.Condition()
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.source.start()
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture_loop, name="camera", daemon=True)
+        self._thread.start()
+        print("[CAMERA] Service started")
+        return self
+
+    def stop(self):
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self.source.stop()
+
+    def _capture_loop(self):
+        while self._running.is_set():
+            try:
+                frame = self.source.read()
+            except Exception as e:
+                print("[CAMERA] Capture failed:", e)
+                time.sleep(0.5)
+                continue
+            small = Image.fromarray(frame).resize(self.model_size, Image.BILINEAR)
+            with self._new_frame:
+                self._full_frame = frame
+                self.ring.push(small, time.time())
+                self._new_frame.notify_all()
+
+    def latest_frame(self, timeout=2.0):
+        """Newest frame at model resolution (uint8 HxWx3); waits for the first one."""
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self.ring.count > 0, timeout)
+        frame, _ = self.ring.latest()
+        return frame
+
+    def full_frame(self, timeout=2.0):
+        """Newest full-resolution frame (uint8 HxWx3), or None if none arrived within timeout."""
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._full_frame is not None, timeout)
+            return self._full_frame
@@ -0,0 +1,131 @@
+import os
+from contextlib import contextmanager
+import tflite_runtime.interpreter as tflite
+
+# Interpreter threading and core pinning, set per deployment through
+# environment variables (no code edits):
+#   AUDIO_CORES / VISION_CORES  cores for the audio and vision workers, e.g.
+#                   "0,1" and "2-3"; "" turns pinning off for that group.
+#                   Default: the available cores split in half, audio on the
+#                   lower half; no pinning with fewer than two cores.
+#   MODEL_THREADS   interpreter threads per model, e.g. "pet=2,yamnet=1".
+#                   Default: pet uses every vision core, or one thread when
+#                   vision isn't pinned (it would share every core with the
+#                   audio workers); the audio models use one each, since the
+#                   YAMNet pool already scores windows in parallel.
+#   XNNPACK         "0" to use the builtin kernels only; by default the
+#                   XNNPACK delegate is applied wherever the runtime has it.
+# A model never gets more threads than its group has cores (divided among
+# the interpreters that share them), so the groups don't oversubscribe.
+
+MODEL_GROUPS = {"pet": "vision", "yamnet": "audio", "vggish": "audio"}
+DEFAULT_THREADS = {"yamnet": 1, "vggish": 1}
+
+
+def parse_cores(text):
+    """"0,1" / "2-3" / "0,2-3" -> [0, 1] / [2, 3] / [0, 2, 3]; "" -> None."""
+    cores = []
+    for part in text.replace(" ", "").split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cores += range(int(first), int(last) + 1)
+        elif part:
+            cores.append(int(part))
+    return sorted(set(cores)) or None
+
+
+def parse_threads(text):
+    """"pet=2,yamnet=1" -> {"pet": 2, "yamnet": 1}."""
+    threads = {}
+    for part in text.replace(" ", "").split(","):
+        if part:
+            name, n = part.split("=")
+            threads[name] = max(1, int(n))
+    return threads
+
+
+class CpuConfig:
+    """Which cores each worker group runs on and how many threads each interpreter gets."""
+
+    def __init__(self, groups, threads=None, xnnpack=True):
+        available = set(os.sched_getaffinity(0))
+        self.groups = {}
+        for group, cores in groups.items():
+            if cores is not None:
+                cores = [c for c in cores if c in available] or None
+            self.groups[group] = cores
+        self.threads = dict(threads or {})
+        self._warned = set()
+        # OpResolverType.AUTO applies XNNPACK where the runtime was built with it
+        self.xnnpack = xnnpack and hasattr(tflite, "OpResolverType")
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        available = sorted(os.sched_getaffinity(0))
+        half = len(available) // 2
+        defaults = {"audio": available[:half], "vision": available[half:]} if half else {}
+        groups = {}
+        for group in ("audio", "vision"):
+            variable = f"{group.upper()}_CORES"
+            groups[group] = parse_cores(environ[variable]) if variable in environ else defaults.get(group)
+        return cls(groups, parse_threads(environ.get("MODEL_THREADS", "")), environ.get("XNNPACK", "1") != "0")
+
+    def cores(self, group):
+        """Cores of a worker group (or of a model's group), None when it isn't pinned."""
+        return self.groups.get(MODEL_GROUPS.get(group, group))
+
+    def threads_for(self, model, instances=1):
+        """Interpreter threads for model when instances interpreters of it run side by side."""
+        cores = self.cores(model)
+        # Unpinned, the model's threads would compete with the other group for the same cores
+        default = len(cores) if cores else 1
+        cores = cores or sorted(os.sched_getaffinity(0))
+        budget = max(1, len(cores) // instances)
+        wanted = self.threads.get(model, DEFAULT_THREADS.get(model, default))
+        if wanted > budget and (model, instances) not in self._warned:
+            self._warned.add((model, instances))
+            print(f"[CPU] {model}: {wanted} threads x {instances} interpreter(s) won't fit "
+                  f"{len(cores)} core(s); using {budget}")
+        return min(wanted, budget)
+
+    def interpreter_options(self, model, instances=1):
+        """Keyword arguments for tflite.Interpreter."""
+        options = {"num_threads": self.threads_for(model, instances)}
+        if hasattr(tflite, "OpResolverType"):
+            options["experimental_op_resolver_type"] = (
+                tflite.OpResolverType.AUTO if self.xnnpack
+                else tflite.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES)
+        return options
+
+    def pin(self, group):
+        """Pin the calling thread to a group's cores (no-op when the group isn't pinned)."""
+        cores = self.cores(group)
+        if cores:
+            os.sched_setaffinity(0, cores)
+
+    @contextmanager
+    def pinned(self, group):
+        """
+        Run the block on a group's cores, then restore the thread's affinity.
+        Threads started inside (e.g. an interpreter's thread pool) keep the
+        group's cores.
+        """
+        cores = self.cores(group)
+        if not cores:
+            yield
+            return
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, cores)
+        try:
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
+
+    def summary(self):
+        groups = ", ".join(f"{g} on {c if c else 'any core'}" for g, c in self.groups.items())
+        threads = ", ".join(f"{m}={self.threads_for(m)}" for m in MODEL_GROUPS)
+        return f"{groups or 'no pinning'} | threads {threads} | XNNPACK {'on' if self.xnnpack else 'off'}"
+
+
+# Shared configuration used by the model registry and the worker threads
+cpu_config = CpuConfig.from_env()
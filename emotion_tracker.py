@@ -0,0 +1,96 @@
+import os
+import threading
+import wave
+from collections import deque
+import numpy as np
+
+SOUND_MAP = {0: "bark", 1: "meow", 2: "whine", 3: "growl"}
+EMOTION_MAP = {"bark": "Hungry", "whine": "Anxious", "growl": "Angry"}
+NO_EVENT = ("silence", "No event")
+
+
+def scores_to_emotion(scores):
+    """Map YAMNet scores to (sound, emotion)."""
+    sound = SOUND_MAP.get(int(np.argmax(scores)), "unknown")
+    return sound, EMOTION_MAP.get(sound, "Happy")
+
+
+class EmotionTracker:
+    """
+    Keeps a rolling window of recent YAMNet score vectors and, for WAV files,
+    a per-file cursor so each call only scores audio that was appended since
+    the previous one.
+
+    With a gate (audio_gate.ActivityDetector), silent windows are not scored:
+    they take a slot in the history as "no event", so old events still age
+    out, but they are left out of the averaged scores.
+    """
+
+    def __init__(self, score_fn, window_size, history=6, gate=None):
+        self.score_fn = score_fn
+        self.window_size = window_size
+        self.gate = gate
+        self.scores = deque(maxlen=history)   # score vectors, None for silent windows
+        self.cursors = {}   # path -> (inode, number of frames already scored)
+        self.windows_scored = 0
+        self.windows_skipped = 0
+        self._lock = threading.Lock()
+
+    def add_window(self, chunk):
+        """Score one float32 window and add it to the rolling history (None if it was silent)."""
+        if self.gate is not None and not self.gate.is_active(chunk):
+            with self._lock:
+                self.scores.append(None)
+                self.windows_skipped += 1
+            return None
+
+        scores = np.array(self.score_fn(chunk), dtype=np.float32)
+        with self._lock:
+            self.scores.append(scores)
+            self.windows_scored += 1
+        return scores
+
+    def update_from_wav(self, audio_path):
+        """Score only the complete windows appended to audio_path since the last call."""
+        try:
+            f = open(audio_path, 'rb')
+        except FileNotFoundError:
+            return 0
+
+        with f, wave.open(f) as wf:
+            inode = os.fstat(f.fileno()).st_ino
+            total = wf.getnframes()
+            seen, cursor = self.cursors.get(audio_path, (inode, 0))
+            if seen != inode or total < cursor:
+                # Replaced (the receiver swaps in each finished segment) or truncated: start over
+                cursor = 0
+
+            n_windows = (total - cursor) // self.window_size
+            if n_windows == 0:
+                self.cursors[audio_path] = (inode, cursor)
+                return 0
+
+            # Older windows would be pushed out of the history anyway
+            skip = max(0, n_windows - self.scores.maxlen)
+            cursor += skip * self.window_size
+            wf.setpos(cursor)
+            frames = wf.readframes((n_windows - skip) * self.window_size)
+
+        audio_data = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
+        audio_data *= 1 / 32768.0  # normalize to [-1,1]
+        for start in range(0, len(audio_data), self.window_size):
+            self.add_window(audio_data[start:start + self.window_size])
+
+        self.cursors[audio_path] = (inode, cursor + len(audio_data))
+        return n_windows - skip
+
+    def current(self):
+        """Return (sound, emotion) averaged over the non-silent windows in the history."""
+        with self._lock:
+            if not self.scores:
+                return "unknown", "unknown"
+            active = [scores for scores in self.scores if scores is not None]
+            if not active:
+                return NO_EVENT
+            avg_scores = np.mean(active, axis=0)
+        return scores_to_emotion(avg_scores)
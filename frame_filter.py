@@ -0,0 +1,150 @@
+import time
+import numpy as np
+from PIL import Image
+
+DIFF_SIZE = (56, 56)        # grayscale working resolution (w, h) for the comparison
+PIXEL_THRESHOLD = 25        # grey-level change (0-255) that marks a pixel as changed
+CHANGE_FRACTION = 0.02      # changed-pixel fraction above which the scene counts as moved
+BACKGROUND_ALPHA = 0.1      # running-average learning rate of the background model
+ROI_MARGIN = 0.1            # padding around the changed region, as a fraction of the frame
+MAX_VERDICT_AGE = 60.0      # seconds a cached verdict may be reused on a static scene
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+# ---------- Frame Difference ----------
+class FrameDiffFilter:
+    """
+    Cheap change detector for camera frames. Each frame is subsampled to a
+    small grayscale image and compared against a running-average background;
+    pixels that differ by more than pixel_threshold count as changed. All
+    work buffers are preallocated, so a check is a handful of NumPy ufuncs on
+    a 56x56 image.
+    """
+
+    def __init__(self, size=DIFF_SIZE, pixel_threshold=PIXEL_THRESHOLD, change_fraction=CHANGE_FRACTION,
+                 alpha=BACKGROUND_ALPHA, roi_margin=ROI_MARGIN):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.change_fraction = change_fraction
+        self.alpha = alpha
+        self.roi_margin = roi_margin
+        width, height = size
+        self._gray = np.empty((height, width), dtype=np.float32)
+        self._diff = np.empty((height, width), dtype=np.float32)
+        self._mask = np.empty((height, width), dtype=bool)
+        self.background = None
+
+    def _grayscale(self, frame):
+        """Subsample an HxWx3 uint8 frame by striding and convert to luma in place."""
+        height, width = frame.shape[:2]
+        step_y, step_x = max(1, height // self.size[1]), max(1, width // self.size[0])
+        small = frame[:step_y * self.size[1]:step_y, :step_x * self.size[0]:step_x]
+        if small.shape[:2] != self._gray.shape:
+            small = np.asarray(Image.fromarray(frame).resize(self.size, Image.NEAREST))
+        np.dot(small, _LUMA, out=self._gray)
+        return self._gray
+
+    def check(self, frame):
+        """
+        Return (changed, fraction, roi) for one frame. roi is an (x0, y0, x1, y1)
+        box in frame pixels around the changed area, or None when nothing changed.
+        The first frame seeds the background and always counts as changed.
+        """
+        gray = self._grayscale(frame)
+        if self.background is None:
+            self.background = gray.copy()
+            return True, 1.0, None
+
+        np.subtract(gray, self.background, out=self._diff)
+        np.abs(self._diff, out=self._diff)
+        np.greater(self._diff, self.pixel_threshold, out=self._mask)
+        fraction = np.count_nonzero(self._mask) / self._mask.size
+
+        # background += alpha * (gray - background), without temporaries
+        np.subtract(gray, self.background, out=self._diff)
+        self._diff *= self.alpha
+        self.background += self._diff
+
+        if fraction < self.change_fraction:
+            return False, fraction, None
+        return True, fraction, self._roi(frame.shape)
+
+    def matches(self, reference):
+        """True when the last checked frame is within change_fraction of a saved snapshot()."""
+        np.subtract(self._gray, reference, out=self._diff)
+        np.abs(self._diff, out=self._diff)
+        np.greater(self._diff, self.pixel_threshold, out=self._mask)
+        return np.count_nonzero(self._mask) / self._mask.size < self.change_fraction
+
+    def snapshot(self, out=None):
+        """Copy of the last checked frame's grayscale image (into out if given)."""
+        if out is None:
+            return self._gray.copy()
+        np.copyto(out, self._gray)
+        return out
+
+    def _roi(self, shape):
+        rows = np.flatnonzero(self._mask.any(axis=1))
+        cols = np.flatnonzero(self._mask.any(axis=0))
+        height, width = shape[:2]
+        scale_y, scale_x = height / self._mask.shape[0], width / self._mask.shape[1]
+        pad_y, pad_x = int(height * self.roi_margin), int(width * self.roi_margin)
+        return (max(0, int(cols[0] * scale_x) - pad_x), max(0, int(rows[0] * scale_y) - pad_y),
+                min(width, int((cols[-1] + 1) * scale_x) + pad_x), min(height, int((rows[-1] + 1) * scale_y) + pad_y))
+
+    def reset(self):
+        self.background = None
+
+
+# ---------- Gated Detector ----------
+class GatedPetDetector:
+    """
+    Puts a FrameDiffFilter in front of a classifier (predict(frame) -> pet
+    probability, e.g. PetDetector.predict). The last verdict is
+    reused (for up to max_age seconds) while the scene is static, or still
+    looks like the frame that verdict came from while the background catches
+    up. Otherwise MobileNet runs on the changed region (use_roi) or the whole
+    frame.
+    """
+
+    def __init__(self, predict, frame_filter=None, use_roi=True, max_age=MAX_VERDICT_AGE, clock=time.monotonic):
+        self.classify = predict
+        self.filter = frame_filter or FrameDiffFilter()
+        self.use_roi = use_roi
+        self.max_age = max_age
+        self.clock = clock
+        self.frames = 0
+        self.skipped = 0
+        self.last_roi = None
+        self._verdict = None       # (probability, time)
+        self._reference = None     # grayscale of the frame the verdict came from
+
+    def predict(self, frame):
+        """Pet probability for a uint8 frame, running MobileNet only when needed."""
+        self.frames += 1
+        changed, _, roi = self.filter.check(frame)
+        now = self.clock()
+        if self._verdict is not None and now - self._verdict[1] < self.max_age:
+            if not changed or self.filter.matches(self._reference):
+                self.skipped += 1
+                return self._verdict[0]
+
+        self.last_roi = roi
+        probability = self.classify(self._crop(frame, roi))
+        self._verdict = (probability, now)
+        self._reference = self.filter.snapshot(self._reference)
+        return probability
+
+    def _crop(self, frame, roi):
+        if not self.use_roi or roi is None:
+            return frame
+        x0, y0, x1, y1 = roi
+        if (x1 - x0) * (y1 - y0) >= 0.8 * frame.shape[0] * frame.shape[1]:
+            return frame
+        # PetDetector scales the crop up to model resolution itself
+        return np.ascontiguousarray(frame[y0:y1, x0:x1])
+
+    def stats(self):
+        return {"frames": self.frames, "skipped": self.skipped,
+                "skip_rate": round(self.skipped / self.frames, 3) if self.frames else 0.0}
@@ -0,0 +1,72 @@
+import glob
+import sys
+import time
+import numpy as np
+from PIL import Image
+from frame_filter import FrameDiffFilter, GatedPetDetector
+from model_registry import registry
+from pet_detector import PetDetector
+
+# Builds a camera-like sequence from snapshots/*.jpg and compares MobileNet on
+# every frame against the frame-difference pre-filter:
+#   - each snapshot is held for HOLD frames with sensor noise (static scene)
+#   - then a patch of the next snapshot moves across it (something walks in)
+# Usage: python frame_filter_bench.py [frames held per scene]
+
+HOLD = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+NOISE = 3.0          # camera noise, grey levels (std)
+PATCH = 64           # side of the moving patch in pixels
+MOVE_FRAMES = 10
+SIZE = (224, 224)
+
+
+def build_sequence(seed=3):
+    rng = np.random.default_rng(seed)
+    paths = sorted(glob.glob("snapshots/*.jpg")) + sorted(glob.glob("test_*.jpg"))
+    scenes = [np.asarray(Image.open(p).convert("RGB").resize(SIZE, Image.BILINEAR)) for p in paths]
+
+    def noisy(image):
+        return np.clip(image + rng.normal(0, NOISE, image.shape), 0, 255).astype(np.uint8)
+
+    frames = []
+    for index, scene in enumerate(scenes):
+        frames += [noisy(scene) for _ in range(HOLD)]
+        intruder = scenes[(index + 1) % len(scenes)][:PATCH, :PATCH]
+        for step in range(MOVE_FRAMES):
+            frame = scene.copy()
+            x = step * (SIZE[0] - PATCH) // (MOVE_FRAMES - 1)
+            frame[80:80 + PATCH, x:x + PATCH] = intruder
+            frames.append(noisy(frame))
+    return frames
+
+
+def run(predict, frames):
+    probabilities, times = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        probabilities.append(predict(frame))
+        times.append(time.perf_counter() - start)
+    return np.array(probabilities), np.array(times) * 1000
+
+
+if __name__ == "__main__":
+    frames = build_sequence()
+    detector = registry.get("pet").adapter(PetDetector)
+    detector.predict(frames[0])   # warm-up
+
+    baseline, baseline_ms = run(detector.predict, frames)
+    gated = GatedPetDetector(detector.predict)
+    filtered, filtered_ms = run(gated.predict, frames)
+
+    diff_filter = FrameDiffFilter()
+    _, filter_ms = run(lambda frame: diff_filter.check(frame)[1], frames)
+
+    deviation = np.abs(filtered - baseline)
+    stats = gated.stats()
+    print(f"{len(frames)} frames ({HOLD} static frames per scene, {MOVE_FRAMES}-frame moving patch)")
+    print(f"MobileNet every frame: mean {baseline_ms.mean():6.2f} ms  p95 {np.percentile(baseline_ms, 95):6.2f} ms")
+    print(f"with pre-filter:       mean {filtered_ms.mean():6.2f} ms  p95 {np.percentile(filtered_ms, 95):6.2f} ms")
+    print(f"filter alone:          mean {filter_ms.mean():6.3f} ms")
+    print(f"Skipped {stats['skipped']}/{stats['frames']} invokes (skip rate {stats['skip_rate'] * 100:.1f}%), "
+          f"latency saved {100 * (1 - filtered_ms.sum() / baseline_ms.sum()):.1f}%")
+    print(f"Pet probability vs every-frame run: mean |diff| {deviation.mean():.3f}, max {deviation.max():.3f}")
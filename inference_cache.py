@@ -0,0 +1,139 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+from pet_detector import load_frame
+
+CACHE_ENTRIES = 256      # results kept per model
+CACHE_TTL = 300.0        # seconds a result may be reused
+IMAGE_TOLERANCE = 4      # hash bits (of 64) two frames may differ by and still share a result
+HASH_SIZE = 8            # perceptual hashes work on an 8x8 (dHash: 9x8) grayscale thumbnail
+
+
+# ---------- Keys ----------
+def content_hash(data):
+    """Exact 128-bit hash of an array's bytes (or a file path's contents)."""
+    if isinstance(data, str):
+        with open(data, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    return hashlib.blake2b(np.ascontiguousarray(data), digest_size=16).digest()
+
+
+def _thumbnail(image, size):
+    """Grayscale float32 thumbnail of a uint8 HxWx3 frame or an image path."""
+    if isinstance(image, str):
+        image = load_frame(image, size)
+    # Stride down to ~4x the thumbnail first; the resize then only averages a few pixels
+    step_y, step_x = max(1, image.shape[0] // (size[1] * 4)), max(1, image.shape[1] // (size[0] * 4))
+    small = np.ascontiguousarray(image[::step_y, ::step_x])
+    return np.asarray(Image.fromarray(small).convert("L").resize(size, Image.BILINEAR), dtype=np.float32)
+
+
+def _pack(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def average_hash(image, size=HASH_SIZE):
+    """aHash: one bit per thumbnail pixel, set when it is brighter than the mean."""
+    thumb = _thumbnail(image, (size, size))
+    return _pack(thumb > thumb.mean())
+
+
+def difference_hash(image, size=HASH_SIZE):
+    """dHash: one bit per horizontal neighbour pair, set when brightness increases."""
+    thumb = _thumbnail(image, (size + 1, size))
+    return _pack(thumb[:, 1:] > thumb[:, :-1])
+
+
+# ---------- Cache ----------
+class InferenceCache:
+    """
+    LRU cache of model results keyed by a hash of the input, with a size
+    limit and a TTL. With an integer (perceptual) key and tolerance > 0, an
+    exact miss falls back to the nearest cached key within tolerance bits
+    (Hamming distance), so near-identical frames share one result.
+
+    Cached arrays are made read-only; copy them before modifying.
+    """
+
+    def __init__(self, name, key_fn=content_hash, max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, tolerance=0,
+                 clock=time.monotonic):
+        self.name = name
+        self.key_fn = key_fn
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.tolerance = tolerance
+        self.clock = clock
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()    # key -> (result, time stored), least recently used first
+        self._lock = threading.Lock()
+
+    def lookup(self, data, compute):
+        """Cached result for data, or compute(data) stored for next time."""
+        key = self.key_fn(data)
+        found, result = self.get(key)
+        if found:
+            return result
+        result = compute(data)
+        self.put(key, result)
+        return result
+
+    def get(self, key):
+        """(True, result) for a fresh entry matching key, else (False, None)."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] >= self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None and self.tolerance and isinstance(key, int):
+                key, entry = self._nearest(key, now)
+                if entry is not None:
+                    self.near_hits += 1
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def _nearest(self, key, now):
+        best, best_distance = None, self.tolerance + 1
+        for other, (_, stored) in self._entries.items():
+            if now - stored < self.ttl:
+                distance = (key ^ other).bit_count()
+                if distance < best_distance:
+                    best, best_distance = other, distance
+        return (best, self._entries[best]) if best is not None else (None, None)
+
+    def put(self, key, result):
+        if isinstance(result, np.ndarray):
+            result = result.copy()
+            result.flags.writeable = False
+        with self._lock:
+            self._entries[key] = (result, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "near_hits": self.near_hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+
+# Shared caches used by the main scripts and the test scripts
+pet_cache = InferenceCache("pet", difference_hash, tolerance=IMAGE_TOLERANCE)
+audio_cache = InferenceCache("yamnet", content_hash)
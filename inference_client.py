@@ -0,0 +1,199 @@
+import json
+import os
+import socket
+import struct
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+
+# Client side of inference_server.py. Requests and replies are small JSON
+# messages on a Unix socket; the tensors themselves go through a shared
+# memory segment owned by each connection, so a frame or audio window is
+# written once by the client and read in place by the server.
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET", "/tmp/petcare-inference.sock")
+SHM_SIZE = 1 << 20        # initial segment size; grown on demand for larger inputs
+
+_LENGTH = struct.Struct("!I")
+
+
+# ---------- Framing ----------
+def send_message(sock, message):
+    body = json.dumps(message).encode()
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def recv_message(sock):
+    """Next message, or None when the peer closed the connection."""
+    header = _recv_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    body = _recv_exact(sock, _LENGTH.unpack(header)[0])
+    return None if body is None else json.loads(body)
+
+
+def _recv_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+# ---------- Client ----------
+class _Connection:
+    """One socket plus the shared memory segment its requests use."""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.shm = None
+        try:
+            self.sock.connect(path)
+            self.models = self._attach(SHM_SIZE)
+        except Exception:
+            self.close()    # don't leak the segment when the handshake fails
+            raise
+
+    def _attach(self, size):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        send_message(self.sock, {"op": "attach", "shm": self.shm.name, "size": size})
+        return self._reply()["models"]
+
+    def _reply(self):
+        reply = recv_message(self.sock)
+        if reply is None:
+            raise ConnectionError("Inference server closed the connection")
+        if "error" in reply:
+            raise RuntimeError(f"Inference server: {reply['error']}")
+        return reply
+
+    def infer(self, model, data):
+        data = np.ascontiguousarray(data)
+        if data.nbytes > self.shm.size:
+            self._attach(max(data.nbytes, 2 * self.shm.size))
+        view = np.ndarray(data.shape, data.dtype, buffer=self.shm.buf)
+        view[...] = data
+        del view
+        send_message(self.sock, {"op": "infer", "model": model, "shape": list(data.shape),
+                                 "dtype": data.dtype.str})
+        reply = self._reply()
+        if "value" in reply:
+            return reply["value"]
+        # Copy out: the segment is reused by the next request
+        out = np.ndarray(reply["shape"], np.dtype(reply["dtype"]), buffer=self.shm.buf)
+        result = out.copy()
+        del out
+        return result
+
+    def request(self, message):
+        send_message(self.sock, message)
+        return self._reply()
+
+    def close(self):
+        self.sock.close()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class InferenceClient:
+    """
+    Talks to a running inference_server.py. Each thread gets its own
+    connection (and shared memory segment), so requests from several threads
+    can be batched together by the server instead of queueing here.
+    """
+
+    def __init__(self, path=INFERENCE_SOCKET):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = _Connection(self.path)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @property
+    def models(self):
+        """{model: {"input_shape": [...], "input_dtype": "..."}} for the models the server hosts."""
+        return self._connection().models
+
+    def infer(self, model, data):
+        """Run one input through a hosted model; returns its first output row."""
+        return self._connection().infer(model, data)
+
+    def pet_probability(self, image):
+        """Pet probability for a uint8 HxWx3 frame or an image path."""
+        _, height, width, _ = self.models["pet"]["input_shape"]
+        if isinstance(image, str):
+            from pet_detector import load_frame    # PIL only for clients that pass paths
+            image = load_frame(image, (width, height))
+        return self.infer("pet", image)
+
+    def score_audio(self, window):
+        """YAMNet score vector for one float32 window."""
+        return self.infer("yamnet", np.asarray(window, dtype=np.float32))
+
+    def stats(self):
+        return self._connection().request({"op": "stats"})
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+def connect(path=INFERENCE_SOCKET):
+    """An InferenceClient if a working server is listening on path, else None (run models in-process)."""
+    if not os.path.exists(path):
+        return None
+    client = InferenceClient(path)
+    try:
+        client.models
+    except (OSError, ValueError, KeyError, TypeError, RuntimeError) as e:
+        # Stale socket, refused connection, or a handshake reply we can't use
+        print(f"[INFER] No usable inference server at {path} ({e}); running models in-process")
+        client.close()
+        return None
+    return client
+
+
+# ---------- Drop-in helpers ----------
+# Same signatures as the functions in Lastmain.py / main_LCD.py, backed by the server.
+_client = None
+_tracker = None
+
+
+def _default_client():
+    global _client
+    if _client is None:
+        _client = InferenceClient()
+    return _client
+
+
+def is_pet_in_image(image, threshold=0.5):
+    """Run MobileNet on a camera frame or an image path via the inference server."""
+    return _default_client().pet_probability(image) > threshold
+
+
+def predict_sound_emotion(audio_path="received_audio.wav"):
+    """Run YAMNet on the new audio in audio_path via the inference server; returns the emotion."""
+    global _tracker
+    client = _default_client()
+    if _tracker is None:
+        from emotion_tracker import EmotionTracker
+        _tracker = EmotionTracker(client.score_audio, client.models["yamnet"]["input_shape"][0])
+    _tracker.update_from_wav(audio_path)
+    _, emotion = _tracker.current()
+    return emotion
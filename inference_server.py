@@ -0,0 +1,248 @@
+import os
+import queue
+import signal
+import socketserver
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from cpu_config import cpu_config
+from inference_client import send_message, recv_message, INFERENCE_SOCKET
+from instrumentation import Histogram
+from localization import BatchPetDetector
+from model_registry import registry
+
+# Inference daemon: hosts one set of interpreters (MobileNet pet, YAMNet,
+# VGGish, whichever model files are present) for every script on the Pi.
+# Clients (inference_client.py) connect over a Unix socket and pass tensors
+# through shared memory. Requests that arrive while a model is busy are
+# batched together: pet frames share one invoke (dynamic batch dimension),
+# fixed-shape audio models run the queued windows back to back.
+# Usage: python inference_server.py [socket path]
+
+HOSTED_MODELS = ("pet", "yamnet", "vggish")
+MAX_BATCH = 4     # the pet interpreter's arena grows to fit the largest batch (measured ~7 MiB more at 4)
+
+
+# ---------- Batching ----------
+class _Job:
+    __slots__ = ("data", "result", "error", "done")
+
+    def __init__(self, data):
+        self.data = data
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ModelWorker:
+    """
+    One thread per model. It takes the oldest request and everything else
+    already queued (up to max_batch) and runs them as one batch, so batching
+    only happens under load and never adds waiting time to a lone request.
+    """
+
+    def __init__(self, name, run_batch, max_batch=MAX_BATCH):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.requests = 0
+        self.batches = 0
+        self.latency = Histogram()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"infer-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+
+    def submit(self, data):
+        job = _Job(data)
+        start = time.perf_counter()
+        self._queue.put(job)
+        job.done.wait()
+        self.latency.observe(time.perf_counter() - start)
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _run(self):
+        cpu_config.pin(self.name)
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)
+                    break
+                batch.append(job)
+            try:
+                results = self.run_batch([job.data for job in batch])
+                for job, result in zip(batch, results):
+                    job.result = result
+            except Exception as e:
+                for job in batch:
+                    job.error = e
+            self.requests += len(batch)
+            self.batches += 1
+            for job in batch:
+                job.done.set()
+
+    def stats(self):
+        return {"requests": self.requests, "batches": self.batches,
+                "mean_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "latency": self.latency.summary()}
+
+
+def _sequential(model):
+    """run_batch for fixed-shape models: one invoke per input, outputs copied."""
+    def run_batch(inputs):
+        results = []
+        for data in inputs:
+            if data.size != int(np.prod(model.input_shape)):
+                # Variable-length input (e.g. a whole waveform): resize the interpreter to it
+                model.resize_input(data.shape)
+            model.set_input(data.reshape(model.input_shape))
+            model.interpreter.invoke()
+            results.append(model.output())
+        return results
+    return run_batch
+
+
+# ---------- Server ----------
+class InferenceServer:
+    """Loads the hosted models once and serves them on a Unix socket."""
+
+    def __init__(self, socket_path=INFERENCE_SOCKET, models=HOSTED_MODELS, max_batch=MAX_BATCH):
+        self.socket_path = socket_path
+        self.names = [name for name in models if registry.available(name)]
+        self.max_batch = max_batch
+        self.workers = {}
+        self.info = {}
+        self.clients = 0
+        self._server = None
+
+    def start(self):
+        for name in self.names:
+            model = registry.get(name)
+            model.warm_up()
+            if name == "pet":
+                # Resizes the registry's interpreter per batch instead of loading one per batch size
+                detector = BatchPetDetector(model, self.max_batch, shared=True)
+                run_batch = detector.predict
+            else:
+                run_batch = _sequential(model)
+            self.workers[name] = ModelWorker(name, run_batch, self.max_batch).start()
+            # Pet requests are uint8 frames; the worker normalises them into the input tensor.
+            # Integer audio models still take float windows: set_input() quantizes them.
+            if name == "pet":
+                dtype = np.uint8
+            else:
+                dtype = np.float32 if model.quantized() else model.input_dtype
+            self.info[name] = {"input_shape": [int(n) for n in model.input_shape],
+                               "input_dtype": np.dtype(dtype).str}
+
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server.clients += 1
+                try:
+                    server.serve_client(self.request)
+                finally:
+                    server.clients -= 1
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="inference-server", daemon=True).start()
+        print(f"[INFER] Serving {', '.join(self.names) or 'no models'} on unix:{self.socket_path}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for worker in self.workers.values():
+            worker.stop()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def serve_client(self, sock):
+        shm = None
+        try:
+            while True:
+                try:
+                    message = recv_message(sock)
+                except OSError:
+                    message = None
+                if message is None:
+                    return
+                try:
+                    op = message.get("op")
+                    if op == "attach":
+                        if shm is not None:
+                            shm.close()
+                        name = message["shm"]
+                        shm = shared_memory.SharedMemory(name=name)
+                        # The client owns the segment; don't let our tracker unlink it at exit
+                        # (the tracker registers the POSIX name, which has a leading slash)
+                        resource_tracker.unregister("/" + name.lstrip("/"), "shared_memory")
+                        send_message(sock, {"models": self.info})
+                    elif op == "infer":
+                        send_message(sock, self._infer(shm, message))
+                    elif op == "stats":
+                        send_message(sock, self.stats())
+                    else:
+                        send_message(sock, {"error": f"unknown op {op!r}"})
+                except (KeyError, ValueError, TypeError, RuntimeError) as e:
+                    send_message(sock, {"error": str(e)})
+        finally:
+            if shm is not None:
+                shm.close()
+
+    def _infer(self, shm, message):
+        worker = self.workers.get(message["model"])
+        if worker is None:
+            raise KeyError(f"model {message['model']!r} is not hosted")
+        if shm is None:
+            raise ValueError("attach a shared memory segment first")
+        # Read the input in place: the client waits for the reply before reusing its segment
+        data = np.ndarray(message["shape"], np.dtype(message["dtype"]), buffer=shm.buf)
+        try:
+            result = worker.submit(data)
+        finally:
+            del data
+        if not isinstance(result, np.ndarray):
+            return {"value": float(result)}
+        out = np.ndarray(result.shape, result.dtype, buffer=shm.buf)
+        out[...] = result
+        del out
+        return {"shape": list(result.shape), "dtype": result.dtype.str}
+
+    def stats(self):
+        return {"clients": self.clients, "models": {name: w.stats() for name, w in self.workers.items()}}
+
+
+if __name__ == "__main__":
+    import sys
+    server = InferenceServer(sys.argv[1] if len(sys.argv) > 1 else INFERENCE_SOCKET).start()
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    try:
+        signal.pause()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    server.stop()
+    print("[INFER] Stopped")
@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Inference daemon vs in-process models. Every script runs in its own process:
+#   memory   - private (unique) memory of a script that loads the models
+#              itself, vs a thin client plus the server. Library pages shared
+#              by every process are left out: they are paid once either way.
+#   latency  - sequential MobileNet requests, in-process vs over the socket
+#   batching - CLIENTS processes firing requests at once, at the server vs
+#              each with its own interpreter
+# Usage: python inference_server_bench.py [requests per client] [clients]
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 300
+CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 4
+SOCKET = os.path.join(tempfile.gettempdir(), "petcare-inference-bench.sock")
+
+
+def private_kib(pid="self"):
+    total = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+
+def run_mode(mode, requests):
+    frame = np.random.default_rng(os.getpid()).integers(0, 255, (224, 224, 3), dtype=np.uint8)
+    if mode == "inproc":
+        from model_registry import registry
+        from pet_detector import PetDetector
+        for name in ("pet", "yamnet", "vggish"):
+            if registry.available(name):
+                registry.get(name).warm_up()
+        predict = registry.get("pet").adapter(PetDetector).predict
+    else:
+        from inference_client import InferenceClient
+        client = InferenceClient(SOCKET)
+        predict = client.pet_probability
+    predict(frame)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t = time.perf_counter()
+        predict(frame)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    private = private_kib()
+    if mode == "client":
+        client.close()
+    return {"private_kib": private, "elapsed_s": elapsed,
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3)}
+
+
+def spawn(mode, requests, count=1):
+    here = os.path.dirname(os.path.abspath(__file__))
+    procs = [subprocess.Popen([sys.executable, __file__, "--mode", mode, str(requests)], cwd=here,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+             for _ in range(count)]
+    start = time.perf_counter()
+    results = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+    return results, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "--mode":
+        print(json.dumps(run_mode(sys.argv[2], int(sys.argv[3]))))
+        sys.exit(0)
+
+    server = subprocess.Popen([sys.executable, "inference_server.py", SOCKET],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        if os.path.exists(SOCKET):
+            break
+        time.sleep(0.1)
+    from inference_client import InferenceClient
+
+    try:
+        (inproc,), _ = spawn("inproc", REQUESTS)
+        (client,), _ = spawn("client", REQUESTS)
+        print(f"sequential MobileNet, {REQUESTS} requests")
+        print(f"  in-process   p50 {inproc['p50_ms']:7.3f} ms  p95 {inproc['p95_ms']:7.3f} ms")
+        print(f"  via server   p50 {client['p50_ms']:7.3f} ms  p95 {client['p95_ms']:7.3f} ms")
+
+        inprocs, inproc_wall = spawn("inproc", REQUESTS, CLIENTS)
+        clients, client_wall = spawn("client", REQUESTS, CLIENTS)
+        stats_client = InferenceClient(SOCKET)
+        stats = stats_client.stats()["models"]["pet"]
+        stats_client.close()
+        total = REQUESTS * CLIENTS
+        print(f"\n{CLIENTS} processes at once, {total} requests ({os.cpu_count()} CPU(s))")
+        print(f"  in-process   {total / inproc_wall:7.1f} req/s, "
+              f"p95 {max(r['p95_ms'] for r in inprocs):7.3f} ms")
+        print(f"  via server   {total / client_wall:7.1f} req/s, "
+              f"p95 {max(r['p95_ms'] for r in clients):7.3f} ms, mean batch {stats['mean_batch']}")
+
+        server_private = private_kib(server.pid)
+        print(f"\nprivate memory: in-process script {inproc['private_kib'] / 1024:.1f} MiB, "
+              f"client {client['private_kib'] / 1024:.1f} MiB, server {server_private / 1024:.1f} MiB")
+        for scripts in (2, 3):
+            print(f"  {scripts} scripts: {scripts * inproc['private_kib'] / 1024:6.1f} MiB in-process vs "
+                  f"{(scripts * client['private_kib'] + server_private) / 1024:6.1f} MiB with the server")
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,290 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATS_TOPIC = "tb/sensors/Diagnostics/data"
+STATS_HTTP_PORT = 8787
+STATS_SOCKET = "/tmp/petcare-stats.sock"
+
+# Upper bucket bounds in ms; the last bucket catches everything slower
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+# ---------- Histogram ----------
+class Histogram:
+    """Fixed-bucket latency histogram: constant memory, O(log buckets) per sample."""
+
+    def __init__(self, bounds_ms=BUCKETS_MS):
+        self.bounds = tuple(b / 1000 for b in bounds_ms)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q):
+        """Upper bound (ms) of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return round(self.bounds[index] * 1000, 2) if index < len(self.bounds) else round(self.max * 1000, 2)
+        return round(self.max * 1000, 2)
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean_ms": round(self.total / self.count * 1000, 2),
+                "p50_ms": self.percentile(50), "p95_ms": self.percentile(95),
+                "p99_ms": self.percentile(99), "max_ms": round(self.max * 1000, 2),
+                "buckets": dict(zip([*map(str, BUCKETS_MS), "inf"], self.counts))}
+
+
+class _Span:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+# ---------- Metrics ----------
+class Metrics:
+    """
+    Named spans (histograms), counters and gauges for the hot paths. Cheap
+    enough to stay on in production: a span is two perf_counter() calls and
+    one bucket increment.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def span(self, name):
+        """with metrics.span("mobilenet"): ... records the block's duration."""
+        return _Span(self.histogram(name))
+
+    def timed(self, name):
+        """Decorator form of span()."""
+        def decorate(fn):
+            histogram = self.histogram(name)
+
+            def wrapper(*args, **kwargs):
+                with _Span(histogram):
+                    return fn(*args, **kwargs)
+            wrapper.__name__ = fn.__name__
+            wrapper.__doc__ = fn.__doc__
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, fn):
+        """Register a callable read at snapshot time (e.g. a queue's drop count)."""
+        self.gauges[name] = fn
+
+    def snapshot(self):
+        gauges = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+        with self._lock:
+            counters = dict(self.counters)
+        return {"uptime_s": round(time.time() - self.started, 1),
+                "spans": {name: h.summary() for name, h in list(self.histograms.items())},
+                "counters": counters,
+                "gauges": gauges}
+
+    def telemetry_values(self):
+        """Flat key/values for a ThingsBoard telemetry payload."""
+        snapshot = self.snapshot()
+        values = {"uptime_s": snapshot["uptime_s"]}
+        for name, summary in snapshot["spans"].items():
+            if summary["count"]:
+                values.update({f"{name}.count": summary["count"], f"{name}.p50_ms": summary["p50_ms"],
+                               f"{name}.p95_ms": summary["p95_ms"], f"{name}.max_ms": summary["max_ms"]})
+        values.update(snapshot["counters"])
+        values.update({k: v for k, v in snapshot["gauges"].items() if isinstance(v, (int, float))})
+        return values
+
+
+# ---------- Rate-limited logging ----------
+class RateLimitedLog:
+    """print() at most once per interval per key, noting how many lines were suppressed."""
+
+    def __init__(self, interval=10.0):
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, key, message, interval=None):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(key, -1e9) < (self.interval if interval is None else interval):
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        print(message + (f" (+{suppressed} similar)" if suppressed else ""))
+
+
+# ---------- Exporters ----------
+class StatsReporter:
+    """Publishes the metrics snapshot to a ThingsBoard topic every period seconds."""
+
+    def __init__(self, metrics, client, period=60.0, topic=STATS_TOPIC, qos=0):
+        self.metrics = metrics
+        self.client = client
+        self.period = period
+        self.topic = topic
+        self.qos = qos
+        self.failures = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        payload = [{"ts": int(time.time() * 1000), "values": self.metrics.telemetry_values()}]
+        info = self.client.publish(self.topic, json.dumps(payload), qos=self.qos)
+        if info.rc != 0:
+            self.failures += 1
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        while not self._stopped.wait(self.period):
+            try:
+                self.publish()
+            except Exception as e:
+                self.failures += 1
+                print("[STATS] Publish failed:", e)
+
+
+class StatsServer:
+    """
+    Serves the metrics snapshot as JSON locally: GET http://127.0.0.1:<port>/stats
+    and/or a Unix socket that answers every connection with one snapshot
+    (e.g. `nc -U /tmp/petcare-stats.sock`).
+    """
+
+    def __init__(self, metrics, port=STATS_HTTP_PORT, socket_path=STATS_SOCKET, host="127.0.0.1"):
+        self.metrics = metrics
+        self.port = port
+        self.socket_path = socket_path
+        self.host = host
+        self._servers = []
+        self._owns_socket = False
+
+    def start(self):
+        metrics = self.metrics
+
+        class HttpHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/stats"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(metrics.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class UnixHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.sendall(json.dumps(metrics.snapshot()).encode() + b"\n")
+
+        if self.port is not None:
+            self._serve(ThreadingHTTPServer((self.host, self.port), HttpHandler))
+            print(f"[STATS] http://{self.host}:{self.port}/stats")
+        if self.socket_path:
+            if _socket_in_use(self.socket_path):
+                print(f"[STATS] unix:{self.socket_path} is served by another process; leaving it alone")
+            else:
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)    # left behind by a process that didn't stop cleanly
+                self._serve(socketserver.ThreadingUnixStreamServer(self.socket_path, UnixHandler))
+                self._owns_socket = True
+                print(f"[STATS] unix:{self.socket_path}")
+        return self
+
+    def _serve(self, server):
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="stats-server", daemon=True).start()
+        self._servers.append(server)
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+        if self._owns_socket and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._owns_socket = False
+
+
+def _socket_in_use(path):
+    """True when something accepts connections on the Unix socket at path (a stale file refuses them)."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    finally:
+        probe.close()
+
+
+# Shared instances used by the main scripts and helper modules
+metrics = Metrics()
+log = RateLimitedLog()
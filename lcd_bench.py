@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+from lcd_renderer import LCDRenderer, FakeCharLCD, MAX_FPS
+
+# LCD traffic for main_LCD.py's display calls, old vs renderer, on a
+# FakeCharLCD that takes as long as the real I2C writes would (100 kHz,
+# PCF8574 backpack). Two scenes, replayed SPEEDUP times faster:
+#   tasks   - main_LCD's task periods: food level every 5 s, emotion every
+#             5 s (offset), a door visit every 15 s ("Motion Detected" then
+#             the verdict 0.3 s later)
+#   readout - one screen updated every 0.5 s where only a few digits change
+#             (e.g. a live food or distance readout)
+#   direct   - the old lcd_display(): clear() and rewrite both lines, on the
+#              caller's thread
+#   renderer - LCDRenderer.show(): changed cells only, at most MAX_FPS
+#              frames per (scene) second, written by the LCD worker
+# Reported: LCD and bus bytes, bus time, clears (each one flickers) and how
+# long the callers were blocked in total and at worst.
+# Usage: python lcd_bench.py [scene seconds] [speedup]
+
+SCENE_SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+SPEEDUP = float(sys.argv[2]) if len(sys.argv) > 2 else 4.0
+EMOTIONS = ("Happy ", "Happy ", "Hungry ", "Happy ", "Anxious⚠ ")
+
+
+def scene(kind):
+    """(scene time, line1, line2) display calls, in time order."""
+    calls = []
+    for step in range(int(SCENE_SECONDS * 10)):
+        t = step / 10
+        if kind == "readout":
+            if step % 5 == 0:
+                calls.append((t, "Food Level:", f"{80 - t / 7:.1f}%"))
+            continue
+        if step % 50 == 0:
+            calls.append((t, "Food Level:", f"{80 - t / 7:.1f}%"))
+        if step % 50 == 25:
+            calls.append((t, "Emotion:", EMOTIONS[step // 50 % len(EMOTIONS)]))
+        if step % 150 == 70:
+            calls.append((t, "Motion Detected", "Checking..."))
+        if step % 150 == 73:
+            calls.append((t, "Pet Detected", "Door Closed") if step % 300 == 73 else (t, "Unknown Motion", "Door Open"))
+    return calls
+
+
+def replay(calls, display):
+    """Call display(line1, line2) on schedule; returns the seconds each call blocked."""
+    blocked = []
+    start = time.monotonic()
+    for t, line1, line2 in calls:
+        delay = start + t / SPEEDUP - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        began = time.perf_counter()
+        display(line1, line2)
+        blocked.append(time.perf_counter() - began)
+    return blocked
+
+
+def direct(lcd):
+    lock = threading.Lock()
+
+    def display(line1="", line2=""):
+        with lock:
+            lcd.clear()
+            lcd.write_string(line1[:16])
+            lcd.crlf()
+            lcd.write_string(line2[:16])
+    return display
+
+
+def report(label, lcd, blocked):
+    print(f"  {label:9s} {lcd.lcd_bytes:6d} {lcd.bus_bytes:7d} {lcd.bus_seconds * 1000:8.0f} ms "
+          f"{lcd.clears:6d}  {sum(blocked) * 1000:8.1f} ms {max(blocked) * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    for kind in ("tasks", "readout"):
+        calls = scene(kind)
+        print(f"{kind}: {len(calls)} display calls over {SCENE_SECONDS:.0f} s of scene, replayed {SPEEDUP:.0f}x faster")
+        print("            LCD B   bus B   bus time  clears  blocked total   worst")
+
+        old = FakeCharLCD(realtime=True)
+        report("direct", old, replay(calls, direct(old)))
+
+        new = FakeCharLCD(realtime=True)
+        renderer = LCDRenderer(new, max_fps=MAX_FPS * SPEEDUP).start()
+        blocked = replay(calls, renderer.show)
+        renderer.stop()
+        report("renderer", new, blocked)
+        s = renderer.stats()
+        final = [line[:16].ljust(16) for line in calls[-1][1:]]
+        print(f"  renderer: {s['frames']} frames for {s['updates']} updates ({s['coalesced']} coalesced), "
+              f"{s['cells']} cells, {s['moves']} cursor moves, final screen "
+              f"{'matches' if new.lines() == final else 'DIFFERS'}\n")
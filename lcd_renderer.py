@@ -0,0 +1,217 @@
+import threading
+import time
+
+LCD_COLS, LCD_ROWS = 16, 2
+MAX_FPS = 4.0            # display refreshes per second; updates in between are coalesced
+CURSOR_COST = 1          # LCD bytes to move the cursor (one "set DDRAM address" command)
+
+# HD44780 behind a PCF8574 in 4-bit mode (what RPLCD drives): each LCD byte
+# goes out as two nibbles, each written three times on the I2C bus (data,
+# enable high, enable low).
+BUS_WRITES_PER_BYTE = 6
+I2C_HZ = 100000
+BITS_PER_WRITE = 20      # start + address + data (with ACKs) + stop, roughly
+
+
+# ---------- Renderer ----------
+class LCDRenderer:
+    """
+    Owns a character LCD and redraws it from a worker thread. show() only
+    records the newest text and returns; the worker redraws at most
+    max_fps times a second, so bursts of updates collapse into one frame.
+    A shadow framebuffer holds what is on the glass: only changed cells are
+    written (with cursor moves between runs). The display is only cleared
+    when the whole screen changes and clearing takes fewer bytes, so
+    repeated or partly changed text doesn't flicker.
+    """
+
+    def __init__(self, lcd, cols=LCD_COLS, rows=LCD_ROWS, max_fps=MAX_FPS):
+        self.lcd = lcd
+        self.cols = cols
+        self.rows = rows
+        self.interval = 1.0 / max_fps
+        self.updates = 0          # show() calls
+        self.frames = 0           # redraws that wrote something
+        self.coalesced = 0        # show() calls replaced before they were drawn
+        self.cells = 0            # character cells written
+        self.moves = 0            # cursor moves
+        self.errors = 0
+        self._shadow = None       # rows on the glass; None until the first redraw clears it
+        self._target = [" " * cols] * rows
+        self._dirty = False
+        self._cursor = None
+        self._last_draw = 0.0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="lcd", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        """Draw whatever is pending, then stop the worker."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def show(self, *lines):
+        """Set the text of each row (cut or padded to the width); never blocks on the bus."""
+        rows = [str(line)[:self.cols].ljust(self.cols) for line in lines[:self.rows]]
+        rows += [" " * self.cols] * (self.rows - len(rows))
+        with self._cond:
+            self.updates += 1
+            if rows == self._target:
+                return
+            if self._dirty:
+                self.coalesced += 1
+            self._target = rows
+            self._dirty = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._stopped:
+                    self._cond.wait()
+                if not self._dirty:
+                    return
+                # Hold the frame until the refresh interval is up; later show() calls replace it
+                delay = self._last_draw + self.interval - time.monotonic()
+                if delay > 0 and not self._stopped:
+                    self._cond.wait(delay)
+                    continue
+                target = self._target
+                self._dirty = False
+            self._last_draw = time.monotonic()
+            try:
+                self._draw(target)
+            except Exception as e:
+                self.errors += 1
+                self._shadow = None     # unknown state: clear and redraw everything next time
+                with self._cond:
+                    # Retry on the next tick even if show() keeps sending the same text
+                    # (once stopping, the final flush gets one attempt only)
+                    self._dirty = self._dirty or not self._stopped
+                print("[LCD] Write failed:", e)
+
+    def _draw(self, target):
+        if self._shadow is None:
+            self.lcd.clear()
+            self._shadow = [" " * self.cols] * self.rows
+            self._cursor = (0, 0)
+        blank = [" " * self.cols] * self.rows
+        spans, cost = self._plan(self._shadow, target, self._cursor)
+        cleared, cleared_cost = self._plan(blank, target, (0, 0))
+        if cleared_cost + 1 < cost:
+            # Nearly every cell changes: a clear plus the non-blank text is fewer bytes.
+            # The whole screen changes anyway, so the blanking isn't seen as flicker.
+            self.lcd.clear()
+            self._cursor = (0, 0)
+            spans = cleared
+        for row, start, end in spans:
+            if self._cursor != (row, start):
+                self.lcd.cursor_pos = (row, start)
+                self.moves += 1
+            self.lcd.write_string(target[row][start:end])
+            self.cells += end - start
+            self._cursor = (row, end) if end < self.cols else None
+        self._shadow = list(target)
+        if spans:
+            self.frames += 1
+
+    def _plan(self, old, new, cursor):
+        """([(row, start, end), ...] to turn old into new, LCD bytes it takes) starting at cursor."""
+        spans, cost = [], 0
+        for row, (old_row, new_row) in enumerate(zip(old, new)):
+            for start, end in self._runs(old_row, new_row):
+                if cursor != (row, start):
+                    cost += CURSOR_COST
+                cost += end - start
+                cursor = (row, end) if end < self.cols else None
+                spans.append((row, start, end))
+        return spans, cost
+
+    @staticmethod
+    def _runs(old, new):
+        """(start, end) spans covering every changed cell; gaps cheaper to rewrite than to skip are merged."""
+        runs = []
+        for col, (a, b) in enumerate(zip(old, new)):
+            if a == b:
+                continue
+            if runs and col - runs[-1][1] <= CURSOR_COST:
+                runs[-1][1] = col + 1
+            else:
+                runs.append([col, col + 1])
+        return runs
+
+    def stats(self):
+        return {"updates": self.updates, "frames": self.frames, "coalesced": self.coalesced,
+                "cells": self.cells, "moves": self.moves, "errors": self.errors}
+
+
+# ---------- Fake Display ----------
+class FakeCharLCD:
+    """
+    Stand-in for RPLCD's CharLCD that keeps the screen contents and counts
+    the bytes a PCF8574 backpack would put on the I2C bus. With
+    realtime=True each call also takes as long as those bus writes would.
+    """
+
+    def __init__(self, cols=LCD_COLS, rows=LCD_ROWS, realtime=False):
+        self.cols = cols
+        self.rows = rows
+        self.realtime = realtime
+        self.screen = [[" "] * cols for _ in range(rows)]
+        self.lcd_bytes = 0
+        self.clears = 0
+        self._pos = (0, 0)
+
+    @property
+    def bus_bytes(self):
+        return self.lcd_bytes * BUS_WRITES_PER_BYTE
+
+    @property
+    def bus_seconds(self):
+        # clear() also needs ~1.6 ms for the controller to blank its memory
+        return self.bus_bytes * BITS_PER_WRITE / I2C_HZ + self.clears * 0.0016
+
+    def _send(self, n, extra=0.0):
+        self.lcd_bytes += n
+        if self.realtime:
+            time.sleep(n * BUS_WRITES_PER_BYTE * BITS_PER_WRITE / I2C_HZ + extra)
+
+    def clear(self):
+        self.screen = [[" "] * self.cols for _ in range(self.rows)]
+        self._pos = (0, 0)
+        self.clears += 1
+        self._send(1, 0.0016)
+
+    @property
+    def cursor_pos(self):
+        return self._pos
+
+    @cursor_pos.setter
+    def cursor_pos(self, pos):
+        self._pos = tuple(pos)
+        self._send(1)
+
+    def crlf(self):
+        self._pos = ((self._pos[0] + 1) % self.rows, 0)
+        self._send(1)
+
+    def write_string(self, text):
+        row, col = self._pos
+        for char in text:
+            if col < self.cols:
+                self.screen[row][col] = char
+            col += 1
+        self._pos = (row, col)
+        self._send(len(text))
+
+    def lines(self):
+        return ["".join(row) for row in self.screen]
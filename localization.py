@@ -0,0 +1,233 @@
+import threading
+import time
+from camera_service import CameraService
+from cpu_config import cpu_config
+from frame_filter import FrameDiffFilter
+from instrumentation import Histogram
+from model_registry import LoadedModel
+from pet_detector import PetDetector
+
+MAX_BATCH = 4            # frames per MobileNet invoke
+MAX_STALENESS = 30.0     # seconds before a room without motion is looked at again
+POLL_INTERVAL = 0.2      # seconds between scheduling rounds
+PRESENT_THRESHOLD = 0.5  # pet probability that marks a room as occupied
+ABSENT_AFTER = 2         # negative verdicts in a row before a room is marked empty
+
+
+# ---------- Batched Detector ----------
+class BatchPetDetector:
+    """
+    Scores several frames per interpreter invoke when the model's batch
+    dimension is dynamic. Batches are padded up to a power of two, so only a
+    few interpreter sizes (1, 2, 4, ...) are ever allocated, each loaded the
+    first time it is needed. Models with a fixed batch of 1 get one invoke
+    per frame.
+
+    With shared=True no interpreters are loaded: the model's own one is
+    resized in place to each batch size (under model.lock), for a process
+    such as the inference server where nothing else uses it concurrently
+    and one arena matters more than skipping the resize.
+    """
+
+    def __init__(self, model, max_batch=MAX_BATCH, shared=False):
+        self.model = model
+        self.max_batch = max_batch if model.batchable() else 1
+        self.shared = shared
+        self.invokes = 0
+        self.frames = 0
+        self._detectors = {}
+
+    def _detector(self, size):
+        detector = self._detectors.get(size)
+        if detector is None:
+            if self.shared:
+                self._detectors.clear()    # tensor views die with the old allocation
+                if self.model.batchable():
+                    self.model.resize_input((size, *self.model.input_shape[1:]))
+                interpreter = self.model.interpreter
+            else:
+                # Own interpreters, so the door check can keep using the registry's shared one
+                batch = size if self.model.batchable() else None
+                interpreter = LoadedModel(self.model.name, self.model.path, batch=batch).interpreter
+            detector = self._detectors[size] = PetDetector(interpreter)
+        return detector
+
+    def predict(self, frames):
+        """Pet probability for each frame, in order."""
+        if self.shared:
+            with self.model.lock:
+                return self._predict(frames)
+        return self._predict(frames)
+
+    def _predict(self, frames):
+        probabilities = []
+        for start in range(0, len(frames), self.max_batch):
+            chunk = frames[start:start + self.max_batch]
+            size = 1 << (len(chunk) - 1).bit_length()
+            probabilities += self._detector(size).predict_batch(chunk)
+            self.invokes += 1
+            self.frames += len(chunk)
+        return probabilities
+
+
+# ---------- Occupancy ----------
+class OccupancyMap:
+    """
+    cat_present per room. A room becomes occupied on the first positive
+    verdict and empty only after absent_after negative ones, so one missed
+    detection doesn't bounce the state. on_change(room, present) fires only
+    when a room flips (and once for each room's first verdict).
+    """
+
+    def __init__(self, rooms, on_change=None, threshold=PRESENT_THRESHOLD, absent_after=ABSENT_AFTER):
+        self.on_change = on_change
+        self.threshold = threshold
+        self.absent_after = absent_after
+        self.present = {room: None for room in rooms}
+        self.probability = {room: None for room in rooms}
+        self.changes = 0
+        self._misses = {room: 0 for room in rooms}
+        self._lock = threading.Lock()
+
+    def update(self, room, probability):
+        with self._lock:
+            self.probability[room] = probability
+            if probability > self.threshold:
+                self._misses[room] = 0
+                present = True
+            else:
+                self._misses[room] += 1
+                # An unseen room (None) starts as an explicit False so its first verdict is published
+                present = bool(self.present[room]) and self._misses[room] < self.absent_after
+            if present == self.present[room]:
+                return
+            self.present[room] = present
+            self.changes += 1
+        if self.on_change:
+            self.on_change(room, present)
+
+    def location(self):
+        """The occupied room with the highest recent probability, or None."""
+        with self._lock:
+            rooms = [room for room, present in self.present.items() if present]
+            return max(rooms, key=lambda room: self.probability[room]) if rooms else None
+
+
+# ---------- Cameras ----------
+class RoomCamera:
+    """One room's camera service plus the scheduling state the localizer keeps for it."""
+
+    def __init__(self, room, source):
+        self.room = room
+        self.service = CameraService(source, ring_size=2)
+        self.filter = FrameDiffFilter()
+        self.frame_time = 0.0      # timestamp of the last frame looked at
+        self.checked_at = None     # when MobileNet last ran on this room
+        self.motion = 0.0          # strongest change since the last check
+        self.motion_at = None      # when that change was first seen
+        self.frames = 0
+        self.classified = 0
+        self.motion_checks = 0
+        self.stale_checks = 0
+
+
+# ---------- Localizer ----------
+class PetLocalizer:
+    """
+    Works out which room the pet is in from several cameras. Every
+    poll_interval each camera's newest frame goes through a frame-difference
+    filter; rooms with motion are classified first (strongest change first),
+    then rooms not looked at for max_staleness seconds. Rooms that are
+    neither are left alone. Up to max_batch frames share one MobileNet invoke
+    and the verdicts feed an OccupancyMap.
+    """
+
+    def __init__(self, cameras, model, on_change=None, max_batch=MAX_BATCH, max_staleness=MAX_STALENESS,
+                 poll_interval=POLL_INTERVAL, clock=time.monotonic):
+        self.cameras = [RoomCamera(room, source) for room, source in cameras.items()]
+        self.detector = BatchPetDetector(model, max_batch)
+        self.occupancy = OccupancyMap(cameras, on_change)
+        self.max_staleness = max_staleness
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.rounds = 0
+        self.response = Histogram()    # motion seen -> room classified
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        for camera in self.cameras:
+            camera.service.start()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="localizer", daemon=True)
+        self._thread.start()
+        print(f"[LOCATE] Watching {len(self.cameras)} room(s), batches of up to {self.detector.max_batch}")
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for camera in self.cameras:
+            camera.service.stop()
+
+    def _loop(self):
+        cpu_config.pin("vision")
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            try:
+                self.step()
+            except Exception as e:
+                print("[LOCATE] Round failed:", e)
+            self._stopped.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    def step(self):
+        """One scheduling round: pick the rooms worth a look and classify them in one batch."""
+        now = self.clock()
+        due = []
+        for camera in self.cameras:
+            frame, timestamp = camera.service.ring.latest()
+            if frame is None:
+                continue
+            if timestamp != camera.frame_time:
+                camera.frame_time = timestamp
+                camera.frames += 1
+                changed, fraction, _ = camera.filter.check(frame)
+                if changed:
+                    camera.motion = max(camera.motion, fraction)
+                    if camera.motion_at is None:
+                        camera.motion_at = now
+            stale = camera.checked_at is None or now - camera.checked_at >= self.max_staleness
+            if camera.motion or stale:
+                # Motion outranks staleness; within each, stronger change / older check first
+                age = self.max_staleness if camera.checked_at is None else now - camera.checked_at
+                due.append((camera.motion > 0, camera.motion, age, camera, frame))
+
+        self.rounds += 1
+        if not due:
+            return 0
+        due.sort(key=lambda item: item[:3], reverse=True)
+        due = due[:self.detector.max_batch]
+        probabilities = self.detector.predict([frame for *_, frame in due])
+        for (moved, _, _, camera, _), probability in zip(due, probabilities):
+            camera.classified += 1
+            if moved:
+                camera.motion_checks += 1
+                self.response.observe(now - camera.motion_at)
+            else:
+                camera.stale_checks += 1
+            camera.motion = 0.0
+            camera.motion_at = None
+            camera.checked_at = now
+            self.occupancy.update(camera.room, probability)
+        return len(due)
+
+    def stats(self):
+        rooms = {camera.room: {"frames": camera.frames, "classified": camera.classified,
+                               "motion_checks": camera.motion_checks, "stale_checks": camera.stale_checks,
+                               "present": self.occupancy.present[camera.room]}
+                 for camera in self.cameras}
+        return {"rooms": rooms, "location": self.occupancy.location(), "rounds": self.rounds,
+                "invokes": self.detector.invokes, "frames_classified": self.detector.frames,
+                "occupancy_changes": self.occupancy.changes,
+                "motion_to_check_p95_ms": self.response.percentile(95)}
@@ -0,0 +1,130 @@
+import contextlib
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image, ImageDraw
+from camera_service import FakeFrameSource, CAPTURE_SIZE, MODEL_SIZE, snapshot_paths
+from localization import PetLocalizer, BatchPetDetector
+from model_registry import registry
+
+# Throughput of multi-camera pet localization. Fake cameras replay generated
+# image folders: each room shows a static snapshot background, and a "pet"
+# walks from room to room (SCENE_FRAMES frames per room). Three policies are
+# compared on the same scene:
+#   round-robin      one room per round, one frame per invoke
+#   all, batched     every room every round, frames batched into one invoke
+#   scheduled        motion first, then rooms unseen for STALENESS s, batched
+# plus the raw detector throughput at each batch size.
+# Usage: python localization_bench.py [rooms] [seconds per policy]
+
+ROOMS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 15.0
+FPS = 5
+SCENE_FRAMES = 6
+STALENESS = 5.0
+WORK_DIR = tempfile.mkdtemp(prefix="localization_bench_")
+
+
+def build_scene(rooms):
+    """One folder of frames per room; the pet is in room k for frames k*SCENE_FRAMES.. of each cycle."""
+    backgrounds = [Image.open(p).convert("RGB").resize(CAPTURE_SIZE)
+                   for p in snapshot_paths()]
+    rng = np.random.default_rng(0)
+    sources = {}
+    for k in range(rooms):
+        folder = os.path.join(WORK_DIR, f"Room{k}")
+        os.makedirs(folder)
+        background = backgrounds[k % len(backgrounds)]
+        for i in range(SCENE_FRAMES * rooms):
+            frame = background.copy()
+            step = i - k * SCENE_FRAMES
+            if 0 <= step < SCENE_FRAMES:
+                x, y = 80 + step * 70, 220 + int(rng.integers(-20, 20))
+                ImageDraw.Draw(frame).ellipse((x, y, x + 160, y + 110), fill=(70, 50, 40))
+            frame.save(os.path.join(folder, f"{i:03d}.jpg"), quality=90)
+        sources[f"Room{k}"] = os.path.join(folder, "*.jpg")
+    return sources
+
+
+class RoundRobinLocalizer(PetLocalizer):
+    """Baseline: the next room in turn each round, whatever its cameras show."""
+
+    def step(self):
+        now = self.clock()
+        for camera in self.cameras:
+            frame, timestamp = camera.service.ring.latest()
+            if frame is not None and timestamp != camera.frame_time:
+                camera.frame_time = timestamp
+                camera.frames += 1
+                changed, fraction, _ = camera.filter.check(frame)
+                if changed and camera.motion_at is None:
+                    camera.motion_at = now
+        camera = self.cameras[self.rounds % len(self.cameras)]
+        self.rounds += 1
+        frame, _ = camera.service.ring.latest()
+        if frame is None:
+            return 0
+        probability, = self.detector.predict([frame])
+        camera.classified += 1
+        if camera.motion_at is not None:
+            self.response.observe(now - camera.motion_at)
+            camera.motion_at = None
+        camera.checked_at = now
+        self.occupancy.update(camera.room, probability)
+        return 1
+
+
+def detector_throughput(model, frames):
+    print("detector       frames/s   ms/frame")
+    for batch in (1, 2, 4, 8):
+        detector = BatchPetDetector(model, max_batch=batch)
+        detector.predict(frames[:batch])    # load and warm this batch size
+        start = time.perf_counter()
+        detector.predict(frames)
+        elapsed = time.perf_counter() - start
+        print(f"  batch {detector.max_batch}   {len(frames) / elapsed:10.1f} {elapsed * 1000 / len(frames):10.2f}")
+
+
+def run(name, sources, model, max_batch, max_staleness, localizer_class=PetLocalizer):
+    cameras = {room: FakeFrameSource(pattern, fps=FPS) for room, pattern in sources.items()}
+    flips = []
+    localizer = localizer_class(cameras, model, lambda room, present: flips.append((room, present)),
+                                max_batch=max_batch, max_staleness=max_staleness)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        localizer.start()
+    started, cpu = time.monotonic(), time.process_time()
+    time.sleep(SECONDS)
+    elapsed, cpu = time.monotonic() - started, time.process_time() - cpu
+    localizer.stop()
+
+    stats = localizer.stats()
+    seen = sum(room["frames"] for room in stats["rooms"].values())
+    classified = stats["frames_classified"]
+    per_invoke = classified / stats["invokes"] if stats["invokes"] else 0.0
+    response = stats["motion_to_check_p95_ms"]
+    print(f"{name:<14} {seen / elapsed:8.1f} {classified / elapsed:11.1f} {stats['invokes'] / elapsed:9.1f} "
+          f"{per_invoke:10.2f} {cpu / elapsed * 100:6.0f}% {len(flips):9d} {response if response is not None else '-':>10}")
+
+
+if __name__ == "__main__":
+    if not registry.available("pet"):
+        sys.exit("mobilenet_pet.tflite not found")
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        model = registry.get("pet")
+    sources = build_scene(ROOMS)
+    frames = [np.asarray(Image.open(p).convert("RGB").resize(MODEL_SIZE))
+              for pattern in sources.values() for p in sorted(glob.glob(pattern))][:32]
+
+    print(f"{model.path}: batch dimension {'dynamic' if model.batchable() else 'fixed at 1'}, "
+          f"{ROOMS} cameras at {FPS} fps, {SECONDS:.0f} s per policy\n")
+    detector_throughput(model, frames)
+
+    print("\npolicy         frames/s  classified/s  invokes/s  per invoke    CPU  publishes  p95 motion->check (ms)")
+    run("round-robin", sources, model, max_batch=1, max_staleness=0, localizer_class=RoundRobinLocalizer)
+    run("all, batched", sources, model, max_batch=ROOMS, max_staleness=0)
+    run("scheduled", sources, model, max_batch=4, max_staleness=STALENESS)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
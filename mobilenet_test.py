@@ -1,9 +1,10 @@
 import os
 import time
 from time import sleep
-from PIL import Image
-import numpy as np
-import tflite_runtime.interpreter as tflite
+from pet_detector import PetDetector
+from model_registry import registry
+from inference_cache import pet_cache
+from inference_client import connect
 from picamera2 import Picamera2
 
 # ------------------------------
@@ -26,27 +27,19 @@ def capture_image_rpicam(filename="pet_snapshot.jpg"):
 # ------------------------------
 # Load MobileNet TFLite model
 # ------------------------------
-pet_model_path = "mobilenet_pet.tflite"  # path to your trained TFLite pet classifier
-pet_interpreter = tflite.Interpreter(model_path=pet_model_path)
-pet_interpreter.allocate_tensors()
-pet_input_details = pet_interpreter.get_input_details()
-pet_output_details = pet_interpreter.get_output_details()
+# mobilenet_pet.tflite: served by inference_server.py if one is running,
+# otherwise loaded here through the shared registry
+client = connect()
+pet_detector = None if client else registry.get("pet").adapter(PetDetector)
 
 # ------------------------------
 # Pet detection function
 # ------------------------------
 def is_pet_in_image(image_path, threshold=0.5):
-    img = Image.open(image_path).resize((224, 224))  # MobileNet input size
-    input_data = np.expand_dims(np.array(img)/255.0, axis=0).astype(np.float32)
-    pet_interpreter.set_tensor(pet_input_details[0]['index'], input_data)
-    pet_interpreter.invoke()
-    output_data = pet_interpreter.get_tensor(pet_output_details[0]['index'])
-
-    # Flatten the output to a 1D array
-    output_data = np.array(output_data).flatten()
-    
-    # Assuming class 0 = pet
-    pet_prob = output_data[0]
+    # Decodes at model resolution and fills the input tensor in place (class 0 = pet)
+    # Results are shared with near-identical images through the common cache
+    predict = client.pet_probability if client else pet_detector.predict
+    pet_prob = pet_cache.lookup(image_path, predict)
     return pet_prob > threshold
 
 # ------------------------------
@@ -0,0 +1,269 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+import tflite_runtime.interpreter as tflite
+from cpu_config import cpu_config
+
+MODEL_PATHS = {
+    "yamnet": "yamnet.tflite",
+    "vggish": "vggish.tflite",
+    "pet": "mobilenet_pet.tflite",
+}
+
+# Full-integer variants written by quantize_models.py. Models listed in the
+# QUANTIZED_MODELS environment variable (comma-separated, e.g. "pet,yamnet")
+# load these instead when the file exists; check quantize_bench.py's
+# agreement numbers before switching a model over.
+QUANTIZED_PATHS = {
+    "yamnet": "yamnet_int8.tflite",
+    "pet": "mobilenet_pet_int8.tflite",
+}
+QUANTIZED_MODELS = [name for name in os.environ.get("QUANTIZED_MODELS", "").split(",") if name]
+
+# YAMNet's fixed window (0.975 s at 16 kHz). Known up front so audio capture
+# can start before the model itself has been loaded.
+YAMNET_INPUT_SIZE = 15600
+
+
+class LoadedModel:
+    """An allocated interpreter plus its cached tensor details and indices."""
+
+    def __init__(self, name, path, batch=None, instances=1):
+        start = time.perf_counter()
+        options = cpu_config.interpreter_options(name, instances)
+        self.num_threads = options["num_threads"]
+        # Created on the model's cores so the interpreter's worker threads stay there
+        with cpu_config.pinned(name):
+            # Loading by path lets TFLite mmap the flatbuffer instead of copying it
+            # into a Python bytes object first (which model_content= would do).
+            self.interpreter = tflite.Interpreter(model_path=path, **options)
+            if batch is not None:
+                # Only valid for models with a dynamic batch dimension (see batchable())
+                detail = self.interpreter.get_input_details()[0]
+                self.interpreter.resize_tensor_input(detail['index'], [batch, *detail['shape'][1:]])
+            self.interpreter.allocate_tensors()
+        self.load_seconds = time.perf_counter() - start
+        self.warmup_seconds = None
+
+        self.name = name
+        self.path = path
+        self._read_details()
+        self.lock = threading.Lock()   # hold while invoking if several threads share the model
+        self._adapters = {}
+
+    def _read_details(self):
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.input_index = self.input_details[0]['index']
+        self.output_index = self.output_details[0]['index']
+        self.input_shape = tuple(self.input_details[0]['shape'])
+        self.input_dtype = self.input_details[0]['dtype']
+        self.input_quantization = self.input_details[0]['quantization']
+        self.output_quantization = self.output_details[0]['quantization']
+
+    def resize_input(self, shape):
+        """
+        Reallocate the interpreter for a new input shape (e.g. a batch size on
+        a batchable() model) and refresh the cached details. Hold self.lock;
+        adapters are rebuilt on next use, as their tensor views die with the old arena.
+        """
+        shape = tuple(shape)
+        if shape == self.input_shape:
+            return
+        self.interpreter.resize_tensor_input(self.input_index, shape)
+        self.interpreter.allocate_tensors()
+        self._read_details()
+        self._adapters.clear()
+
+    def batchable(self):
+        """True when the model's batch dimension is dynamic, so several inputs fit one invoke()."""
+        signature = self.input_details[0].get('shape_signature')
+        return signature is not None and len(signature) > 0 and signature[0] == -1
+
+    def quantized(self):
+        """True for a full-integer model: callers still pass float data, set_input() quantizes it."""
+        return self.input_dtype != np.float32 and bool(self.input_quantization[0])
+
+    def set_input(self, data):
+        """
+        Write data into the input tensor, quantizing float data for integer
+        models. Data with the right number of elements is reshaped to fit, so
+        a (1, 15600) window fits YAMNet's (15600,) input and vice versa.
+        """
+        data = np.asarray(data)
+        if self.quantized() and np.issubdtype(data.dtype, np.floating):
+            scale, zero_point = self.input_quantization
+            info = np.iinfo(self.input_dtype)
+            data = np.clip(np.rint(data / scale + zero_point), info.min, info.max)
+        if data.shape != self.input_shape and data.size == int(np.prod(self.input_shape)):
+            data = data.reshape(self.input_shape)
+        self.interpreter.set_tensor(self.input_index, np.asarray(data, dtype=self.input_dtype))
+
+    def output(self):
+        """Copy of the first output row, dequantized to float32 for integer models."""
+        row = self.interpreter.get_tensor(self.output_index)[0]
+        scale, zero_point = self.output_quantization
+        if row.dtype != np.float32 and scale:
+            return (row.astype(np.float32) - zero_point) * np.float32(scale)
+        return row.copy()
+
+    def adapter(self, cls):
+        """Build cls(interpreter) once and reuse it, e.g. model.adapter(PetDetector)."""
+        with self.lock:
+            if cls not in self._adapters:
+                self._adapters[cls] = cls(self.interpreter)
+            return self._adapters[cls]
+
+    def warm_up(self):
+        """Run one inference on zeros so the first real request doesn't pay for lazy setup."""
+        start = time.perf_counter()
+        with self.lock, cpu_config.pinned(self.name):
+            detail = self.input_details[0]
+            self.interpreter.set_tensor(detail['index'], np.zeros(detail['shape'], dtype=detail['dtype']))
+            self.interpreter.invoke()
+        self.warmup_seconds = time.perf_counter() - start
+
+
+class InterpreterPool:
+    """
+    Several interpreters for the same model, so independent requests (e.g.
+    windows from different rooms) can be scored in parallel: TFLite releases
+    the GIL inside invoke(). score() borrows whichever interpreter is free.
+    Every member is its own copy (with its own arena), created with the
+    thread budget of a size-way pool so they don't oversubscribe the cores
+    between them; all are loaded on first use (or by the registry's
+    warm_up(), which warms a model's pool instead of its shared interpreter).
+    """
+
+    def __init__(self, registry, name, size):
+        self.registry = registry
+        self.name = name
+        self.size = size
+        self.invokes = 0
+        self.models = []
+        self._free = None
+        self._lock = threading.Lock()
+
+    def _ensure(self):
+        with self._lock:
+            if self._free is None:
+                self.models = [LoadedModel(self.name, self.registry.paths[self.name], instances=self.size)
+                               for _ in range(self.size)]
+                self._free = queue.Queue()
+                for model in self.models:
+                    self._free.put(model)
+                print(f"[MODELS] Pool of {self.size} {self.name} interpreter(s) ready")
+        return self._free
+
+    def score(self, data):
+        """Run one inference and return a copy of the first output row."""
+        free = self._free or self._ensure()
+        model = free.get()
+        try:
+            with model.lock:
+                model.set_input(data)
+                model.interpreter.invoke()
+                scores = model.output()
+            self.invokes += 1
+            return scores
+        finally:
+            free.put(model)
+
+    def idle(self):
+        return self.size if self._free is None else self._free.qsize()
+
+    def warm_up(self):
+        self._ensure()
+        for model in self.models:
+            model.warm_up()
+
+
+class ModelRegistry:
+    """
+    One place that owns every TFLite interpreter. Models are only loaded the
+    first time something asks for them, and can be warmed up in the
+    background while the sensors are already running.
+    """
+
+    def __init__(self, paths=MODEL_PATHS, quantized=QUANTIZED_MODELS):
+        self.paths = dict(paths)
+        for name in quantized:
+            path = QUANTIZED_PATHS.get(name)
+            if path and os.path.exists(path):
+                self.paths[name] = path
+            else:
+                print(f"[MODELS] No int8 variant of {name} ({path}); using {self.paths.get(name)}")
+        self._models = {}
+        self._pools = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Return the LoadedModel for name, loading it on first use (thread-safe)."""
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+            event = self._loading.get(name)
+            owner = event is None
+            if owner:
+                event = self._loading[name] = threading.Event()
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                if name not in self._models:
+                    raise RuntimeError(f"Model {name} failed to load")
+                return self._models[name]
+
+        try:
+            model = LoadedModel(name, self.paths[name])
+            print(f"[MODELS] Loaded {name} in {model.load_seconds * 1000:.0f} ms ({model.num_threads} thread(s))")
+            with self._lock:
+                self._models[name] = model
+            return model
+        finally:
+            with self._lock:
+                del self._loading[name]
+            event.set()
+
+    def pool(self, name, size):
+        """InterpreterPool of size interpreters for name (loaded on first score)."""
+        pool = self._pools[name] = InterpreterPool(self, name, size)
+        return pool
+
+    def loaded(self, name):
+        return name in self._models
+
+    def available(self, name):
+        return os.path.exists(self.paths.get(name, ""))
+
+    def warm_up(self, *names, background=True):
+        """Load and warm up the named models (or their pools), by default on a background thread."""
+        def run():
+            for name in names:
+                if not self.available(name):
+                    print(f"[MODELS] Skipping warm-up of {name}: {self.paths.get(name)} not found")
+                    continue
+                try:
+                    (self._pools.get(name) or self.get(name)).warm_up()
+                except Exception as e:
+                    print(f"[MODELS] Warm-up of {name} failed:", e)
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {name: {"load_ms": round(m.load_seconds * 1000, 1),
+                       "warmup_ms": None if m.warmup_seconds is None else round(m.warmup_seconds * 1000, 1)}
+                for name, m in self._models.items()}
+
+
+# Shared registry used by the main scripts and the test scripts
+registry = ModelRegistry()
@@ -0,0 +1,93 @@
+import threading
+import time
+from gpiozero import DigitalInputDevice
+
+NEAR_CM = 50        # door distance that counts as "something is there"
+CLEAR_CM = 60       # must move back beyond this before a new approach counts (hysteresis)
+COOLDOWN = 10.0     # seconds after an event during which new triggers are ignored
+PIR_BOUNCE = 0.05   # seconds of edge debounce on the PIR input
+
+
+class MotionGate:
+    """
+    Turns PIR edges and door-distance readings into discrete motion events,
+    so the camera and MobileNet run once per new arrival instead of on every
+    loop while the pet sits at the door.
+
+    - PIR: gpiozero when_activated/when_deactivated callbacks with bounce_time,
+      no polling.
+    - Distance: an event fires when the reading drops below near_cm; it is
+      re-armed only after the reading climbs back above clear_cm.
+    - Any trigger within cooldown seconds of the last event is suppressed.
+      A distance arrival suppressed that way isn't latched, so the next
+      near reading after the cooldown still fires it.
+
+    on_motion(source, detail) is called from the GPIO callback thread or the
+    caller of update_distance(), so it should only queue work.
+    """
+
+    def __init__(self, on_motion, near_cm=NEAR_CM, clear_cm=CLEAR_CM, cooldown=COOLDOWN, clock=time.monotonic):
+        self.on_motion = on_motion
+        self.near_cm = near_cm
+        self.clear_cm = clear_cm
+        self.cooldown = cooldown
+        self.clock = clock
+        self.events = 0
+        self.suppressed = 0
+        self.near = False           # distance trigger latched until the reading clears
+        self.pir_active = False
+        self.pir = None
+        self._last_event = None
+        self._lock = threading.Lock()
+
+    # ---------- Sources ----------
+    def attach_pir(self, pin, pull_up=False, bounce_time=PIR_BOUNCE, pin_factory=None):
+        """Watch a PIR (active-high) or IR (pull_up=True, active-low) sensor through edge callbacks."""
+        self.pir = DigitalInputDevice(pin, pull_up=pull_up, bounce_time=bounce_time, pin_factory=pin_factory)
+        self.pir.when_activated = self._pir_activated
+        self.pir.when_deactivated = self._pir_deactivated
+        return self.pir
+
+    def _pir_activated(self):
+        self.pir_active = True
+        self._trigger("pir", None)
+
+    def _pir_deactivated(self):
+        self.pir_active = False
+
+    def update_distance(self, distance_cm):
+        """Feed one filtered door-distance reading (cm, or None for no echo)."""
+        if distance_cm is None:
+            return
+        with self._lock:
+            if self.near:
+                if distance_cm > self.clear_cm:
+                    self.near = False
+                return
+            if distance_cm >= self.near_cm:
+                return
+        if self._trigger("distance", distance_cm):
+            with self._lock:
+                self.near = True
+
+    # ---------- Events ----------
+    def _trigger(self, source, detail):
+        """Fire on_motion unless the cooldown is running; returns whether it fired."""
+        now = self.clock()
+        with self._lock:
+            if self._last_event is not None and now - self._last_event < self.cooldown:
+                self.suppressed += 1
+                return False
+            self._last_event = now
+            self.events += 1
+        self.on_motion(source, detail)
+        return True
+
+    def stats(self):
+        return {"events": self.events, "suppressed": self.suppressed,
+                "near": self.near, "pir_active": self.pir_active}
+
+    def close(self):
+        if self.pir:
+            self.pir.close()
+            self.pir = None
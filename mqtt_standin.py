@@ -0,0 +1,133 @@
+import socket
+import threading
+from collections import Counter
+
+# Minimal local MQTT 3.1.1 broker for benchmarks: accepts paho clients, acks
+# QoS 1/2 publishes and counts what arrives. No routing to subscribers.
+
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+SUBSCRIBE, SUBACK, PINGREQ, PINGRESP, DISCONNECT = 8, 9, 12, 13, 14
+
+
+class StandinBroker:
+    """Counts messages and payload bytes per topic; stop() simulates the broker going away."""
+
+    def __init__(self, host="127.0.0.1", port=1884):
+        self.address = (host, port)
+        self.messages = []          # (topic, payload bytes)
+        self.per_topic = Counter()
+        self.payload_bytes = 0
+        self.acks = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._conns = []
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self.address)
+        self._server.listen()
+        threading.Thread(target=self._accept_loop, args=(self._server,), daemon=True).start()
+        return self
+
+    def stop(self):
+        """Close the listener and drop every client connection."""
+        if self._server:
+            # shutdown() wakes the blocked accept(); close() alone leaves the port listening
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.messages.clear()
+            self.per_topic.clear()
+            self.payload_bytes = 0
+            self.acks = 0
+
+    @property
+    def count(self):
+        return len(self.messages)
+
+    def _accept_loop(self, server):
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._conns.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        stream = conn.makefile("rb")
+        try:
+            while True:
+                header = stream.read(1)
+                if not header:
+                    return
+                packet_type, flags = header[0] >> 4, header[0] & 0x0F
+                body = stream.read(self._remaining_length(stream))
+                if not self._handle(conn, packet_type, flags, body):
+                    return
+        except (OSError, ValueError):
+            return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _remaining_length(stream):
+        length, shift = 0, 0
+        while True:
+            byte = stream.read(1)
+            if not byte:
+                raise ValueError("connection closed")
+            length |= (byte[0] & 0x7F) << shift
+            if not byte[0] & 0x80:
+                return length
+            shift += 7
+
+    def _handle(self, conn, packet_type, flags, body):
+        if packet_type == CONNECT:
+            conn.sendall(bytes([CONNACK << 4, 2, 0, 0]))
+        elif packet_type == PUBLISH:
+            qos = (flags >> 1) & 0x03
+            topic_len = int.from_bytes(body[:2], "big")
+            topic = body[2:2 + topic_len].decode()
+            offset = 2 + topic_len
+            packet_id = body[offset:offset + 2] if qos else b""
+            payload = body[offset + len(packet_id):]
+            with self._lock:
+                self.messages.append((topic, payload))
+                self.per_topic[topic] += 1
+                self.payload_bytes += len(payload)
+                self.acks += 1 if qos else 0
+            if qos == 1:
+                conn.sendall(bytes([PUBACK << 4, 2]) + packet_id)
+            elif qos == 2:
+                conn.sendall(bytes([PUBREC << 4, 2]) + packet_id)
+        elif packet_type == PUBREL:
+            conn.sendall(bytes([PUBCOMP << 4, 2]) + body[:2])
+        elif packet_type == SUBSCRIBE:
+            # Grant QoS 0 for every topic filter; nothing is ever delivered
+            n_topics, offset = 0, 2
+            while offset < len(body):
+                offset += 2 + int.from_bytes(body[offset:offset + 2], "big") + 1
+                n_topics += 1
+            conn.sendall(bytes([SUBACK << 4, 2 + n_topics]) + body[:2] + bytes(n_topics))
+        elif packet_type == PINGREQ:
+            conn.sendall(bytes([PINGRESP << 4, 0]))
+        elif packet_type == DISCONNECT:
+            return False
+        return True
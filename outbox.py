@@ -0,0 +1,170 @@
+import sqlite3
+import threading
+import time
+
+OUTBOX_PATH = "outbox.db"
+
+
+class _Stored:
+    """Returned by Outbox.publish in place of paho's MQTTMessageInfo."""
+    rc = 0
+
+    def __init__(self, row_id):
+        self.mid = row_id
+
+
+class Outbox:
+    """
+    Store-and-forward queue for MQTT. publish() only appends to a SQLite (WAL)
+    table on disk; a drain thread forwards rows to the paho client while it is
+    connected, oldest first, at most drain_rate messages/s in batches of
+    batch_size, and deletes them once the broker has acknowledged them.
+
+    With compact=True a message published with a key replaces any older
+    pending message with the same key, which suits state-like telemetry after
+    a long outage. Messages without a key are never compacted: a batched
+    payload may carry values that the next one on the topic does not.
+    """
+
+    def __init__(self, client, path=OUTBOX_PATH, drain_rate=50.0, batch_size=50,
+                 compact=False, max_rows=500000, ack_timeout=10.0):
+        self.client = client
+        self.drain_rate = drain_rate
+        self.batch_size = batch_size
+        self.compact = compact
+        self.max_rows = max_rows
+        self.ack_timeout = ack_timeout
+        self.stored = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0       # publishes the client refused (rc != 0), e.g. disconnected mid-batch
+        self.retried = 0      # rows sent but not acknowledged; they stay on disk and go out again
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS outbox (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                topic TEXT NOT NULL,
+                                payload TEXT NOT NULL,
+                                qos INTEGER NOT NULL,
+                                key TEXT NOT NULL,
+                                created REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_key ON outbox (key)")
+        self._pending = self._count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._acked = set()          # mids the broker has acknowledged (on_publish)
+        self._ack = threading.Event()
+        self._user_on_publish = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def publish(self, topic, payload, qos=1, key=None):
+        """Append one message to the on-disk queue (same call shape as client.publish)."""
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+        key = key or ""
+        with self._lock:
+            if self.compact and key:
+                replaced = self._db.execute("DELETE FROM outbox WHERE key = ?", (key,)).rowcount
+                self.dropped += replaced
+                self._pending -= replaced
+            row_id = self._db.execute(
+                "INSERT INTO outbox (topic, payload, qos, key, created) VALUES (?, ?, ?, ?, ?)",
+                (topic, payload, qos, key, time.time())).lastrowid
+            self.stored += 1
+            self._pending += 1
+            if self.max_rows and row_id % 1000 == 0:
+                self._trim()
+        self._wake.set()
+        return _Stored(row_id)
+
+    def _trim(self):
+        """Keep the SD card bounded: drop the oldest rows beyond max_rows."""
+        excess = self._pending - self.max_rows
+        if excess > 0:
+            self._db.execute("DELETE FROM outbox WHERE id IN (SELECT id FROM outbox ORDER BY id LIMIT ?)", (excess,))
+            self.dropped += excess
+            self._pending -= excess
+
+    def _count(self):
+        return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def pending(self):
+        """Rows on disk; a running count, so it is cheap enough for the drain loop and gauges."""
+        return self._pending
+
+    # ---------- Drain ----------
+    def start(self):
+        self._user_on_publish = self.client.on_publish
+        self.client.on_publish = self._on_publish
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self._ack.set()
+        if self._thread:
+            self._thread.join(timeout=self.ack_timeout + 2)
+            self.client.on_publish = self._user_on_publish
+        with self._lock:
+            self._db.close()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if not self.client.is_connected() or not self.pending():
+                self._wake.wait(0.5)
+                self._wake.clear()
+                continue
+
+            started = time.monotonic()
+            with self._lock:
+                rows = self._db.execute("SELECT id, topic, payload, qos FROM outbox ORDER BY id LIMIT ?",
+                                        (self.batch_size,)).fetchall()
+                self._acked.clear()      # late acks of an earlier, already retried batch
+            infos = [(row_id, self.client.publish(topic, payload, qos=qos)) for row_id, topic, payload, qos in rows]
+            acked = self._wait_for_acks(infos)
+            self.failed += sum(1 for _, info in infos if info.rc != 0)
+            self.retried += len(rows) - len(acked)
+
+            with self._lock:
+                self._db.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id in acked])
+                self._pending -= len(acked)
+            self.sent += len(acked)
+
+            if len(acked) < len(rows):
+                # Broker went away mid-batch; unacked rows stay on disk for the next attempt
+                self._stopped.wait(1.0)
+                continue
+
+            # Rate limit: a batch of n rows takes at least n / drain_rate seconds
+            remaining = len(rows) / self.drain_rate - (time.monotonic() - started)
+            if remaining > 0:
+                self._stopped.wait(remaining)
+
+    def _on_publish(self, client, userdata, mid):
+        # Runs on paho's network thread, before the message info is marked published
+        with self._lock:
+            self._acked.add(mid)
+            self._ack.set()
+        if self._user_on_publish:
+            self._user_on_publish(client, userdata, mid)
+
+    def _wait_for_acks(self, infos):
+        """Block until every accepted publish in the batch is acknowledged or ack_timeout passes."""
+        mids = {info.mid for _, info in infos if info.rc == 0}
+        deadline = time.monotonic() + self.ack_timeout
+        while not self._stopped.is_set():
+            with self._lock:
+                if mids <= self._acked:
+                    break
+                self._ack.clear()    # under the lock, so an ack arriving now sets it again
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._ack.wait(remaining)
+        with self._lock:
+            return [row_id for row_id, info in infos if info.rc == 0 and info.mid in self._acked]
@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import paho.mqtt.client as mqtt
+from mqtt_standin import StandinBroker
+from outbox import Outbox
+from telemetry import TOPIC
+from telemetry_bench import simulated_readings
+
+# Outage drill for the MQTT outbox: kill the local broker, queue an hour of
+# simulated telemetry (one message per reading, the worst case), bring the
+# broker back and check that the whole backlog arrives, in order.
+# Usage: python outbox_bench.py [simulated minutes] [drain rate msg/s]
+
+PORT = 18832
+MINUTES = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+DRAIN_RATE = float(sys.argv[2]) if len(sys.argv) > 2 else 2000.0
+
+
+def wait_until(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+if __name__ == "__main__":
+    db_path = os.path.join(tempfile.mkdtemp(), "outbox.db")
+    broker = StandinBroker(port=PORT).start()
+
+    client = mqtt.Client()
+    client.reconnect_delay_set(min_delay=1, max_delay=2)
+    client.connect(*broker.address)
+    client.loop_start()
+    outbox = Outbox(client, db_path, drain_rate=DRAIN_RATE, batch_size=200).start()
+    assert wait_until(client.is_connected, 5), "could not connect to the stand-in broker"
+
+    broker.stop()
+    assert wait_until(lambda: not client.is_connected(), 5), "client did not notice the outage"
+    print("[OUTBOX] Broker down")
+
+    start = time.perf_counter()
+    for seq, (t, device, key, value) in enumerate(simulated_readings(MINUTES)):
+        outbox.publish(TOPIC.format(device=device), json.dumps({key: value, "seq": seq}))
+    queued = outbox.pending()
+    print(f"[OUTBOX] Queued {queued} messages ({MINUTES} simulated minutes) in "
+          f"{time.perf_counter() - start:.2f} s, db {os.path.getsize(db_path) / 1024:.0f} KiB")
+
+    broker = StandinBroker(port=PORT).start()
+    start = time.perf_counter()
+    drained = wait_until(lambda: outbox.pending() == 0, 60 + queued / DRAIN_RATE)
+    drain_time = time.perf_counter() - start
+
+    seqs = [json.loads(payload)["seq"] for _, payload in broker.messages]
+    outbox.stop()
+    client.loop_stop()
+    broker.stop()
+
+    print(f"[OUTBOX] Drained {broker.count}/{queued} in {drain_time:.2f} s "
+          f"(includes reconnect) -> {broker.count / drain_time:.0f} msg/s")
+    assert drained, f"{outbox.pending()} messages still queued"
+    assert set(seqs) == set(range(queued)), "messages missing after drain"
+    assert seqs == sorted(seqs), "backlog was not delivered oldest-first"
+    print(f"[OUTBOX] OK: every message delivered oldest-first ({len(seqs) - len(set(seqs))} duplicates)")
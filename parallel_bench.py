@@ -0,0 +1,125 @@
+import os
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")   # one core per "invoke", like num_threads=1
+import sys
+import threading
+import time
+import tflite_runtime.interpreter as tflite
+from cpu_config import cpu_config
+from model_registry import LoadedModel, registry
+from pet_detector import PetDetector
+from quantize_models import snapshot_frames, audio_windows
+from room_audio_bench import SyntheticModel
+
+# Audio + vision throughput, serial vs configured:
+#   serial     - one thread, interpreters with default options, a YAMNet
+#                window then a MobileNet frame, over and over (the old path)
+#   threaded   - an audio and a vision worker, unpinned, default interpreters
+#                (what running the stages side by side does on its own)
+#   configured - the same two workers, each pinned to its cpu_config group,
+#                interpreters built with cpu_config's threads/XNNPACK
+# Both stages are kept busy for SECONDS and counted separately. Only
+# configured vs threaded shows what the configuration itself is worth; with
+# fewer than two cores nothing can run in parallel and the workers just
+# time-share. Settings come from the environment like the main scripts
+# (AUDIO_CORES, VISION_CORES, MODEL_THREADS, XNNPACK; see cpu_config.py).
+# Without yamnet.tflite the audio stage is a synthetic CPU load of INVOKE_MS
+# per window.
+# Usage: python parallel_bench.py [seconds] [invoke_ms]
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+INVOKE_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 15.0
+
+
+def default_stages():
+    """(audio fn, vision fn) on interpreters created the old way."""
+    pet = tflite.Interpreter(model_path=registry.paths["pet"])
+    pet.allocate_tensors()
+    vision = PetDetector(pet).predict
+    if registry.available("yamnet"):
+        yamnet = tflite.Interpreter(model_path=registry.paths["yamnet"])
+        yamnet.allocate_tensors()
+        index, out = yamnet.get_input_details()[0]['index'], yamnet.get_output_details()[0]['index']
+
+        def audio(window):
+            yamnet.set_tensor(index, window)
+            yamnet.invoke()
+            return yamnet.get_tensor(out)[0]
+        return audio, vision
+    return SyntheticModel(INVOKE_MS).score, vision
+
+
+def configured_stages():
+    vision = LoadedModel("pet", registry.paths["pet"]).adapter(PetDetector).predict
+    if registry.available("yamnet"):
+        return registry.pool("yamnet", 1).score, vision
+    return SyntheticModel(INVOKE_MS).score, vision
+
+
+def cycle(items):
+    while True:
+        yield from items
+
+
+def run_serial(audio, vision, windows, frames):
+    counts = {"audio": 0, "vision": 0}
+    deadline = time.perf_counter() + SECONDS
+    for window, frame in zip(cycle(windows), cycle(frames)):
+        audio(window)
+        vision(frame)
+        counts["audio"] += 1
+        counts["vision"] += 1
+        if time.perf_counter() > deadline:
+            break
+    return counts
+
+
+def run_workers(audio, vision, windows, frames, pin=True):
+    counts = {"audio": 0, "vision": 0}
+    stopped = threading.Event()
+
+    def worker(group, fn, items):
+        if pin:
+            cpu_config.pin(group)
+        for item in cycle(items):
+            if stopped.is_set():
+                return
+            fn(item)
+            counts[group] += 1
+
+    threads = [threading.Thread(target=worker, args=("audio", audio, windows)),
+               threading.Thread(target=worker, args=("vision", vision, frames))]
+    for t in threads:
+        t.start()
+    time.sleep(SECONDS)
+    stopped.set()
+    for t in threads:
+        t.join()
+    return counts
+
+
+if __name__ == "__main__":
+    windows = audio_windows()[:16]
+    frames = snapshot_frames()
+    print(f"{len(os.sched_getaffinity(0))} core(s); {cpu_config.summary()}")
+    if not registry.available("yamnet"):
+        print(f"(audio stage: synthetic {INVOKE_MS:.0f} ms load, yamnet.tflite not found)")
+
+    results = {"serial": run_serial(*default_stages(), windows, frames),
+               "threaded": run_workers(*default_stages(), windows, frames, pin=False),
+               "configured": run_workers(*configured_stages(), windows, frames)}
+    print("              audio/s   vision/s")
+    for label, counts in results.items():
+        print(f"  {label:10s} {counts['audio'] / SECONDS:8.1f}  {counts['vision'] / SECONDS:9.1f}")
+
+    serial, configured = results["serial"], results["configured"]
+    if len(os.sched_getaffinity(0)) < 2:
+        print("\n1 core: the stages can only time-share, so no parallel speed-up is possible here. "
+              "The workers split the core unevenly\n(the faster stage gets more calls), which is why "
+              "audio/s drops below serial. Keep the serial defaults\n(no pinning, 1 thread per model) "
+              "on a single core; cpu_config already does.")
+    elif configured["audio"] >= serial["audio"] and configured["vision"] >= serial["vision"]:
+        print(f"\nconfigured vs serial: audio x{configured['audio'] / serial['audio']:.2f}, "
+              f"vision x{configured['vision'] / serial['vision']:.2f}")
+    else:
+        print("\nconfigured is slower than serial for at least one stage on this machine: "
+              "check AUDIO_CORES / VISION_CORES / MODEL_THREADS before deploying it")
@@ -0,0 +1,120 @@
+import numpy as np
+from PIL import Image
+
+
+def load_frame(image_path, size=(224, 224)):
+    """
+    Decode an image at (close to) model resolution. For JPEGs, draft() lets the
+    decoder skip straight to a 1/2, 1/4 or 1/8 scale instead of decoding the
+    full image and then shrinking it.
+    """
+    img = Image.open(image_path)
+    img.draft("RGB", size)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != size:
+        img = img.resize(size, Image.BILINEAR)
+    return np.asarray(img)
+
+
+class PetDetector:
+    """
+    MobileNet pet detector that writes each frame straight into the
+    interpreter's own input tensor instead of building temporary arrays.
+    """
+
+    def __init__(self, interpreter, threshold=0.5):
+        self.interpreter = interpreter
+        self.threshold = threshold
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+
+        self.input_index = input_details['index']
+        self.output_index = output_details['index']
+        self.input_dtype = input_details['dtype']
+        _, height, width, _ = input_details['shape']
+        self.size = (int(width), int(height))
+        self.input_quantization = input_details['quantization']
+        self.output_quantization = output_details['quantization']
+        self._input_view = interpreter.tensor(self.input_index)
+        self._output_view = interpreter.tensor(self.output_index)
+
+        # Scratch buffer for requantising into models that aren't plain pixel/255 inputs
+        self._scratch = None
+        scale, zero_point = self.input_quantization
+        if self.input_dtype != np.float32 and scale and not self._pixel_scale(scale, zero_point):
+            self._scratch = np.empty(tuple(input_details['shape'][1:]), dtype=np.float32)
+
+    def _pixel_scale(self, scale, zero_point):
+        """True when the quantized input is just the raw pixel value (optionally shifted to int8)."""
+        return abs(scale * 255.0 - 1.0) < 1e-3 and zero_point in (0, -128)
+
+    def _load(self, image):
+        """uint8 frame at model size from a frame of any size or an image path."""
+        if isinstance(image, str):
+            return load_frame(image, self.size)
+        if image.shape[1::-1] != self.size:
+            return np.asarray(Image.fromarray(image).resize(self.size, Image.BILINEAR))
+        return image
+
+    def preprocess(self, image):
+        """Fill the input tensor from a uint8 HxWx3 frame or an image path."""
+        tensor = self._input_view()
+        self._fill(self._load(image), tensor[0])
+        # The interpreter refuses to invoke while we hold a view of its buffers
+        del tensor
+
+    def _fill(self, image, out):
+        """Normalise or requantise a uint8 frame into out without full-size temporaries."""
+        if self.input_dtype == np.float32:
+            np.multiply(image, np.float32(1 / 255.0), out=out)
+            return
+
+        scale, zero_point = self.input_quantization
+        if not scale:
+            np.copyto(out, image, casting="unsafe")
+        elif self._scratch is None:
+            # uint8 input with scale 1/255 is the pixel itself; int8 is the pixel minus 128
+            if zero_point:
+                np.subtract(image, np.uint8(128), out=out, casting="unsafe")
+            else:
+                np.copyto(out, image)
+        else:
+            info = np.iinfo(self.input_dtype)
+            np.multiply(image, np.float32(1 / (255.0 * scale)), out=self._scratch)
+            self._scratch += zero_point
+            np.rint(self._scratch, out=self._scratch)
+            np.clip(self._scratch, info.min, info.max, out=self._scratch)
+            np.copyto(out, self._scratch, casting="unsafe")
+
+    def predict(self, image):
+        """Return the pet probability for one frame or image path."""
+        self.preprocess(image)
+        self.interpreter.invoke()
+        # Read the score in place rather than copying the whole output tensor
+        return self._dequantize(self._output_view().flat[0])
+
+    def predict_batch(self, images):
+        """
+        Pet probabilities for several frames in one invoke(). The interpreter
+        must have been resized to a batch of at least len(images); unused
+        slots keep their old contents and are ignored.
+        """
+        tensor = self._input_view()
+        for slot, image in enumerate(images):
+            self._fill(self._load(image), tensor[slot])
+        del tensor
+        self.interpreter.invoke()
+        output = self._output_view()
+        values = [self._dequantize(output[slot].flat[0]) for slot in range(len(images))]
+        del output
+        return values
+
+    def _dequantize(self, value):
+        scale, zero_point = self.output_quantization
+        if scale:
+            value = (float(value) - zero_point) * scale
+        return float(value)
+
+    def is_pet(self, image):
+        return self.predict(image) > self.threshold
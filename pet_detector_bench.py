@@ -0,0 +1,64 @@
+import glob
+import sys
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+import tflite_runtime.interpreter as tflite
+from camera_service import snapshot_paths
+from pet_detector import PetDetector
+
+# Microbenchmark: old is_pet_in_image() preprocessing vs PetDetector, over snapshots/
+# Usage: python pet_detector_bench.py [rounds]
+
+MODEL_PATH = "mobilenet_pet.tflite"
+IMAGES = snapshot_paths() + sorted(glob.glob("test_*.jpg"))
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+interpreter = tflite.Interpreter(model_path=MODEL_PATH)
+interpreter.allocate_tensors()
+pet_input = interpreter.get_input_details()
+pet_output = interpreter.get_output_details()
+detector = PetDetector(interpreter)
+
+
+def legacy_predict(image_path):
+    """The original is_pet_in_image() body."""
+    img = Image.open(image_path).resize((224, 224))
+    input_data = np.expand_dims(np.array(img) / 255.0, axis=0).astype(np.float32)
+    interpreter.set_tensor(pet_input[0]['index'], input_data)
+    interpreter.invoke()
+    output = interpreter.get_tensor(pet_output[0]['index'])
+    return np.array(output).flatten()[0]
+
+
+def measure(name, fn):
+    fn(IMAGES[0])  # warm-up
+    times = []
+    for _ in range(ROUNDS):
+        for path in IMAGES:
+            start = time.perf_counter()
+            fn(path)
+            times.append(time.perf_counter() - start)
+
+    # Allocations are measured in a separate pass; tracemalloc slows everything down
+    peaks = []
+    tracemalloc.start()
+    for path in IMAGES:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn(path)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    times_ms = np.array(times) * 1000
+    print(f"{name:<14} mean {times_ms.mean():7.2f} ms | p95 {np.percentile(times_ms, 95):7.2f} ms"
+          f" | peak alloc {np.mean(peaks) / 1024:8.1f} KiB/frame")
+    return times_ms.mean()
+
+
+if __name__ == "__main__":
+    print(f"{len(IMAGES)} images x {ROUNDS} rounds, input dtype {detector.input_dtype.__name__}")
+    before = measure("before", legacy_predict)
+    after = measure("PetDetector", detector.predict)
+    print(f"Speed-up: {before / after:.2f}x")
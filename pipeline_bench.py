@@ -0,0 +1,214 @@
+import contextlib
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+# Offline replay of the full Lastmain.py pipeline, no Pi required:
+#   - gpiozero MockFactory pins; the ultrasonic echoes follow a scripted scene
+#     (a pet walks up to the door every few seconds, the food slowly runs down)
+#   - FakeFrameSource replaying the snapshots in snapshots/ and test_*.jpg
+#   - received_audio.wav streamed in real time to the UDP audio port
+#   - the local MQTT stand-in broker behind the outbox
+# Reports p50/p95/p99 per stage, task throughput and peak RSS, and writes the
+# results as JSON so two commits can be compared.
+# Usage: python pipeline_bench.py [seconds] [results.json] [baseline.json]
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+RESULTS_PATH = sys.argv[2] if len(sys.argv) > 2 else "pipeline_bench.json"
+BASELINE_PATH = sys.argv[3] if len(sys.argv) > 3 else None
+
+BROKER_PORT = 18833
+AUDIO_FILE = "received_audio.wav"
+FRAME_PATTERNS = [os.path.join("snapshots", "**", "*.jpg"), "test_*.jpg"]   # read before SNAPSHOT_DIR moves
+SENSOR_PINS = {"food": (24, 23), "door": (22, 27)}   # (TRIG, ECHO) as wired in Lastmain.py
+PET_VISIT_EVERY = 6.0    # seconds between pet visits at the door
+PET_VISIT_LENGTH = 2.0
+
+os.environ["MQTT_BROKER"] = "127.0.0.1"
+os.environ["MQTT_PORT"] = str(BROKER_PORT)
+WORK_DIR = tempfile.mkdtemp()   # outbox and motion/alert snapshots go here, not into the repo
+os.environ["OUTBOX_PATH"] = os.path.join(WORK_DIR, "outbox.db")
+os.environ["SNAPSHOT_DIR"] = os.path.join(WORK_DIR, "snapshots")
+
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory, MockPWMPin, MockTriggerPin
+from camera_service import CameraService, FakeFrameSource
+from model_registry import registry
+from mqtt_standin import StandinBroker
+from pet_detector import PetDetector
+from runtime import LatencyStats
+
+STAGES = ("ultrasonic", "capture", "mobilenet", "yamnet", "publish", "actuation")
+
+
+class PWMTriggerPin(MockTriggerPin, MockPWMPin):
+    """MockTriggerPin on a factory whose default pins are PWM-capable (needed by the servos)."""
+
+
+def echo_time(distance_cm):
+    return 2 * distance_cm / 34300
+
+
+def setup_pins():
+    """Mock pins must exist before Lastmain is imported so its devices pick them up."""
+    factory = MockFactory(pin_class=MockPWMPin)
+    Device.pin_factory = factory
+    triggers = {}
+    for name, (trigger, echo) in SENSOR_PINS.items():
+        triggers[name] = factory.pin(trigger, pin_class=PWMTriggerPin,
+                                     echo_pin=factory.pin(echo), echo_time=echo_time(80))
+    return triggers
+
+
+def run_scene(triggers, stopped):
+    """Move the simulated objects in front of the two ultrasonics."""
+    start = time.monotonic()
+    while not stopped.wait(0.1):
+        t = time.monotonic() - start
+        at_door = t % PET_VISIT_EVERY > PET_VISIT_EVERY - PET_VISIT_LENGTH
+        triggers["door"].echo_time = echo_time(30 if at_door else 85)
+        triggers["food"].echo_time = echo_time(min(5 + t * 0.2, 28))
+
+
+def stream_audio(path, port, stopped):
+    """Send the WAV to the audio stream port in 512-sample packets, paced in real time."""
+    with wave.open(path, "rb") as wf:
+        frames = wf.readframes(wf.getnframes())
+        rate = wf.getframerate()
+    packet = 1024
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start, offset = time.monotonic(), 0
+    while not stopped.is_set():
+        sock.sendto(frames[offset % len(frames):offset % len(frames) + packet], ("127.0.0.1", port))
+        offset += packet
+        delay = start + offset / 2 / rate - time.monotonic()
+        if delay > 0:
+            stopped.wait(delay)
+    sock.close()
+
+
+def timed(stats, fn):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.record(time.perf_counter() - start)
+    return wrapper
+
+
+def instrument(app, stats):
+    """Wrap each stage's entry point on the live objects; the pipeline code itself is untouched."""
+    for timer in app.ultrasonic.timers.values():
+        timer.measure = timed(stats["ultrasonic"], timer.measure)
+    app.camera.latest_frame = timed(stats["capture"], app.camera.latest_frame)
+    detector = registry.get("pet").adapter(PetDetector)
+    detector.predict = timed(stats["mobilenet"], detector.predict)
+    app.emotion_tracker.score_fn = timed(stats["yamnet"], app.emotion_tracker.score_fn)
+    app.outbox.publish = timed(stats["publish"], app.outbox.publish)
+    for actuator in (app.door_actuator, app.food_actuator):
+        actuator._move = timed(stats["actuation"], actuator._move)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    print(f"\nvs {baseline.get('commit')}:")
+    for stage, summary in results["stages"].items():
+        old = baseline["stages"].get(stage, {})
+        if summary.get("count") and old.get("count"):
+            change = 100 * (summary["p95_ms"] / old["p95_ms"] - 1) if old["p95_ms"] else 0.0
+            print(f"  {stage:<10} p95 {old['p95_ms']:8.2f} -> {summary['p95_ms']:8.2f} ms ({change:+.0f}%)")
+    for stage, rate in results.get("inferences_per_hour", {}).items():
+        old = baseline.get("inferences_per_hour", {}).get(stage)
+        if old is not None:
+            print(f"  {stage:<10} inferences/hour {old} -> {rate}")
+    if "cpu_s" in baseline:
+        print(f"  CPU {baseline['cpu_s']:.2f} -> {results['cpu_s']:.2f} s")
+
+
+if __name__ == "__main__":
+    broker = StandinBroker(port=BROKER_PORT).start()
+    triggers = setup_pins()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        import Lastmain as app
+    assert (app.TRIG1, app.ECHO1, app.TRIG2, app.ECHO2) == SENSOR_PINS["food"] + SENSOR_PINS["door"], \
+        "SENSOR_PINS no longer match Lastmain.py"
+
+    app.camera = CameraService(FakeFrameSource(FRAME_PATTERNS, fps=15))
+    yamnet_available = registry.available("yamnet")
+    app.STREAM_AUDIO = yamnet_available
+    if not yamnet_available:
+        # Without yamnet.tflite the audio task could only fail; leave it idle instead of counting errors
+        app.handle_emotion = lambda: None
+    stats = {stage: LatencyStats(size=100000) for stage in STAGES}
+    instrument(app, stats)
+
+    stopped = threading.Event()
+    helpers = [threading.Thread(target=run_scene, args=(triggers, stopped), daemon=True)]
+    if yamnet_available:
+        from audio_stream import UDP_PORT
+        helpers.append(threading.Thread(target=stream_audio, args=(AUDIO_FILE, UDP_PORT, stopped), daemon=True))
+
+    print(f"[BENCH] Replaying the pipeline for {SECONDS:.0f} s ...")
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        app.start()
+        for thread in helpers:
+            thread.start()
+        started, cpu_started = time.monotonic(), time.process_time()
+        time.sleep(SECONDS)
+        task_stats = app.runtime.stats()
+        elapsed = time.monotonic() - started
+        cpu = time.process_time() - cpu_started
+        stopped.set()
+        app.shutdown()
+    delivered = broker.count
+    broker.stop()
+
+    results = {
+        "commit": git_commit(),
+        "seconds": round(elapsed, 2),
+        "stages": {stage: s.summary() for stage, s in stats.items()},
+        "throughput_per_s": {name: round(t["run"]["count"] / elapsed, 2) for name, t in task_stats.items()},
+        "inferences_per_hour": {stage: round(stats[stage].count * 3600 / elapsed)
+                                for stage in ("mobilenet", "yamnet")},
+        "cpu_s": round(cpu, 2),
+        "tasks": task_stats,
+        "ultrasonic": app.ultrasonic.stats(),
+        "mqtt": {"stored": app.outbox.stored, "sent": app.outbox.sent, "broker_received": delivered},
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "skipped": [] if yamnet_available else ["yamnet: yamnet.tflite not found"],
+    }
+    with open(RESULTS_PATH, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for stage, summary in results["stages"].items():
+        if summary["count"]:
+            print(f"  {stage:<10} n={summary['count']:<6} p50={summary['p50_ms']:8.2f} ms  "
+                  f"p95={summary['p95_ms']:8.2f} ms  p99={summary['p99_ms']:8.2f} ms")
+        else:
+            print(f"  {stage:<10} no samples")
+    print("  throughput: " + ", ".join(f"{name} {rate}/s" for name, rate in results["throughput_per_s"].items()))
+    print("  inferences/hour: " + ", ".join(f"{k} {v}" for k, v in results["inferences_per_hour"].items()))
+    print(f"  CPU {results['cpu_s']:.2f} s over {elapsed:.0f} s, {delivered} MQTT messages at the broker, "
+          f"peak RSS {results['peak_rss_kib'] / 1024:.1f} MiB")
+    for note in results["skipped"]:
+        print(f"  skipped {note}")
+    print(f"[BENCH] Results written to {RESULTS_PATH}")
+
+    if BASELINE_PATH:
+        with open(BASELINE_PATH) as f:
+            compare(results, json.load(f))
@@ -1,7 +1,7 @@
 import paho.mqtt.client as mqtt
 import time
 import random
-import json
+from telemetry import TelemetryAggregator
 
 # HiveMQ broker connection
 BROKER = "broker.hivemq.com"
@@ -27,13 +27,14 @@ if USERNAME and PASSWORD:
 client.connect(BROKER, PORT)
 client.loop_start()
 
+# Readings are batched per device and only sent when they change (see telemetry.py)
+telemetry = TelemetryAggregator(client, {"food_level": 2.0}, min_interval=0, flush_interval=30.0).start()
+
 ######################### Devices #########################
 device_names = ["Foodpot", "Livingroom", "Door", "Window", "Kitchen"]
 
 while True:
     for device in device_names:
-        topic = f"tb/sensors/{device}/data" 
-
         # Build payload dynamically per device
         if device == "Foodpot":
             payload = {"food_level": round(random.uniform(0, 100), 1)}
@@ -44,9 +45,10 @@ while True:
         elif device == "Window":
             payload = {"window_status": random.choice(["open", "closed"])}
 
-        # Publish telemetry
-        client.publish(topic, json.dumps(payload), qos=1)
-        print(f"Published to {topic}: {payload}")
+        # Queue telemetry
+        for key, value in payload.items():
+            telemetry.record(device, key, value)
+        print(f"Recorded for {device}: {payload}")
 
         # Publish simple state for Node-RED
         #topic_state = f"tb/sensors/State"
@@ -0,0 +1,122 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from emotion_tracker import scores_to_emotion
+from model_registry import LoadedModel, MODEL_PATHS, QUANTIZED_PATHS, YAMNET_INPUT_SIZE
+from pet_detector import PetDetector
+from quantize_models import snapshot_frames, audio_windows
+
+# Float32 vs full-integer model: latency, memory and how often the int8
+# model reaches the same answer. Inputs are held out from calibration:
+# snapshots with sensor noise and brightness drift, and audio windows offset
+# by a quarter window from the calibration slices. Each model is loaded in
+# its own process so its memory is measured on its own.
+#   pet    - agreement of the pet / no pet verdict, largest probability change
+#   yamnet - agreement of the top class and of the mapped sound (what the
+#            app acts on), mean score change
+# Usage: python quantize_bench.py [pet|yamnet] [float model] [int8 model]
+
+THRESHOLD = 0.5
+NOISY_COPIES = 4
+REPEAT = 3          # timed passes over the inputs
+
+
+def private_kib():
+    total = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+
+def eval_inputs(name):
+    if name == "pet":
+        rng = np.random.default_rng(0)
+        frames = []
+        for frame in snapshot_frames():
+            for _ in range(NOISY_COPIES):
+                noisy = frame * rng.uniform(0.9, 1.1) + rng.normal(0, 4, frame.shape)
+                frames.append(np.clip(noisy, 0, 255).astype(np.uint8))
+        return frames
+    return audio_windows(hop=YAMNET_INPUT_SIZE, start=YAMNET_INPUT_SIZE // 4)
+
+
+def run_mode(name, path):
+    before = private_kib()
+    model = LoadedModel(name, path)
+    model.warm_up()
+    memory = private_kib() - before
+
+    if name == "pet":
+        # PetDetector feeds uint8 frames to a uint8 model without converting them
+        predict = model.adapter(PetDetector).predict
+    else:
+        def predict(window):
+            model.set_input(window)
+            model.interpreter.invoke()
+            return model.output().tolist()
+
+    inputs = eval_inputs(name)
+    outputs = [predict(data) for data in inputs]
+    latencies = []
+    for _ in range(REPEAT):
+        for data in inputs:
+            start = time.perf_counter()
+            predict(data)
+            latencies.append(time.perf_counter() - start)
+    return {"file_kib": os.path.getsize(path) / 1024, "private_kib": memory,
+            "input_dtype": np.dtype(model.input_dtype).name,
+            "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+            "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+            "outputs": outputs}
+
+
+def spawn(name, path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, __file__, "--mode", name, path], cwd=here,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def agreement(name, reference, candidate):
+    if name == "pet":
+        ref, cand = np.array(reference), np.array(candidate)
+        same = np.mean((ref > THRESHOLD) == (cand > THRESHOLD))
+        return [("verdict agreement", f"{same * 100:.1f}%"),
+                ("max |delta p|", f"{np.max(np.abs(ref - cand)):.4f}")]
+    ref, cand = np.array(reference), np.array(candidate)
+    top1 = np.mean(ref.argmax(axis=1) == cand.argmax(axis=1))
+    sounds = np.mean([scores_to_emotion(r)[0] == scores_to_emotion(c)[0] for r, c in zip(ref, cand)])
+    return [("top-1 agreement", f"{top1 * 100:.1f}%"),
+            ("sound agreement", f"{sounds * 100:.1f}%"),
+            ("mean |delta score|", f"{np.mean(np.abs(ref - cand)):.4f}")]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "--mode":
+        print(json.dumps(run_mode(sys.argv[2], sys.argv[3])))
+        sys.exit(0)
+
+    names = [sys.argv[1]] if len(sys.argv) > 1 else ["pet", "yamnet"]
+    for name in names:
+        float_path = sys.argv[2] if len(sys.argv) > 2 else MODEL_PATHS[name]
+        int8_path = sys.argv[3] if len(sys.argv) > 3 else QUANTIZED_PATHS[name]
+        missing = [p for p in (float_path, int8_path) if not os.path.exists(p)]
+        if missing:
+            print(f"{name}: {', '.join(missing)} not found (int8 files come from quantize_models.py)\n")
+            continue
+
+        results = {"float": spawn(name, float_path), "int8": spawn(name, int8_path)}
+        print(f"{name}: {len(results['float']['outputs'])} held-out inputs")
+        print("           input    file      memory     p50        p95")
+        for label, r in results.items():
+            print(f"  {label:6s}  {r['input_dtype']:7s} {r['file_kib']:7.0f} KiB {r['private_kib'] / 1024:6.1f} MiB "
+                  f"{r['p50_ms']:7.3f} ms {r['p95_ms']:7.3f} ms")
+        print(f"  speed-up {results['float']['p50_ms'] / results['int8']['p50_ms']:.2f}x (p50)")
+        for label, value in agreement(name, results["float"]["outputs"], results["int8"]["outputs"]):
+            print(f"  {label:20s} {value}")
+        print()
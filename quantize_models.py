@@ -0,0 +1,121 @@
+import glob
+import os
+import sys
+import wave
+import numpy as np
+from audioRelay_reciever import SEGMENT_DIR, LATEST_FILE
+from camera_service import SNAPSHOT_PATTERN, MODEL_SIZE, snapshot_paths
+from model_registry import QUANTIZED_PATHS, YAMNET_INPUT_SIZE
+from pet_detector import load_frame
+
+# Builds full-integer TFLite variants (int8 weights and activations) of the
+# pet and YAMNet models, calibrated on this installation's own data:
+#   pet    - the camera snapshots in snapshots/ (plus their mirror images)
+#   yamnet - half-overlapping windows of the receiver's newest audio
+#            segments (audio_segments/*.wav), or of received_audio.wav
+#            when there are none
+# A .tflite file can't be re-quantized, so the converter starts from the
+# SavedModel each float model was exported from (SOURCE_MODELS). The int8
+# files are written next to the float ones (model_registry.QUANTIZED_PATHS);
+# compare them with quantize_bench.py, then enable them with QUANTIZED_MODELS.
+# Needs full TensorFlow (a desktop is fine; the Pi only needs tflite_runtime).
+# Usage: python quantize_models.py [pet] [yamnet] [--audio "<wav glob>"]
+
+SOURCE_MODELS = {
+    "pet": "models/mobilenet_pet",
+    "yamnet": "models/yamnet",
+}
+AUDIO_FILES = os.path.join(SEGMENT_DIR, "*.wav")
+MAX_AUDIO_FILES = 10          # newest segments used (10 x 60 s at the receiver's defaults)
+CALIBRATION_SAMPLES = 200     # upper bound per model; more adds conversion time, not accuracy
+
+
+# ---------- Calibration data ----------
+def snapshot_frames(pattern=SNAPSHOT_PATTERN, size=MODEL_SIZE):
+    """uint8 frames at model size from the saved snapshots, each followed by its mirror image."""
+    frames = []
+    for path in snapshot_paths(pattern):
+        frame = load_frame(path, size)
+        frames += [frame, np.ascontiguousarray(frame[:, ::-1])]
+    return frames
+
+
+def audio_files(pattern=AUDIO_FILES, limit=MAX_AUDIO_FILES):
+    """The newest limit WAV files matching pattern, oldest first; received_audio.wav if there are none."""
+    paths = sorted(glob.glob(pattern), key=os.path.getmtime)[-limit:]
+    if not paths and os.path.exists(LATEST_FILE):
+        paths = [LATEST_FILE]
+    if not paths:
+        raise FileNotFoundError(f"No audio matching {pattern}: record some with audioRelay_reciever.py first")
+    return paths
+
+
+def audio_windows(paths=None, size=YAMNET_INPUT_SIZE, hop=YAMNET_INPUT_SIZE // 2, start=0):
+    """
+    float32 windows in [-1, 1] of 16-bit WAV files (default: audio_files()),
+    hop samples apart from sample start of each file.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    windows = []
+    for path in paths or audio_files():
+        with wave.open(path, "rb") as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+        windows += [audio[i:i + size] for i in range(start, len(audio) - size + 1, hop)]
+    return windows
+
+
+def calibration_data(name, audio=None):
+    """
+    Float model inputs used to pick each tensor's int8 range (YAMNet takes a
+    bare waveform), spread evenly over all the data; audio is an optional
+    list of WAV paths.
+    """
+    if name == "pet":
+        samples = [frame[np.newaxis].astype(np.float32) / 255.0 for frame in snapshot_frames()]
+    elif name == "yamnet":
+        samples = audio_windows(audio)
+    else:
+        raise KeyError(f"No calibration data for {name}")
+    step = max(1, len(samples) // CALIBRATION_SAMPLES)
+    return samples[::step][:CALIBRATION_SAMPLES]
+
+
+# ---------- Conversion ----------
+def quantize(name, source=None, out_path=None, audio=None):
+    """Convert SOURCE_MODELS[name] to a full-integer .tflite; returns the output path."""
+    import tensorflow as tf   # only the conversion needs TensorFlow
+
+    source = source or SOURCE_MODELS[name]
+    out_path = out_path or QUANTIZED_PATHS[name]
+    samples = calibration_data(name, audio)
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(source)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([sample] for sample in samples)
+    # Fail instead of silently leaving float ops in the graph
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # uint8 pet input with scale 1/255 is the raw pixel, so PetDetector copies frames straight in
+    converter.inference_input_type = tf.uint8 if name == "pet" else tf.int8
+    converter.inference_output_type = tf.int8
+    model = converter.convert()
+
+    with open(out_path, "wb") as f:
+        f.write(model)
+    print(f"[QUANT] {name}: {source} -> {out_path} ({len(model) / 1024:.0f} KiB, "
+          f"calibrated on {len(samples)} samples)")
+    return out_path
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    audio = None
+    if "--audio" in args:
+        i = args.index("--audio")
+        audio = audio_files(args[i + 1])
+        del args[i:i + 2]
+    for name in args or list(SOURCE_MODELS):
+        if not os.path.exists(SOURCE_MODELS[name]):
+            print(f"[QUANT] Skipping {name}: source model {SOURCE_MODELS[name]} not found")
+            continue
+        quantize(name, audio=audio)
@@ -0,0 +1,110 @@
+import contextlib
+import os
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")   # one core per "invoke", like num_threads=1
+import sys
+import time
+import numpy as np
+from audio_rooms import RoomAudio
+from audioRelay_sender import send_streams
+from audio_relay import RATE
+from model_registry import registry, YAMNET_INPUT_SIZE
+
+# Load test for multi-room audio: N header-tagged streams are sent over
+# loopback in real time and scored by RoomAudio on a pool of interpreters
+# (activity gate off, so every window is scored: the worst case). The stream
+# count doubles until the pool can no longer keep up. A configuration is
+# real-time when no window is dropped and the worst latency from "window
+# complete" to "scored" stays below one window (0.975 s). Senders are in step,
+# so every room's window completes at once: a burst the pool must clear.
+#
+# Runs on at most 4 cores (a Pi 4 has four Cortex-A72s). Uses yamnet.tflite
+# when present; otherwise each invoke is a synthetic CPU load of
+# INVOKE_MS (default 15 ms, roughly a single-threaded YAMNet invoke on a Pi 4),
+# so the result shows scheduler capacity rather than a measured model.
+# Usage: python room_audio_bench.py [seconds per step] [workers] [invoke_ms]
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 6.0
+WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+INVOKE_MS = float(sys.argv[3]) if len(sys.argv) > 3 else 15.0
+PI4_CORES = 4
+WINDOW_SECONDS = YAMNET_INPUT_SIZE / RATE
+
+
+class SyntheticModel:
+    """Burns about invoke_ms of CPU per call in BLAS (which, like invoke(), releases the GIL)."""
+
+    def __init__(self, invoke_ms):
+        self.a = np.random.default_rng(0).random((128, 128), dtype=np.float32)
+        start = time.process_time()
+        for _ in range(200):
+            self.a @ self.a
+        per_op = (time.process_time() - start) / 200
+        self.ops = max(1, int(invoke_ms / 1000 / per_op))
+
+    def score(self, window):
+        for _ in range(self.ops):
+            self.a @ self.a
+        return np.zeros(521, dtype=np.float32)
+
+
+def run(streams, score_fn):
+    rooms = {f"Room{i}": (0, i) for i in range(streams)}
+    audio = RoomAudio(rooms, score_fn, YAMNET_INPUT_SIZE, ip="127.0.0.1", workers=WORKERS, gate=False)
+    # Port 0: one receiver on a free port, rooms told apart by the header's stream id
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        audio.start()
+    port = audio.receivers[0].address[1]
+
+    cpu = time.process_time()
+    send_streams("127.0.0.1", port, streams, RATE, seconds=SECONDS)
+    time.sleep(WINDOW_SECONDS + 0.5)
+    cpu = time.process_time() - cpu
+    audio.stop()
+
+    stats = audio.stats()["rooms"].values()
+    windows = sum(s["windows"] for s in stats)
+    scored = sum(s["scored"] for s in stats)
+    dropped = sum(s["dropped"] for s in stats)
+    worst = max(s["latency_max_ms"] for s in stats)
+    realtime = dropped == 0 and worst < WINDOW_SECONDS * 1000
+    print(f"{streams:7d} {windows:8d} {scored:7d} {dropped:8d} {worst:9.0f} {cpu / SECONDS * 100:6.0f}%   "
+          f"{'yes' if realtime else 'no'}")
+    return realtime
+
+
+if __name__ == "__main__":
+    cores = sorted(os.sched_getaffinity(0))
+    os.sched_setaffinity(0, cores[:PI4_CORES])
+    cores = len(os.sched_getaffinity(0))
+
+    if registry.available("yamnet"):
+        pool = registry.pool("yamnet", WORKERS)
+        score_fn, model = pool.score, "yamnet.tflite"
+    else:
+        score_fn, model = SyntheticModel(INVOKE_MS).score, f"synthetic {INVOKE_MS:.0f} ms invoke (yamnet.tflite not found)"
+
+    start = time.perf_counter()
+    for _ in range(5):
+        score_fn(np.zeros(YAMNET_INPUT_SIZE, dtype=np.float32))
+    invoke_ms = (time.perf_counter() - start) * 200
+    print(f"{model}: {invoke_ms:.1f} ms/invoke, {WORKERS} worker(s) on {cores} core(s), {SECONDS:.0f} s per step")
+    print(f"estimate: {cores} core(s) x {WINDOW_SECONDS * 1000:.0f} ms / {invoke_ms:.1f} ms "
+          f"= {int(cores * WINDOW_SECONDS * 1000 / invoke_ms)} streams\n")
+    print("streams  windows  scored  dropped  max (ms)    CPU   real-time")
+
+    sustained = 0
+    streams = 1
+    while run(streams, score_fn):
+        sustained = streams
+        streams *= 2
+    if sustained:
+        # Narrow down between the last good and the first failing count
+        low, high = sustained, streams
+        while high - low > max(1, low // 8):
+            middle = (low + high) // 2
+            if run(middle, score_fn):
+                low = middle
+            else:
+                high = middle
+        sustained = low
+    print(f"\nsustained in real time: {sustained} stream(s)")
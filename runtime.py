@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+from cpu_config import cpu_config
+
+
+# ---------- Latency Stats ----------
+class LatencyStats:
+    """Keeps the last N durations (seconds) and reports percentiles in ms."""
+
+    def __init__(self, size=500):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {"count": 0}
+        ms = np.array(list(self.samples)) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return {"count": self.count, "p50_ms": round(p50, 2), "p95_ms": round(p95, 2),
+                "p99_ms": round(p99, 2), "max_ms": round(ms.max(), 2)}
+
+
+# ---------- Bounded Queue ----------
+class BoundedQueue:
+    """
+    Small queue between tasks. When full, the oldest item is dropped so a
+    slow consumer always works on the most recent event instead of a backlog.
+    """
+
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def put_latest(self, item):
+        while True:
+            try:
+                self._queue.put_nowait((time.monotonic(), item))
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Return (enqueue_time, item); raises queue.Empty on timeout."""
+        return self._queue.get(timeout=timeout)
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+# ---------- Tasks ----------
+class Task:
+    """One independent worker thread, either periodic or draining a queue."""
+
+    def __init__(self, name, fn, period=None, source=None, group=None):
+        self.name = name
+        self.fn = fn
+        self.period = period
+        self.source = source
+        self.group = group   # cpu_config worker group ("audio" / "vision") the thread is pinned to
+        self.run_time = LatencyStats()
+        self.wait_time = LatencyStats()   # queue wait (consumers) or start lag (periodic)
+        self.errors = 0
+        self.thread = None
+
+    def _call(self, *args):
+        start = time.monotonic()
+        try:
+            self.fn(*args)
+        except Exception as e:
+            self.errors += 1
+            print(f"[RUNTIME] Task {self.name} failed:", e)
+        self.run_time.record(time.monotonic() - start)
+
+    def run(self, stopped):
+        if self.group:
+            cpu_config.pin(self.group)
+        if self.source is not None:
+            while not stopped.is_set():
+                try:
+                    queued_at, item = self.source.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                self.wait_time.record(time.monotonic() - queued_at)
+                self._call(item)
+        else:
+            next_run = time.monotonic()
+            while not stopped.is_set():
+                self.wait_time.record(max(0.0, time.monotonic() - next_run))
+                self._call()
+                next_run += self.period
+                delay = next_run - time.monotonic()
+                if delay > 0:
+                    stopped.wait(delay)
+                else:
+                    next_run = time.monotonic()   # overran: don't try to catch up
+
+    def stats(self):
+        stats = {"run": self.run_time.summary(), "wait": self.wait_time.summary(), "errors": self.errors}
+        if self.source is not None:
+            stats["queued"] = self.source.qsize()
+            stats["dropped"] = self.source.dropped
+        return stats
+
+
+# ---------- Runtime ----------
+class Runtime:
+    """
+    Runs sensor polling, inference and actuation as independent threads
+    connected by bounded queues, so a slow stage can't delay the others.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self._stopped = threading.Event()
+
+    def queue(self, maxsize=1):
+        return BoundedQueue(maxsize)
+
+    def every(self, name, period, fn, group=None):
+        """Run fn() every period seconds on its own thread (pinned to group's cores, if given)."""
+        self.tasks[name] = Task(name, fn, period=period, group=group)
+
+    def consume(self, name, source, fn, group=None):
+        """Run fn(item) on its own thread for every item put on source."""
+        self.tasks[name] = Task(name, fn, source=source, group=group)
+
+    def start(self):
+        self._stopped.clear()
+        for task in self.tasks.values():
+            task.thread = threading.Thread(target=task.run, args=(self._stopped,), name=task.name, daemon=True)
+            task.thread.start()
+        print(f"[RUNTIME] Started tasks: {', '.join(self.tasks)}")
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        for task in self.tasks.values():
+            if task.thread:
+                task.thread.join(timeout)
+
+    def stats(self):
+        return {name: task.stats() for name, task in self.tasks.items()}
+
+    def report(self):
+        for name, stats in self.stats().items():
+            run, wait = stats["run"], stats["wait"]
+            if not run["count"]:
+                continue
+            print(f"[RUNTIME] {name:<8} runs={run['count']} p50={run['p50_ms']}ms p95={run['p95_ms']}ms"
+                  f" | wait p95={wait['p95_ms']}ms | errors={stats['errors']}")
@@ -0,0 +1,103 @@
+import contextlib
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from camera_service import CAPTURE_SIZE, snapshot_paths
+from snapshot_store import SnapshotStore
+
+# Snapshot store vs the old capture_image() (JPEG written into snapshots/
+# on the calling task's thread, never deleted):
+#   capture  - how long the caller is blocked per snapshot (640x480 frames)
+#   lookup   - "motion snapshots from the last day" out of ROWS snapshots
+#              spread over 90 days: glob + parse filenames in one flat
+#              folder vs a range query on the index
+#   retention- disk use after ROWS_RETAINED saves with a small size limit
+# Runs in a temporary folder; nothing is written into snapshots/.
+# Usage: python snapshot_bench.py [rows]
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+CAPTURES = 30
+ROWS_RETAINED = 60
+DAY = 24 * 3600
+
+
+def frames():
+    paths = snapshot_paths()
+    return [np.asarray(Image.open(p).convert("RGB").resize(CAPTURE_SIZE)) for p in paths]
+
+
+def old_capture(folder, frame, filename):
+    Image.fromarray(np.ascontiguousarray(frame)).save(os.path.join(folder, filename), quality=90)
+
+
+def blocked_ms(fn):
+    times = []
+    for i in range(CAPTURES):
+        start = time.perf_counter()
+        fn(i)
+        times.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.05)    # events arrive spread out, not back to back
+    return np.percentile(times, 50), max(times)
+
+
+if __name__ == "__main__":
+    work = tempfile.mkdtemp()
+    images = frames()
+    now = time.time()
+    try:
+        flat = os.path.join(work, "flat")
+        os.makedirs(flat)
+        old = blocked_ms(lambda i: old_capture(flat, images[i % len(images)], f"motion_{int(now) + i}.jpg"))
+        store = SnapshotStore(os.path.join(work, "store"))
+        store.start()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            new = blocked_ms(lambda i: store.save(images[i % len(images)], "motion", pet_probability=0.1))
+            store.flush()
+        print(f"capture, {CAPTURES} snapshots: caller blocked p50 / max")
+        print(f"  old capture_image   {old[0]:7.2f} / {old[1]:7.2f} ms")
+        print(f"  SnapshotStore.save  {new[0]:7.2f} / {new[1]:7.2f} ms  ({store.saved} written, {store.dropped} dropped)")
+
+        rng = np.random.default_rng(0)
+        stamps = np.sort(now - rng.uniform(0, 90 * DAY, ROWS))
+        reasons = np.where(rng.random(ROWS) < 0.7, "motion", "alert")
+        for ts, reason in zip(stamps, reasons):
+            open(os.path.join(flat, f"{reason}_{int(ts)}.jpg"), "wb").close()
+        with store._lock:
+            store._db.execute("BEGIN")
+            store._db.executemany("INSERT INTO snapshots (ts, reason, path, bytes) VALUES (?, ?, ?, 0)",
+                                  [(float(ts), str(r), f"{r}_{int(ts)}.jpg") for ts, r in zip(stamps, reasons)])
+            store._db.execute("COMMIT")
+
+        start = time.perf_counter()
+        found = [p for p in glob.glob(os.path.join(flat, "motion_*.jpg"))
+                 if int(os.path.basename(p)[7:-4]) >= now - DAY]
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        rows = store.query(start=now - DAY, reason="motion", limit=ROWS)
+        indexed = time.perf_counter() - start
+        print(f"\nlookup, motion snapshots from the last day out of {ROWS}: {len(rows)} found "
+              f"(scan found {len(found)})")
+        print(f"  directory scan      {scan * 1000:8.2f} ms")
+        print(f"  index range query   {indexed * 1000:8.2f} ms")
+        store.stop()
+
+        limit = 1024 * 1024
+        store = SnapshotStore(os.path.join(work, "retained"), max_bytes=limit, keep_newest=5)
+        store.start()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for i in range(ROWS_RETAINED):
+                store.save(images[i % len(images)], "alert", emotion="Anxious", flagged=(i == 0))
+                store.flush()
+            store.trim()
+        on_disk = sum(os.path.getsize(p) for p in glob.glob(os.path.join(work, "retained", "*", "*.jpg")))
+        s = store.stats()
+        print(f"\nretention, {ROWS_RETAINED} saves with a {limit / 1024:.0f} KiB limit: {s['count']} kept "
+              f"(incl. 1 flagged), {s['deleted']} deleted, {on_disk / 1024:.0f} KiB on disk")
+        store.stop()
+    finally:
+        shutil.rmtree(work)
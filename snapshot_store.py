@@ -0,0 +1,250 @@
+import glob
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+from PIL import Image
+from camera_service import SNAPSHOT_DIR
+
+MAX_BYTES = 512 * 1024 * 1024   # images + thumbnails kept on the SD card
+MAX_AGE = 14 * 24 * 3600        # seconds an unflagged snapshot is kept
+KEEP_NEWEST = 50                # the newest snapshots survive both limits
+MAX_PENDING = 8                 # frames waiting to be written; more are dropped, capture never waits
+THUMB_SIZE = (160, 120)
+JPEG_QUALITY = 90
+THUMB_QUALITY = 75
+TRIM_EVERY = 10                 # saves between retention passes (and on start)
+
+_LOOSE_FILE = re.compile(r"^([a-z]+)_(\d+)\.jpg$")
+
+
+class SnapshotStore:
+    """
+    Event snapshots on disk with a SQLite index. save() only queues the
+    frame; a writer thread JPEG-encodes it and a thumbnail into a folder per
+    day, then records timestamp, trigger reason, pet probability and
+    emotion in the index (ts is indexed, so range queries don't touch the
+    directories). Retention deletes unflagged snapshots older than max_age,
+    then the oldest unflagged ones until images and thumbnails fit in
+    max_bytes; the keep_newest most recent snapshots are never deleted.
+    """
+
+    def __init__(self, folder=SNAPSHOT_DIR, max_bytes=MAX_BYTES, max_age=MAX_AGE, keep_newest=KEEP_NEWEST,
+                 max_pending=MAX_PENDING, thumb_size=THUMB_SIZE, clock=time.time):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep_newest = keep_newest
+        self.thumb_size = thumb_size
+        self.clock = clock
+        self.saved = 0
+        self.dropped = 0      # frames refused because the writer was behind
+        self.deleted = 0
+        self.failed = 0
+        os.makedirs(folder, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(folder, "index.db"), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS snapshots (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                ts REAL NOT NULL,
+                                reason TEXT NOT NULL,
+                                path TEXT NOT NULL,
+                                thumb TEXT,
+                                bytes INTEGER NOT NULL,
+                                pet_probability REAL,
+                                emotion TEXT,
+                                flagged INTEGER NOT NULL DEFAULT 0)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (ts)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS snapshots_reason_ts ON snapshots (reason, ts)")
+        self.total_bytes = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM snapshots").fetchone()[0]
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(max_pending)
+        self._thread = None
+
+    # ---------- Writing ----------
+    def start(self):
+        self.adopt_loose_files()
+        self._thread = threading.Thread(target=self._run, name="snapshots", daemon=True)
+        self._thread.start()
+        self._queue.put(("trim",))
+        return self
+
+    def stop(self):
+        """Write whatever is queued, then stop the writer and close the index."""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+            self._thread = None
+        with self._lock:
+            self._db.close()
+
+    def save(self, frame, reason, pet_probability=None, emotion=None, flagged=False, timestamp=None):
+        """
+        Queue a uint8 HxWx3 frame for writing and return the path it will
+        have, or None when the writer is too far behind (the frame is dropped).
+        """
+        if frame is None:
+            return None
+        timestamp = self.clock() if timestamp is None else timestamp
+        day = time.strftime("%Y-%m-%d", time.localtime(timestamp))
+        path = os.path.join(self.folder, day, f"{reason}_{int(timestamp * 1000)}.jpg")
+        try:
+            self._queue.put_nowait(("save", frame, path, timestamp, reason, pet_probability, emotion, flagged))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return path
+
+    def flush(self):
+        """Block until every queued snapshot has been written."""
+        self._queue.join()
+
+    def _run(self):
+        since_trim = 0
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if job[0] == "trim" or since_trim >= TRIM_EVERY:
+                    self.trim()
+                    since_trim = 0
+                if job[0] == "save":
+                    self._write(*job[1:])
+                    since_trim += 1
+            except Exception as e:
+                self.failed += 1
+                print("[SNAPSHOT] Write failed:", e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, frame, path, timestamp, reason, pet_probability, emotion, flagged):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        image = Image.fromarray(np.ascontiguousarray(frame))
+        thumb_path = path[:-len(".jpg")] + "_thumb.jpg"
+        size = self._atomic_save(image, path, JPEG_QUALITY)
+        thumb = image.copy()
+        thumb.thumbnail(self.thumb_size, Image.BILINEAR)
+        size += self._atomic_save(thumb, thumb_path, THUMB_QUALITY)
+        with self._lock:
+            self._db.execute("INSERT INTO snapshots (ts, reason, path, thumb, bytes, pet_probability, emotion, flagged)"
+                             " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (timestamp, reason, path, thumb_path, size, pet_probability, emotion, int(flagged)))
+            self.total_bytes += size
+        self.saved += 1
+        print(f"[SNAPSHOT] Saved {path}")
+
+    @staticmethod
+    def _atomic_save(image, path, quality):
+        """Write via a temporary file so a power cut never leaves a half-written JPEG behind."""
+        tmp = path + ".tmp"
+        image.save(tmp, format="JPEG", quality=quality)
+        os.replace(tmp, path)
+        return os.path.getsize(path)
+
+    def adopt_loose_files(self):
+        """Index motion_*/alert_* JPEGs left in the folder root by older versions (once)."""
+        adopted = 0
+        for path in sorted(glob.glob(os.path.join(self.folder, "*_*.jpg"))):
+            match = _LOOSE_FILE.match(os.path.basename(path))
+            if not match or match.group(1) not in ("motion", "alert"):
+                continue
+            with self._lock:
+                if self._db.execute("SELECT 1 FROM snapshots WHERE path = ?", (path,)).fetchone():
+                    continue
+                size = os.path.getsize(path)
+                self._db.execute("INSERT INTO snapshots (ts, reason, path, bytes) VALUES (?, ?, ?, ?)",
+                                 (float(match.group(2)), match.group(1), path, size))
+                self.total_bytes += size
+            adopted += 1
+        if adopted:
+            print(f"[SNAPSHOT] Indexed {adopted} existing snapshot(s)")
+        return adopted
+
+    # ---------- Retention ----------
+    def trim(self):
+        """Apply the age and size limits now; returns the number of snapshots deleted."""
+        protected = f"id NOT IN (SELECT id FROM snapshots ORDER BY ts DESC LIMIT {int(self.keep_newest)})"
+        with self._lock:
+            rows = self._db.execute(f"SELECT id, path, thumb, bytes FROM snapshots "
+                                    f"WHERE flagged = 0 AND ts < ? AND {protected}",
+                                    (self.clock() - self.max_age,)).fetchall()
+        deleted = self._delete(rows)
+        while self.total_bytes > self.max_bytes:
+            with self._lock:
+                rows = self._db.execute(f"SELECT id, path, thumb, bytes FROM snapshots "
+                                        f"WHERE flagged = 0 AND {protected} ORDER BY ts LIMIT 50").fetchall()
+            if not rows:
+                break    # only flagged and newest snapshots left
+            over = self.total_bytes - self.max_bytes
+            batch = []
+            for row in rows:
+                batch.append(row)
+                over -= row[3]
+                if over <= 0:
+                    break
+            deleted += self._delete(batch)
+        return deleted
+
+    def _delete(self, rows):
+        if not rows:
+            return 0
+        folders = set()
+        for _, path, thumb, _ in rows:
+            for p in (path, thumb):
+                if p:
+                    try:
+                        os.remove(p)
+                    except FileNotFoundError:
+                        pass
+                    folders.add(os.path.dirname(p))
+        with self._lock:
+            self._db.executemany("DELETE FROM snapshots WHERE id = ?", [(row[0],) for row in rows])
+            self.total_bytes -= sum(row[3] for row in rows)
+        for folder in folders - {self.folder}:
+            try:
+                os.rmdir(folder)    # only succeeds once the day's folder is empty
+            except OSError:
+                pass
+        self.deleted += len(rows)
+        return len(rows)
+
+    # ---------- Queries ----------
+    def flag(self, snapshot_id, flagged=True):
+        """Keep (or stop keeping) a snapshot regardless of age and size limits."""
+        with self._lock:
+            self._db.execute("UPDATE snapshots SET flagged = ? WHERE id = ?", (int(flagged), snapshot_id))
+
+    def query(self, start=None, end=None, reason=None, flagged=None, limit=100):
+        """Snapshots with start <= ts < end (optionally one reason / flag state), newest first, as dicts."""
+        where, args = [], []
+        if start is not None:
+            where.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            args.append(end)
+        if reason is not None:
+            where.append("reason = ?")
+            args.append(reason)
+        if flagged is not None:
+            where.append("flagged = ?")
+            args.append(int(flagged))
+        sql = "SELECT id, ts, reason, path, thumb, bytes, pet_probability, emotion, flagged FROM snapshots"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        with self._lock:
+            cursor = self._db.execute(sql, (*args, limit))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        return {"count": count, "bytes": self.total_bytes, "saved": self.saved, "dropped": self.dropped,
+                "deleted": self.deleted, "failed": self.failed, "pending": self._queue.qsize()}
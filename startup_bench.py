@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Startup comparison for the model registry. Each mode runs in a fresh
+# interpreter process so import and page-cache effects are counted:
+#   eager - old behaviour: every model built at import, before any sensor runs
+#   lazy  - registry + background warm-up, sensors start immediately
+#   bytes - eager, but models passed as model_content (copied into the heap
+#           instead of mmapped), to show what loading by path saves in RSS
+# Times after the imports are reported separately from the imports themselves.
+# Usage: python startup_bench.py [runs]
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 5
+MODELS = ("pet", "yamnet")
+
+
+def rss_kib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def first_sensor_reading():
+    """Stand-in for the first ultrasonic ping / MQTT publish of the main loop."""
+    return time.perf_counter()
+
+
+def run_mode(mode):
+    start = time.perf_counter()
+    from model_registry import registry
+    import tflite_runtime.interpreter as tflite
+    imported = time.perf_counter()
+
+    names = [name for name in MODELS if registry.available(name)]
+    if mode == "lazy":
+        thread = registry.warm_up(*names)
+        first_reading = first_sensor_reading()
+        thread.join()
+    elif mode == "eager":
+        for name in names:
+            registry.get(name).warm_up()
+        first_reading = first_sensor_reading()
+    else:
+        keep = []
+        for name in names:
+            with open(registry.paths[name], "rb") as f:
+                interpreter = tflite.Interpreter(model_content=f.read())
+            interpreter.allocate_tensors()
+            keep.append(interpreter)
+        first_reading = first_sensor_reading()
+    ready = time.perf_counter()
+
+    return {"mode": mode,
+            "models": names,
+            "import_ms": round((imported - start) * 1000, 1),
+            "first_reading_ms": round((first_reading - imported) * 1000, 1),
+            "models_ready_ms": round((ready - imported) * 1000, 1),
+            "rss_kib": rss_kib()}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        print(json.dumps(run_mode(sys.argv[2])))
+        sys.exit(0)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    for mode in ("eager", "lazy", "bytes"):
+        results = []
+        for _ in range(RUNS):
+            out = subprocess.run([sys.executable, __file__, "--mode", mode], cwd=here,
+                                 capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+        median = lambda key: sorted(r[key] for r in results)[len(results) // 2]
+        print(f"{mode:5s}: imports {median('import_ms'):6.1f} ms, then first reading {median('first_reading_ms'):7.1f} ms, "
+              f"models ready {median('models_ready_ms'):7.1f} ms, "
+              f"RSS {median('rss_kib') / 1024:6.1f} MiB  (models: {', '.join(results[0]['models'])})")
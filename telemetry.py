@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+
+TOPIC = "tb/sensors/{device}/data"
+
+
+class TelemetryAggregator:
+    """
+    Report-by-exception buffer in front of client.publish.
+
+    A numeric key is only reported when it moves by more than its deadband,
+    never more often than min_interval, and at least every max_interval as a
+    heartbeat. Accepted values are batched per device and sent as one
+    ThingsBoard payload: [{"ts": ms, "values": {...}}, ...].
+    """
+
+    def __init__(self, client, deadbands=None, min_interval=1.0, max_interval=300.0,
+                 flush_interval=5.0, qos=1, topic=TOPIC, clock=time.time):
+        self.client = client
+        self.deadbands = deadbands or {}
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.flush_interval = flush_interval
+        self.qos = qos
+        self.topic = topic
+        self.clock = clock
+        self.recorded = 0
+        self.published = 0
+        self.publish_failures = 0
+        self._last = {}       # (device, key) -> (time accepted, value)
+        self._deferred = {}   # (device, key) -> (time, value) held back by min_interval
+        self._pending = {}    # device -> [(ts_ms, key, value)]
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record(self, device, key, value, now=None):
+        """Offer one reading; it is queued only if it is worth reporting."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.recorded += 1
+            last = self._last.get((device, key))
+            if last is not None:
+                last_time, last_value = last
+                if not self._changed(key, last_value, value) and now - last_time < self.max_interval:
+                    self._deferred.pop((device, key), None)
+                    return
+                if now - last_time < self.min_interval:
+                    self._deferred[(device, key)] = (now, value)
+                    return
+            self._accept(device, key, value, now)
+
+    def _changed(self, key, old, new):
+        deadband = self.deadbands.get(key)
+        if deadband is not None and isinstance(new, (int, float)) and isinstance(old, (int, float)):
+            return abs(new - old) > deadband
+        return new != old
+
+    def _accept(self, device, key, value, now):
+        self._last[(device, key)] = (now, value)
+        self._pending.setdefault(device, []).append((int(now * 1000), key, value))
+
+    def flush(self, now=None):
+        """Publish everything accepted so far, one message per device."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            for (device, key), (_, value) in list(self._deferred.items()):
+                if now - self._last[(device, key)][0] >= self.min_interval:
+                    del self._deferred[(device, key)]
+                    self._accept(device, key, value, now)
+            # Heartbeat: re-send values that have been quiet for max_interval
+            for (device, key), (last_time, value) in list(self._last.items()):
+                if now - last_time >= self.max_interval:
+                    self._accept(device, key, value, now)
+            pending, self._pending = self._pending, {}
+
+        for device, entries in pending.items():
+            batch = {}
+            for ts, key, value in entries:
+                batch.setdefault(ts, {})[key] = value
+            payload = [{"ts": ts, "values": values} for ts, values in sorted(batch.items())]
+            self._publish(device, payload)
+
+    def _publish(self, device, payload):
+        info = self.client.publish(self.topic.format(device=device), json.dumps(payload), qos=self.qos)
+        if info.rc == 0:
+            self.published += 1
+        else:
+            self.publish_failures += 1
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print("[MQTT] Telemetry flush failed:", e)
@@ -0,0 +1,91 @@
+import json
+import random
+import sys
+import time
+import paho.mqtt.client as mqtt
+from mqtt_standin import StandinBroker
+from telemetry import TelemetryAggregator, TOPIC
+
+# Replays simulated sensor readings into a local broker stand-in, once with
+# the old publish-every-reading code and once through TelemetryAggregator,
+# and compares how many messages reach the broker.
+# Usage: python telemetry_bench.py [simulated minutes]
+
+PORT = 18831
+MINUTES = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+DEADBANDS = {"food_level": 2.0, "door_distance_cm": 5.0}
+
+
+def simulated_readings(minutes, seed=7):
+    """Yield (t, device, key, value) at the main loop's rates: door 0.5 s, food/emotion 5 s."""
+    rng = random.Random(seed)
+    food, emotion = 95.0, "Happy"
+    pet_at_door_until = -1
+    for step in range(int(minutes * 60 / 0.5)):
+        t = step * 0.5
+        if rng.random() < 0.002:
+            pet_at_door_until = t + rng.uniform(5, 60)
+        door = rng.gauss(30, 3) if t < pet_at_door_until else rng.gauss(85, 1.0)
+        yield t, "Door", "door_distance_cm", round(door, 1)
+
+        if step % 10 == 0:
+            food = max(0.0, food - rng.uniform(0, 0.1))
+            yield t, "Foodpot", "food_level", round(food + rng.gauss(0, 0.5), 1)
+            if rng.random() < 0.02:
+                emotion = rng.choice(["Happy", "Hungry", "Anxious", "Angry"])
+            yield t, "Emotion", "emotion", emotion
+
+
+def connect(broker):
+    client = mqtt.Client()
+    client.connect(*broker.address)
+    client.loop_start()
+    return client
+
+
+def run_legacy(client):
+    infos = []
+    for t, device, key, value in simulated_readings(MINUTES):
+        infos.append(client.publish(TOPIC.format(device=device), json.dumps({key: value}), qos=1))
+    return infos
+
+
+def run_aggregated(client):
+    sim_time = [0.0]
+    telemetry = TelemetryAggregator(client, DEADBANDS, clock=lambda: sim_time[0])
+    next_flush = telemetry.flush_interval
+    for t, device, key, value in simulated_readings(MINUTES):
+        sim_time[0] = t
+        if t >= next_flush:
+            telemetry.flush()
+            next_flush += telemetry.flush_interval
+        telemetry.record(device, key, value)
+    telemetry.flush()
+    return telemetry
+
+
+def wait_for_broker(broker, expected, timeout=10):
+    deadline = time.monotonic() + timeout
+    while broker.count < expected and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+if __name__ == "__main__":
+    broker = StandinBroker(port=PORT).start()
+    client = connect(broker)
+
+    wait_for_broker(broker, len(run_legacy(client)))
+    before, before_bytes = broker.count, broker.payload_bytes
+    broker.reset_counts()
+
+    telemetry = run_aggregated(client)
+    wait_for_broker(broker, telemetry.published)
+    after, after_bytes = broker.count, broker.payload_bytes
+
+    client.loop_stop()
+    broker.stop()
+
+    print(f"{MINUTES} simulated minutes, {telemetry.recorded} readings")
+    print(f"before: {before:6d} messages / QoS1 handshakes, {before_bytes / 1024:7.1f} KiB payload")
+    print(f"after:  {after:6d} messages / QoS1 handshakes, {after_bytes / 1024:7.1f} KiB payload")
+    print(f"Broker traffic cut by {100 * (1 - after / before):.1f}% (messages)")
@@ -0,0 +1,27 @@
+import time
+import pytest
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+
+@pytest.fixture
+def mock_factory():
+    """gpiozero's MockFactory as the default pin factory (PWM-capable pins, so servos work)."""
+    factory = MockFactory(pin_class=MockPWMPin)
+    previous, Device.pin_factory = Device.pin_factory, factory
+    yield factory
+    factory.reset()
+    Device.pin_factory = previous
+
+
+def _wait_until(condition, timeout=2.0, interval=0.005):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(interval)
+    return condition()
+
+
+@pytest.fixture
+def wait_until():
+    """wait_until(condition, timeout): poll until condition() is true; returns its last value."""
+    return _wait_until
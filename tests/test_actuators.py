@@ -0,0 +1,70 @@
+import time
+import pytest
+from gpiozero import Servo
+from actuators import ServoActuator, HIGH
+
+DOOR_PIN = 18
+
+
+@pytest.fixture
+def door(mock_factory):
+    actuator = ServoActuator(Servo(DOOR_PIN), "Door")
+    yield actuator
+    actuator.stop()
+    actuator.servo.close()
+
+
+def test_open_and_close_move_the_servo(door, wait_until):
+    door.open()
+    assert wait_until(lambda: door.state == "open")
+    assert door.servo.value == 1
+    door.close()
+    assert wait_until(lambda: door.state == "closed")
+    assert door.servo.value == -1
+
+
+def test_pulse_does_not_block_the_caller(door, wait_until):
+    start = time.monotonic()
+    door.pulse(0.3)
+    assert time.monotonic() - start < 0.05
+    assert wait_until(lambda: door.state == "open")
+    assert wait_until(lambda: door.state == "closed" and door.idle(), timeout=2)
+    assert door.executed == 1
+
+
+def test_redundant_commands_are_coalesced(door, wait_until):
+    door.close()
+    assert wait_until(door.idle)
+    door.close()                   # already closed
+    assert door.coalesced == 1
+    door.pulse(0.2)
+    door.pulse(0.2)                # same pulse already running or queued
+    door.close()                   # the pulse ends closed anyway
+    assert door.coalesced == 3
+    assert wait_until(door.idle)
+    assert door.executed == 2
+
+
+def test_high_priority_close_preempts_a_pulse(door, wait_until):
+    door.pulse(10)
+    assert wait_until(lambda: door.state == "open")
+    door.open()
+    door.close()
+    door.open()                    # pending NORMAL commands
+    start = time.monotonic()
+    door.close(priority=HIGH)
+    assert wait_until(lambda: door.state == "closed" and door.idle())
+    assert time.monotonic() - start < 1.0
+    assert door.preempted == 3     # the three pending NORMAL commands
+    assert door.servo.value == -1
+
+
+def test_stop_cuts_the_hold_short_and_drops_pending_commands(door, wait_until):
+    door.pulse(10)
+    door.open()
+    assert wait_until(lambda: door.state == "open")
+    start = time.monotonic()
+    door.stop()
+    assert time.monotonic() - start < 1.0
+    assert door.state == "closed"  # the pulse still finishes closed
+    assert door.executed == 1      # the queued open never ran
@@ -0,0 +1,45 @@
+import os
+import wave
+import numpy as np
+from audio_relay import WavSegmentWriter
+from emotion_tracker import EmotionTracker
+
+RATE = 1000
+WINDOW = 250
+
+
+def tone(seconds, level):
+    return np.full(int(RATE * seconds), level, dtype=np.int16).tobytes()
+
+
+def test_latest_file_is_the_newest_complete_segment(tmp_path):
+    latest = str(tmp_path / "received_audio.wav")
+    writer = WavSegmentWriter(str(tmp_path / "segments"), "raw", RATE, segment_seconds=1, max_segments=2,
+                              flush_seconds=0.1, latest_path=latest)
+    writer.write(tone(0.5, 100))
+    assert not os.path.exists(latest)        # nothing complete yet
+    writer.write(tone(0.5, 100) + tone(0.5, 200))
+    with wave.open(latest) as wf:
+        assert wf.getnframes() == RATE
+        assert set(np.frombuffer(wf.readframes(RATE), dtype=np.int16)) == {100}
+    writer.write(tone(2.7, 300))             # 4.2 s in total: the first segments rotate out
+    writer.close()
+    with wave.open(latest) as wf:            # the partial tail is published on close
+        assert wf.getnframes() == 200
+    assert len(os.listdir(tmp_path / "segments")) == 2
+
+
+def test_tracker_scores_each_swapped_in_segment(tmp_path):
+    latest = str(tmp_path / "received_audio.wav")
+    writer = WavSegmentWriter(str(tmp_path / "segments"), "raw", RATE, segment_seconds=1, max_segments=3,
+                              flush_seconds=0.1, latest_path=latest)
+    scored = []
+    tracker = EmotionTracker(lambda window: scored.append(float(window[0])) or np.zeros(4), WINDOW)
+    assert tracker.update_from_wav(latest) == 0   # no file yet
+    writer.write(tone(1, 100))
+    assert tracker.update_from_wav(latest) == 4
+    assert tracker.update_from_wav(latest) == 0   # nothing new
+    writer.write(tone(1, 200))                    # same length, different file
+    assert tracker.update_from_wav(latest) == 4
+    writer.close()
+    assert scored[-1] == 200 / 32768
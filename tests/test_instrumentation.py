@@ -0,0 +1,33 @@
+import json
+import socket
+from instrumentation import Metrics, StatsServer
+
+
+def read_stats(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        return json.loads(sock.makefile().readline())
+
+
+def test_stats_socket_is_not_taken_from_a_live_server(tmp_path):
+    path = str(tmp_path / "stats.sock")
+    first = Metrics()
+    first.count("owner")
+    live = StatsServer(first, port=None, socket_path=path).start()
+    second = StatsServer(Metrics(), port=None, socket_path=path).start()
+    try:
+        second.stop()
+        assert "owner" in read_stats(path)["counters"]
+    finally:
+        live.stop()
+
+
+def test_stale_stats_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "stats.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)                    # file left behind, nobody listening
+    server = StatsServer(Metrics(), port=None, socket_path=path).start()
+    try:
+        assert "counters" in read_stats(path)
+    finally:
+        server.stop()
@@ -0,0 +1,53 @@
+from motion_gate import MotionGate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_gate(cooldown=10.0):
+    events, clock = [], FakeClock()
+    gate = MotionGate(lambda source, detail: events.append((clock.now, source)),
+                      near_cm=50, clear_cm=60, cooldown=cooldown, clock=clock)
+    return gate, events, clock
+
+
+def test_one_event_per_arrival():
+    gate, events, clock = make_gate()
+    for distance in (80, 40, 35, 30, 42):
+        gate.update_distance(distance)
+        clock.now += 0.5
+    assert events == [(0.5, "distance")]
+    assert gate.near
+
+
+def test_arrival_inside_the_cooldown_fires_when_it_ends():
+    gate, events, clock = make_gate(cooldown=10.0)
+    gate._trigger("pir", None)           # unrelated event starts the cooldown at t=0
+    clock.now = 3.0
+    gate.update_distance(30)             # pet arrives during the cooldown
+    assert gate.suppressed == 1 and not gate.near
+    while clock.now < 12.0:              # and stays at the door
+        clock.now += 0.5
+        gate.update_distance(30)
+    assert [source for _, source in events] == ["pir", "distance"]
+    assert events[1][0] == 10.0
+    assert gate.near
+
+
+def test_rearms_only_after_clearing():
+    gate, events, clock = make_gate(cooldown=0.0)
+    for distance in (40, 55, 45, 65, 40):   # 55 is inside the hysteresis band
+        gate.update_distance(distance)
+        clock.now += 1
+    assert [t for t, _ in events] == [0, 4]
+
+
+def test_missing_readings_are_ignored():
+    gate, events, clock = make_gate()
+    gate.update_distance(None)
+    assert events == [] and not gate.near
@@ -0,0 +1,121 @@
+import json
+import socket
+import time
+import paho.mqtt.client as mqtt
+import pytest
+from mqtt_standin import StandinBroker
+from outbox import Outbox
+from telemetry import TOPIC
+
+
+@pytest.fixture
+def port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def broker(port):
+    broker = StandinBroker(port=port).start()
+    yield broker
+    broker.stop()
+
+
+@pytest.fixture
+def client(broker, wait_until):
+    client = mqtt.Client()
+    client.reconnect_delay_set(min_delay=1, max_delay=1)
+    client.connect(*broker.address)
+    client.loop_start()
+    assert wait_until(client.is_connected, 5), "could not connect to the stand-in broker"
+    yield client
+    client.disconnect()
+    client.loop_stop()
+
+
+def hour_of_telemetry():
+    """(device, key, value) at the main loop's rates: door every 0.5 s, food and emotion every 5 s."""
+    for step in range(3600 * 2):
+        yield "Door", "door_distance_cm", 80.0 + step % 7
+        if step % 10 == 0:
+            yield "Foodpot", "food_level", 95.0 - step / 1000
+            yield "Emotion", "emotion", "Happy"
+
+
+def seqs(broker):
+    return [json.loads(payload)["seq"] for _, payload in broker.messages]
+
+
+def test_hour_of_telemetry_survives_an_outage(tmp_path, broker, client, wait_until):
+    outbox = Outbox(client, str(tmp_path / "outbox.db"), drain_rate=2000.0, batch_size=200).start()
+    try:
+        broker.stop()
+        assert wait_until(lambda: not client.is_connected(), 5)
+
+        for seq, (device, key, value) in enumerate(hour_of_telemetry()):
+            outbox.publish(TOPIC.format(device=device), json.dumps({key: value, "seq": seq}))
+        queued = outbox.pending()
+        assert queued == seq + 1
+
+        broker.start()
+        start = time.monotonic()
+        assert wait_until(lambda: outbox.pending() == 0, 30 + queued / outbox.drain_rate)
+        assert time.monotonic() - start < 30    # includes paho's reconnect delay
+    finally:
+        outbox.stop()
+    received = seqs(broker)
+    assert set(received) == set(range(queued))
+    assert received == sorted(received), "backlog was not delivered oldest-first"
+
+
+def test_backlog_persists_across_restarts(tmp_path, broker, client, wait_until):
+    path = str(tmp_path / "outbox.db")
+    offline = Outbox(client, path)          # never started: publish() only writes to disk
+    for seq in range(100):
+        offline.publish("tb/test", json.dumps({"seq": seq}))
+    offline.stop()
+    assert broker.count == 0
+
+    outbox = Outbox(client, path, drain_rate=1000.0).start()
+    try:
+        assert outbox.pending() == 100
+        assert wait_until(lambda: outbox.pending() == 0, 10)
+    finally:
+        outbox.stop()
+    assert seqs(broker) == list(range(100))
+
+
+def test_compaction_keeps_the_newest_message_per_key(tmp_path, client):
+    outbox = Outbox(client, str(tmp_path / "outbox.db"), compact=True)
+    try:
+        for seq in range(10):
+            outbox.publish("tb/door", json.dumps({"seq": seq}), key="door_distance")
+        # Batched payloads without a key are all kept: the older one holds a value the newer lacks
+        outbox.publish("tb/food", json.dumps({"food_level": 80, "water_level": 40}))
+        outbox.publish("tb/food", json.dumps({"food_level": 79}))
+        assert outbox.pending() == 3
+        assert outbox.dropped == 9
+    finally:
+        outbox.stop()
+    reopened = Outbox(client, str(tmp_path / "outbox.db"))
+    assert reopened.pending() == 3          # the running counter matches the table
+    reopened.stop()
+
+
+def test_broker_lost_mid_drain_loses_nothing(tmp_path, broker, client, wait_until):
+    outbox = Outbox(client, str(tmp_path / "outbox.db"), drain_rate=500.0, batch_size=50, ack_timeout=1.0)
+    for seq in range(1500):
+        outbox.publish("tb/test", json.dumps({"seq": seq}))
+    outbox.start()
+    try:
+        assert wait_until(lambda: outbox.sent >= 100, 10)
+        broker.stop()                       # cut the connection while batches are in flight
+        assert wait_until(lambda: not client.is_connected(), 5)
+        assert outbox.pending() > 0
+        broker.start()
+        assert wait_until(lambda: outbox.pending() == 0, 30)
+    finally:
+        outbox.stop()
+    # Unacknowledged rows are sent again (at-least-once), but none go missing
+    assert set(seqs(broker)) == set(range(1500))
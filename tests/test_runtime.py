@@ -0,0 +1,62 @@
+import queue
+import time
+import pytest
+from runtime import BoundedQueue, LatencyStats, Runtime
+
+
+@pytest.fixture
+def runtime():
+    runtime = Runtime()
+    yield runtime
+    runtime.stop(timeout=2)
+
+
+def test_bounded_queue_keeps_the_newest_items():
+    q = BoundedQueue(maxsize=2)
+    for item in range(5):
+        q.put_latest(item)
+    assert q.dropped == 3
+    assert [q.get(timeout=0.1)[1] for _ in range(2)] == [3, 4]
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+
+
+def test_latency_stats_summary():
+    stats = LatencyStats(size=3)
+    assert stats.summary() == {"count": 0}
+    for seconds in (0.5, 0.001, 0.002, 0.003):     # the window keeps the last 3
+        stats.record(seconds)
+    summary = stats.summary()
+    assert summary["count"] == 4
+    assert summary["max_ms"] == 3.0
+    assert summary["p50_ms"] == 2.0
+
+
+def test_periodic_task_keeps_its_rate_next_to_a_slow_consumer(runtime, wait_until):
+    ticks, handled = [], []
+    events = runtime.queue(maxsize=1)
+    runtime.every("tick", 0.02, lambda: ticks.append(time.monotonic()))
+    runtime.consume("slow", events, lambda item: (time.sleep(0.3), handled.append(item)))
+    runtime.start()
+    for item in range(3):
+        events.put_latest(item)
+    time.sleep(0.4)
+    # 0.4 s at 50 Hz; the consumer sleeping in between must not hold the ticks back
+    assert len(ticks) >= 15
+    assert wait_until(lambda: handled, 1)
+    assert events.dropped >= 1          # the consumer was busy, older events were replaced
+
+
+def test_failing_task_is_counted_and_keeps_running(runtime, wait_until):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise RuntimeError("sensor unplugged")
+
+    runtime.every("flaky", 0.01, flaky)
+    runtime.start()
+    task = runtime.tasks["flaky"]
+    assert wait_until(lambda: task.errors >= 3, 2)
+    assert len(calls) >= task.errors
+    assert task.thread.is_alive()
@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import pytest
+from gpiozero.pins.mock import MockPWMPin, MockTriggerPin
+from ultrasonic_sampler import EchoTimer, UltrasonicSampler, SPEED_OF_SOUND
+
+SENSORS = {"food": (24, 23), "door": (22, 27)}   # (TRIG, ECHO) as wired in Lastmain.py
+
+
+class PWMTriggerPin(MockTriggerPin, MockPWMPin):
+    """MockTriggerPin on a factory whose default pins are PWM-capable (as in pipeline_bench.py)."""
+
+
+class RecordingTriggerPin(PWMTriggerPin):
+    """Logs (time, event) when the trigger fires and just before its echo pulse ends."""
+    log = None
+
+    def _set_state(self, value):
+        if value:
+            self.log.append((time.monotonic(), "trigger"))
+        super()._set_state(value)
+
+    def _echo(self):
+        time.sleep(0.001)
+        self.echo_pin.drive_high()
+        time.sleep(self.echo_time)
+        self.log.append((time.monotonic(), "echo end"))
+        self.echo_pin.drive_low()
+
+
+def echo_time(distance_cm):
+    return 2 * distance_cm / SPEED_OF_SOUND
+
+
+def wire(factory, trigger, echo, distance_cm, pin_class=PWMTriggerPin):
+    """Mock HC-SR04: driving the trigger high sends an echo pulse for distance_cm."""
+    return factory.pin(trigger, pin_class=pin_class, echo_pin=factory.pin(echo),
+                       echo_time=echo_time(distance_cm))
+
+
+@pytest.fixture
+def timer(mock_factory):
+    wire(mock_factory, *SENSORS["food"], 40)
+    timer = EchoTimer(*SENSORS["food"])
+    yield timer
+    timer.close()
+
+
+def test_echo_timer_measures_the_pulse(timer):
+    assert timer.measure() == pytest.approx(40, abs=3)
+    assert timer.timeouts == 0
+
+
+def test_echo_timer_clamps_to_max_distance(timer):
+    timer.trigger.pin.echo_time = echo_time(150)
+    assert timer.measure(timeout=0.2) == timer.max_distance_cm
+
+
+def test_missing_echo_times_out_instead_of_hanging(mock_factory):
+    timer = EchoTimer(5, 6)     # nothing wired to the echo pin
+    try:
+        assert timer.measure(timeout=0.05) is None
+        assert timer.timeouts == 1
+    finally:
+        timer.close()
+
+
+def test_sampler_fills_every_sensor_window(mock_factory, wait_until):
+    wire(mock_factory, *SENSORS["food"], 20)
+    wire(mock_factory, *SENSORS["door"], 70)
+    sampler = UltrasonicSampler(SENSORS, rate_hz=20, window=5, settle=0.01).start()
+    try:
+        assert wait_until(lambda: min(sampler.samples.values()) >= 5, timeout=5)
+        assert sampler.distance("food") == pytest.approx(20, abs=3)
+        assert sampler.distance("door") == pytest.approx(70, abs=3)
+    finally:
+        sampler.stop()
+
+
+def test_next_ping_waits_for_the_settle_time(mock_factory, wait_until):
+    log = []
+    for trigger, echo in SENSORS.values():
+        wire(mock_factory, trigger, echo, 50, pin_class=RecordingTriggerPin).log = log
+    settle = 0.03
+    sampler = UltrasonicSampler(SENSORS, rate_hz=50, settle=settle).start()
+    try:
+        assert wait_until(lambda: min(sampler.samples.values()) >= 10, timeout=5)
+    finally:
+        sampler.stop()
+    events = [event for _, event in log]
+    assert events == ["trigger", "echo end"] * (len(events) // 2)   # one sensor pinging at a time
+    gaps = [log[i + 1][0] - log[i][0] for i in range(1, len(log) - 1, 2)]
+    assert len(gaps) >= 19
+    assert min(gaps) >= settle
+
+
+def test_distance_discards_outliers_and_missed_echoes(mock_factory):
+    wire(mock_factory, *SENSORS["food"], 30)
+    sampler = UltrasonicSampler({"food": SENSORS["food"]}, window=9)
+    try:
+        assert sampler.distance("food") is None                  # nothing sampled yet
+        sampler.windows["food"][:] = [30, 31, 29, 30, np.nan, 30, 2, 31, 95]
+        assert sampler.distance("food") == pytest.approx(30, abs=1)
+        sampler.windows["food"][:] = np.nan
+        assert sampler.distance("food") is None
+    finally:
+        sampler.stop()
@@ -1,5 +1,6 @@
 import RPi.GPIO as GPIO 
 import time 
+import threading
 import paho.mqtt.client as paho
 
 TRIG = 23
@@ -9,16 +10,33 @@ GPIO.setup(TRIG, GPIO.OUT)
 GPIO.setup(ECHO, GPIO.IN)
 
 
+ECHO_TIMEOUT = 0.1  # seconds; a missed echo returns None instead of hanging
+echo_edges = {}
+echo_done = threading.Event()
+
+def on_echo_edge(channel):
+    # Timestamp the echo edges from the GPIO callback thread instead of spinning on GPIO.input.
+    # RPi.GPIO doesn't pass the level and re-reading the pin here can miss a short pulse,
+    # so after each trigger the first edge is the rise and the second the fall.
+    now = time.monotonic()
+    if "rise" not in echo_edges:
+        echo_edges["rise"] = now
+    elif "fall" not in echo_edges:
+        echo_edges["fall"] = now
+        echo_done.set()
+
+GPIO.add_event_detect(ECHO, GPIO.BOTH, callback=on_echo_edge)
+
+
 def measure_distance():
+    echo_edges.clear()
+    echo_done.clear()
     GPIO.output(TRIG, True)
     time.sleep(0.00001)
     GPIO.output(TRIG, False)
-    start, stop = time.time(), time.time()
-    while GPIO.input(ECHO) == 0:
-        start = time.time()
-    while GPIO.input(ECHO) == 1:
-        stop = time.time()
-    return (stop - start) * 34300 / 2
+    if not echo_done.wait(ECHO_TIMEOUT):
+        return None
+    return (echo_edges["fall"] - echo_edges["rise"]) * 34300 / 2
 
 
 def on_connect(client, userdata, flags, rc):
@@ -41,8 +59,11 @@ client.loop_start()
             
 while True:
     distance = measure_distance()  
-    print(f"Distance: {distance:.1f} cm")
-    (rc, mid) = client.publish("sensor/distance", distance, qos=1)  
+    if distance is None:
+        print("No echo")
+    else:
+        print(f"Distance: {distance:.1f} cm")
+        (rc, mid) = client.publish("sensor/distance", distance, qos=1)  
     time.sleep(2)
 
 
@@ -0,0 +1,129 @@
+import threading
+import time
+import numpy as np
+from gpiozero import DigitalOutputDevice, InputDevice
+
+SPEED_OF_SOUND = 34300  # cm/s
+
+
+# ---------- Echo Timer ----------
+class EchoTimer:
+    """
+    One HC-SR04: fires the trigger and times the echo pulse from edge-callback
+    timestamps, so nothing spins on the echo pin while waiting.
+    """
+
+    def __init__(self, trigger_pin, echo_pin, max_distance_cm=100, pin_factory=None):
+        self.trigger = DigitalOutputDevice(trigger_pin, pin_factory=pin_factory)
+        self.echo = InputDevice(echo_pin, pull_up=None, active_state=True, pin_factory=pin_factory)
+        self.max_distance_cm = max_distance_cm
+        self.timeouts = 0
+        self._rise = None
+        self._fall = None
+        self._done = threading.Event()
+        self.echo.pin.edges = "both"
+        self.echo.pin.when_changed = self._echo_changed
+
+    def _echo_changed(self, ticks, state):
+        if state:
+            self._rise = ticks
+        elif self._rise is not None:
+            self._fall = ticks
+            self._done.set()
+
+    def measure(self, timeout=0.1):
+        """Return one distance reading in cm, or None if the echo never completed."""
+        self._rise = self._fall = None
+        self._done.clear()
+
+        self.trigger.on()
+        time.sleep(0.00001)
+        self.trigger.off()
+
+        if not self._done.wait(timeout):
+            self.timeouts += 1
+            return None
+
+        # Like gpiozero's DistanceSensor, anything beyond range reads as max distance
+        pulse = self.echo.pin_factory.ticks_diff(self._fall, self._rise)
+        return min(pulse * SPEED_OF_SOUND / 2, self.max_distance_cm)
+
+    def close(self):
+        self.echo.pin.when_changed = None
+        self.trigger.close()
+        self.echo.close()
+
+
+# ---------- Sampling Engine ----------
+class UltrasonicSampler:
+    """
+    Pings several ultrasonic sensors one after another at a fixed rate and
+    keeps the last N readings of each in a numpy window. Only one sensor is
+    ever pinging, so a sensor can't pick up another sensor's echo.
+    """
+
+    def __init__(self, sensors, rate_hz=10, window=9, max_distance_cm=100, settle=0.06, pin_factory=None):
+        self.timers = {
+            name: EchoTimer(trigger, echo, max_distance_cm, pin_factory)
+            for name, (trigger, echo) in sensors.items()
+        }
+        self.period = 1.0 / rate_hz
+        self.settle = settle   # quiet time after each ping so late echoes die out
+        self.windows = {name: np.full(window, np.nan) for name in self.timers}
+        self.samples = {name: 0 for name in self.timers}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="ultrasonic", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for timer in self.timers.values():
+            timer.close()
+
+    def _run(self):
+        next_round = time.monotonic()
+        while not self._stopped.is_set():
+            for name, timer in self.timers.items():
+                reading = timer.measure()
+                with self._lock:
+                    window = self.windows[name]
+                    window[self.samples[name] % len(window)] = np.nan if reading is None else reading
+                    self.samples[name] += 1
+                self._stopped.wait(self.settle)
+
+            next_round += self.period
+            delay = next_round - time.monotonic()
+            if delay > 0:
+                self._stopped.wait(delay)
+            else:
+                next_round = time.monotonic()
+
+    def distance(self, name, max_deviation=3.0):
+        """
+        Median of the recent readings after discarding outliers more than
+        max_deviation scaled MADs from the median. Returns None when there
+        is no valid reading in the window.
+        """
+        with self._lock:
+            window = self.windows[name].copy()
+        valid = window[~np.isnan(window)]
+        if valid.size == 0:
+            return None
+
+        median = np.median(valid)
+        mad = np.median(np.abs(valid - median)) * 1.4826
+        if mad > 0:
+            valid = valid[np.abs(valid - median) <= max_deviation * mad]
+        return float(np.median(valid))
+
+    def stats(self):
+        return {name: {"samples": self.samples[name], "timeouts": timer.timeouts}
+                for name, timer in self.timers.items()}
@@ -0,0 +1,53 @@
+import sys
+import time
+import wave
+import numpy as np
+from audio_gate import ActivityDetector
+from model_registry import registry, YAMNET_INPUT_SIZE
+
+# Runs the activity gate over a recording in YAMNet-sized windows and reports
+# how many YAMNet invokes it avoids, with and without the spectral-flux check.
+# If yamnet.tflite is present the invoke time saved is measured as well.
+# Usage: python vad_bench.py [file.wav]
+
+AUDIO_FILE = sys.argv[1] if len(sys.argv) > 1 else "received_audio.wav"
+
+
+def load_windows(path, window_size=YAMNET_INPUT_SIZE):
+    with wave.open(path, "rb") as wf:
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    audio = audio.astype(np.float32) * (1 / 32768.0)
+    n = len(audio) // window_size
+    return audio[:n * window_size].reshape(n, window_size)
+
+
+def yamnet_invoke_ms(windows):
+    model = registry.get("yamnet")
+    start = time.perf_counter()
+    for window in windows:
+        model.interpreter.set_tensor(model.input_index, window)
+        model.interpreter.invoke()
+    return (time.perf_counter() - start) * 1000 / len(windows)
+
+
+if __name__ == "__main__":
+    windows = load_windows(AUDIO_FILE)
+    print(f"{AUDIO_FILE}: {len(windows)} windows of {YAMNET_INPUT_SIZE} samples")
+    invoke_ms = yamnet_invoke_ms(windows[:5]) if registry.available("yamnet") else None
+
+    for use_flux in (False, True):
+        gate = ActivityDetector(use_flux=use_flux)
+        start = time.perf_counter()
+        decisions = [gate.is_active(window) for window in windows]
+        gate_ms = (time.perf_counter() - start) * 1000 / len(windows)
+        stats = gate.stats()
+
+        print(f"\nenergy{' + spectral flux' if use_flux else ''}:")
+        print("  " + "".join("#" if active else "." for active in decisions) + "   (# = YAMNet runs)")
+        print(f"  invokes avoided {stats['skipped']}/{stats['windows']} ({stats['skip_rate'] * 100:.1f}%), "
+              f"gate {gate_ms:.3f} ms/window, noise floor {stats['noise_floor_db']} dBFS")
+        if invoke_ms is not None:
+            saved = stats["skipped"] * invoke_ms - len(windows) * gate_ms
+            print(f"  YAMNet {invoke_ms:.1f} ms/invoke -> {saved / 1000:.2f} s saved on this file")
+    if invoke_ms is None:
+        print("\n(yamnet.tflite not found: invoke time saved not measured)")
@@ -1,13 +1,17 @@
 import numpy as np
 import wave
-from tflite_runtime.interpreter import Interpreter
+from model_registry import registry
+from inference_cache import audio_cache
+from inference_client import connect
 
 # ---------- Load YAMNet TFLite ----------
-yamnet = Interpreter(model_path="yamnet.tflite")
-yamnet.allocate_tensors()
-input_details = yamnet.get_input_details()
-output_details = yamnet.get_output_details()
-input_size = input_details[0]['shape'][0]  # 15600
+# Use a running inference_server.py if there is one, otherwise load the model here
+client = connect()
+if client:
+    input_size = client.models["yamnet"]["input_shape"][0]  # 15600
+else:
+    model = registry.get("yamnet")
+    input_size = model.input_shape[0]  # 15600
 
 # ---------- Load audio ----------
 filename = "received_audio.wav"
@@ -17,12 +21,19 @@ with wave.open(filename, 'rb') as wf:
 audio_data = audio_data / 32768.0  # normalize to [-1,1]
 
 # ---------- Process in chunks ----------
-def predict_chunk(wave_chunk):
-    yamnet.set_tensor(input_details[0]['index'], wave_chunk.astype(np.float32))
-    yamnet.invoke()
-    preds = yamnet.get_tensor(output_details[0]['index'])[0]
+def invoke_chunk(wave_chunk):
+    if client:
+        return client.score_audio(wave_chunk)
+    # set_input()/output() (de)quantize for an int8 YAMNet
+    model.set_input(wave_chunk)
+    model.interpreter.invoke()
+    preds = model.output()
     return preds
 
+def predict_chunk(wave_chunk):
+    # Identical windows (e.g. stretches of digital silence) are scored once
+    return audio_cache.lookup(wave_chunk.astype(np.float32), invoke_chunk)
+
 # Sliding window over audio
 step = input_size  # non-overlapping
 all_preds = []
@@ -52,3 +63,4 @@ else:
     emotion = "Happy"
 
 print(f"Sound: {sound} | Emotion: {emotion}")
+print(f"Cache: {audio_cache.stats()}")